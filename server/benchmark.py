@@ -0,0 +1,835 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Live Graph Server Benchmarks
+
+    python benchmark.py parse --size-mb 5
+    python benchmark.py --output parse.json parse --size-mb 5
+    python benchmark.py ingest --mode inprocess --requests 2000 --concurrency 16
+    python benchmark.py ingest --mode http --payload-kb 50
+    python benchmark.py ingest --mode http --url http://localhost:5000/api/graph-data
+    python benchmark.py compression --payload-kb 64 --link-mbps 10
+    python benchmark.py memory --graphs 2000 --payload-kb 8
+    python benchmark.py search --graphs 20000 --videos 2000
+    python benchmark.py parse-pool --sizes-kb 16 64 256 1024 --processes 4
+
+Results are printed as a table and, with --output, written as JSON so runs
+can be compared between versions.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from triple_parser import TripleParser, parse_ai_triples
+
+CONCEPTS = [
+    'Emmanuel Kant', 'philosophy', 'semester', 'world work', 'categorical imperative',
+    'neural network', 'gradient descent', 'loss function', 'power', 'empire',
+    'trade route', 'Roman Senate', 'photosynthesis', 'chlorophyll', 'supply chain',
+]
+PREDICATES = ['teaches', 'is_part_of', 'causes', 'related_to', 'depends_on', 'contrasts_with']
+
+
+def make_raw_content(size_bytes, seed=0):
+    """Synthetic AI triple output shaped like what the extension pushes"""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size_bytes:
+        roll = rng.random()
+        subject = f"{rng.choice(CONCEPTS)} {rng.randrange(500)}"
+        predicate = rng.choice(PREDICATES)
+        obj = f"{rng.choice(CONCEPTS)} {rng.randrange(500)}"
+        if roll < 0.70:
+            line = f"({subject},{predicate},{obj})"
+        elif roll < 0.85:
+            line = f"({subject},_{predicate},_{obj},{rng.choice(CONCEPTS)})"
+        elif roll < 0.90:
+            line = f"({subject}, {predicate}, {obj}) ({obj}, {rng.choice(PREDICATES)}, {subject})"
+        elif roll < 0.95:
+            line = f"Here are the key relationships from this section about {subject}:"
+        else:
+            line = ''
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+
+
+def legacy_parse_ai_triples(raw_content):
+    """The original per-line regex parser, kept for comparison"""
+    nodes = set()
+    edges = []
+    raw_triples = []
+    for line in raw_content.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        for match in re.findall(r'\(([^)]+)\)', line):
+            parts = [part.strip() for part in match.split(',')]
+            if len(parts) == 3:
+                subject, predicate, obj = parts
+                nodes.add(subject)
+                nodes.add(obj)
+                edges.append((subject, predicate, obj))
+                raw_triples.append((subject, predicate, obj))
+            elif len(parts) == 4:
+                subject, predicate, obj, additional = parts
+                nodes.add(subject)
+                nodes.add(obj)
+                nodes.add(additional)
+                edges.append((subject, predicate, obj))
+                edges.append((obj, 'related_to', additional))
+                raw_triples.append((subject, predicate, obj))
+                raw_triples.append((obj, 'related_to', additional))
+            elif len(parts) > 4:
+                subject, predicate, obj = parts[:3]
+                nodes.add(subject)
+                nodes.add(obj)
+                edges.append((subject, predicate, obj))
+                raw_triples.append((subject, predicate, obj))
+    return {'nodes': list(nodes), 'edges': edges, 'raw_triples': raw_triples}
+
+
+# Inputs whose triples the current parser must produce, fed whole and in chunks
+PARSER_CASES = [
+    ('(Emmanuel Kant,teaches,semester)', [('Emmanuel Kant', 'teaches', 'semester')]),
+    ('(Kant,_teaches_about,_world_work,philosophical_concept)',
+     [('Kant', '_teaches_about', '_world_work'), ('_world_work', 'related_to', 'philosophical_concept')]),
+    ('(a, b, c) (c, d, e)\nnot a tuple (x, y)', [('a', 'b', 'c'), ('c', 'd', 'e')]),
+    ('("New York, NY",located_in,USA)', [('New York, NY', 'located_in', 'USA')]),
+    ('(neural network (NN),is_a,model)', [('neural network (NN)', 'is_a', 'model')]),
+    ('((a,b,c), (d,e,f))', [('a', 'b', 'c'), ('d', 'e', 'f')]),
+    ('Triples: ((Kant,teaches,semester),(Kant,wrote,Critique))',
+     [('Kant', 'teaches', 'semester'), ('Kant', 'wrote', 'Critique')]),
+]
+
+
+def check_parser_cases():
+    """PARSER_CASES the current parser gets wrong, as (input, expected, parsed)"""
+    failures = []
+    for text, expected in PARSER_CASES:
+        parser = TripleParser()
+        for start in range(0, len(text), 7):
+            parser.feed(text[start:start + 7])
+        for parsed in (parse_ai_triples(text)['raw_triples'], parser.close()['raw_triples']):
+            if parsed != expected:
+                failures.append((text, expected, parsed))
+                break
+    return failures
+
+
+def best_of(func, repeat):
+    """Best wall-clock time of ``repeat`` calls to ``func``"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def bench_parse(args):
+    """Parser throughput in MB/s, current implementation versus the original"""
+    failures = check_parser_cases()
+    print(f"Parser cases: {len(PARSER_CASES) - len(failures)}/{len(PARSER_CASES)} parsed as expected")
+    for text, expected, parsed in failures:
+        print(f"  ❌ {text!r}: expected {expected}, got {parsed}")
+    if failures:
+        sys.exit(1)
+
+    content = make_raw_content(int(args.size_mb * 1024 * 1024), seed=args.seed)
+    megabytes = len(content.encode('utf-8')) / (1024 * 1024)
+
+    results = []
+    for name, parser in (('legacy', legacy_parse_ai_triples), ('current', parse_ai_triples)):
+        elapsed, parsed = best_of(lambda: parser(content), args.repeat)
+        results.append({
+            'parser': name,
+            'seconds': round(elapsed, 6),
+            'mb_per_second': round(megabytes / elapsed, 2),
+            'triples': len(parsed['raw_triples']),
+            'nodes': len(parsed['nodes'])
+        })
+
+    print(f"Parsing {megabytes:.2f} MB of synthetic AI output (best of {args.repeat})")
+    print(f"  {'parser':<10} {'seconds':>10} {'MB/s':>10} {'triples':>10} {'nodes':>10}")
+    for row in results:
+        print(f"  {row['parser']:<10} {row['seconds']:>10.4f} {row['mb_per_second']:>10.2f} "
+              f"{row['triples']:>10} {row['nodes']:>10}")
+    speedup = results[0]['seconds'] / results[1]['seconds']
+    print(f"  speedup: {speedup:.2f}x")
+
+    return {'size_mb': round(megabytes, 3), 'repeat': args.repeat, 'results': results,
+            'speedup': round(speedup, 3)}
+
+
+def make_push_payload(raw_content, video_number, batch_id):
+    """A payload shaped exactly like GraphPushModule.pushGraphData sends"""
+    now = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    video_id = f'bench{video_number:07d}'
+    return {
+        'timestamp': now,
+        'source': 'youtube-learning-extension',
+        'version': '1.2',
+        'metadata': {
+            'videoId': video_id,
+            'videoTitle': f'Benchmark Lecture {video_number}',
+            'channelName': 'Benchmark Channel',
+            'url': f'https://www.youtube.com/watch?v={video_id}',
+            'timestamp': now,
+            'captionCount': 40,
+            'batchId': batch_id,
+            'promptUsed': 'Graph'
+        },
+        'rawContent': raw_content,
+        'contentType': 'ai_triples'
+    }
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None where unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def start_local_server(app):
+    """Serve ``app`` over HTTP on a free local port in a background thread"""
+    try:
+        from waitress import create_server
+        server = create_server(app, host='127.0.0.1', port=0, threads=16)
+        port = server.effective_port
+        threading.Thread(target=server.run, daemon=True).start()
+        # waitress has no way to stop run() from another thread; the daemon
+        # thread ends with the process
+        return f'http://127.0.0.1:{port}', None, 'waitress'
+    except ImportError:
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{server.server_port}', server.shutdown, 'werkzeug'
+
+
+def import_server(args):
+    """Import the live graph server configured for benchmarking"""
+    os.environ.setdefault('GRAPH_LOG_MODE', 'structured')
+    os.environ.setdefault('GRAPH_LOG_PAYLOAD', 'off')
+    os.environ['GRAPH_STORAGE'] = args.storage
+    if args.storage != 'memory':
+        os.environ.setdefault('GRAPH_STORAGE_PATH', os.path.join(args.workdir, f'bench-{args.storage}'))
+    os.makedirs(args.workdir, exist_ok=True)
+    os.chdir(args.workdir)
+    import logging
+    import live_graph_server
+    logging.getLogger().setLevel(logging.WARNING)
+    return live_graph_server
+
+
+def bench_ingest(args):
+    """Latency and throughput of POST /api/graph-data under concurrent load"""
+    raw_contents = [make_raw_content(int(args.payload_kb * 1024), seed=args.seed + i) for i in range(8)]
+    pushes = [
+        json.dumps(make_push_payload(raw_contents[i % len(raw_contents)], i % args.videos, i)).encode('utf-8')
+        for i in range(args.requests)
+    ]
+    payload_bytes = sum(len(push) for push in pushes)
+    path = '/api/graph-data'
+    bodies = pushes
+    if args.batch_size > 1:
+        # Group pushes into JSON arrays for the batch endpoint
+        path = '/api/graph-data/batch'
+        bodies = [b'[' + b','.join(pushes[i:i + args.batch_size]) + b']'
+                  for i in range(0, len(pushes), args.batch_size)]
+
+    server = None
+    stop_server = None
+    target = args.url
+    server_kind = 'external'
+    if args.mode == 'inprocess' or not target:
+        server = import_server(args)
+    if args.mode == 'http' and not target:
+        base_url, stop_server, server_kind = start_local_server(server.app)
+        target = base_url + path
+    elif target and args.batch_size > 1:
+        target = target.rstrip('/') + '/batch'
+
+    local = threading.local()
+
+    if args.mode == 'inprocess':
+        server_kind = 'flask-test-client'
+
+        def send(body):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = server.app.test_client()
+            response = client.post(path, data=body, content_type='application/json')
+            return response.status_code
+    else:
+        parts = urlsplit(target)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+
+        def send(body):
+            # One keep-alive connection per client thread
+            connection = getattr(local, 'connection', None)
+            if connection is None:
+                connection = local.connection = connection_class(parts.hostname, parts.port, timeout=60)
+            try:
+                connection.request('POST', parts.path or '/', body=body,
+                                   headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                local.connection = None
+                return 0
+
+    def timed(body):
+        started = time.perf_counter()
+        status = send(body)
+        return time.perf_counter() - started, status
+
+    # Warm up code paths and connections before measuring
+    for body in bodies[:min(len(bodies), args.concurrency)]:
+        send(body)
+
+    rss_before = current_rss_bytes()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        samples = list(pool.map(timed, bodies))
+    elapsed = time.perf_counter() - started
+    cpu_seconds = time.process_time() - cpu_before
+    rss_after = current_rss_bytes()
+
+    if stop_server:
+        stop_server()
+
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, status in samples if not 200 <= status < 300)
+    results = {
+        'mode': args.mode,
+        'server': server_kind,
+        'target': target if args.mode == 'http' else None,
+        'storage': args.storage if server else None,
+        'pushes': args.requests,
+        'batch_size': args.batch_size,
+        'requests': len(bodies),
+        'concurrency': args.concurrency,
+        'payload_kb': args.payload_kb,
+        'mean_payload_bytes': round(payload_bytes / len(pushes)),
+        'errors': errors,
+        'seconds': round(elapsed, 4),
+        'requests_per_second': round(len(bodies) / elapsed, 2),
+        'pushes_per_second': round(args.requests / elapsed, 2),
+        'mb_per_second': round(payload_bytes / (1024 * 1024) / elapsed, 2),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3)
+        },
+        # CPU and RSS cover this process: the app itself when it runs here,
+        # only the load generator against an external --url
+        'cpu_seconds': round(cpu_seconds, 3),
+        'cpu_utilization': round(cpu_seconds / elapsed, 3),
+        'rss_bytes': rss_after,
+        'rss_growth_bytes': rss_after - rss_before if rss_after and rss_before else None,
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+    print(f"Ingest benchmark: {args.mode} ({server_kind}), {args.requests} pushes in {len(bodies)} requests, "
+          f"concurrency {args.concurrency}, ~{results['mean_payload_bytes'] / 1024:.1f} KB payloads")
+    print(f"  throughput: {results['requests_per_second']:.1f} req/s, "
+          f"{results['pushes_per_second']:.1f} pushes/s, {results['mb_per_second']:.2f} MB/s")
+    latency = results['latency_ms']
+    print(f"  latency ms: p50 {latency['p50']:.2f}  p95 {latency['p95']:.2f}  "
+          f"p99 {latency['p99']:.2f}  max {latency['max']:.2f}")
+    print(f"  cpu: {cpu_seconds:.2f}s ({results['cpu_utilization'] * 100:.0f}% of one core)")
+    if rss_after:
+        print(f"  rss: {rss_after / (1024 * 1024):.1f} MB")
+    print(f"  errors: {errors}")
+    return results
+
+
+def decode_body(data, encoding):
+    import gzip
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def transfer_row(encoding, sizes, latencies, link_mbps):
+    """Bytes, measured latency and latency including transfer on a slower link"""
+    latencies = sorted(latencies)
+    mean_bytes = sum(sizes) / len(sizes)
+    p50 = percentile(latencies, 0.50)
+    return {
+        'encoding': encoding,
+        'mean_bytes': round(mean_bytes),
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        # Loopback has effectively unlimited bandwidth; estimate what the
+        # same request costs when the bytes cross a ``link_mbps`` link
+        'p50_ms_at_link': round((p50 + mean_bytes * 8 / (link_mbps * 1e6)) * 1000, 3)
+    }
+
+
+def bench_compression(args):
+    """Bandwidth and latency of identity, gzip and zstd request and response bodies"""
+    from http_compression import ENCODINGS, compress
+
+    encodings = ('identity',) + ENCODINGS
+    raw_contents = [make_raw_content(int(args.payload_kb * 1024), seed=args.seed + i) for i in range(8)]
+    pushes = [
+        json.dumps(make_push_payload(raw_contents[i % len(raw_contents)], i % 20, i)).encode('utf-8')
+        for i in range(args.requests)
+    ]
+
+    base_url = args.url
+    server_kind = 'external'
+    if not base_url:
+        server = import_server(args)
+        base_url, _, server_kind = start_local_server(server.app)
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+
+    def send(method, path, body=None, headers=None):
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.getheader('Content-Encoding'), response.read()
+
+    uploads = []
+    for encoding in encodings:
+        sizes, latencies, errors = [], [], 0
+        for body in pushes:
+            headers = {'Content-Type': 'application/json'}
+            started = time.perf_counter()
+            if encoding != 'identity':
+                body = compress(body, encoding)
+                headers['Content-Encoding'] = encoding
+            status, _, _ = send('POST', '/api/graph-data', body, headers)
+            latencies.append(time.perf_counter() - started)
+            sizes.append(len(body))
+            errors += status != 200
+        row = transfer_row(encoding, sizes, latencies, args.link_mbps)
+        row['errors'] = errors
+        uploads.append(row)
+
+    downloads = []
+    path = f'/api/graphs?full=1&limit={args.list_limit}'
+    for encoding in encodings:
+        sizes, latencies = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            status, received_encoding, data = send('GET', path, headers={'Accept-Encoding': encoding})
+            decode_body(data, received_encoding)
+            latencies.append(time.perf_counter() - started)
+            sizes.append(len(data))
+        downloads.append(transfer_row(encoding, sizes, latencies, args.link_mbps))
+    connection.close()
+
+    print(f"Compression benchmark against {base_url} ({server_kind}), "
+          f"latency on a {args.link_mbps:g} Mbit/s link estimated from size")
+    for title, rows in ((f"POST /api/graph-data, {args.requests} pushes of ~{args.payload_kb:g} KB rawContent", uploads),
+                        (f"GET {path}, {args.repeat} downloads", downloads)):
+        print(f"  {title}")
+        print(f"    {'encoding':<10} {'bytes':>10} {'ratio':>7} {'p50 ms':>9} {'p95 ms':>9} {'p50 ms @link':>13}")
+        for row in rows:
+            ratio = rows[0]['mean_bytes'] / row['mean_bytes'] if row['mean_bytes'] else 0
+            row['ratio'] = round(ratio, 2)
+            print(f"    {row['encoding']:<10} {row['mean_bytes']:>10} {ratio:>6.1f}x {row['p50_ms']:>9.2f} "
+                  f"{row['p95_ms']:>9.2f} {row['p50_ms_at_link']:>13.2f}")
+
+    return {'server': server_kind, 'requests': args.requests, 'payload_kb': args.payload_kb,
+            'list_limit': args.list_limit, 'link_mbps': args.link_mbps,
+            'uploads': uploads, 'downloads': downloads}
+
+
+def expanded_graph(payload):
+    """A parsed payload as the server stored it before compact graphs"""
+    parsed = legacy_parse_ai_triples(payload['rawContent'])
+    return {
+        **payload,
+        'nodes': [{'id': node, 'label': node, 'type': 'concept'} for node in parsed['nodes']],
+        'edges': [{'from': s, 'to': o, 'label': p, 'type': 'relationship'} for s, p, o in parsed['edges']],
+        'rawTriples': parsed['raw_triples']
+    }
+
+
+def compact_graph(payload):
+    from compact_graph import CompactGraph
+    return payload, CompactGraph.from_triples(parse_ai_triples(payload['rawContent'])['raw_triples'])
+
+
+def bench_memory(args):
+    """Memory held by stored graphs, expanded node/edge dicts versus compact graphs"""
+    import gc
+    import tracemalloc
+
+    # Graphs from the same videos share most of their vocabulary, as they do
+    # for consecutive caption batches
+    rng = random.Random(args.seed)
+    payloads = [
+        make_push_payload(make_raw_content(int(args.payload_kb * 1024), seed=rng.randrange(args.vocabulary)),
+                          i % 50, i)
+        for i in range(args.graphs)
+    ]
+
+    results = []
+    for name, build in (('expanded', expanded_graph), ('compact', compact_graph)):
+        # Payloads are decoded fresh from JSON, so nothing is shared with
+        # the generator's strings
+        fresh = [json.loads(json.dumps(payload)) for payload in payloads]
+        raw_bytes = sum(sys.getsizeof(payload['rawContent']) for payload in fresh)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        stored = [build(payload) for payload in fresh]
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results.append({'representation': name, 'bytes': held,
+                        'bytes_per_graph': round(held / args.graphs)})
+        del stored, fresh
+
+    # rawContent is kept verbatim by both representations
+    print(f"Memory of {args.graphs} stored graphs with ~{args.payload_kb:g} KB rawContent "
+          f"({raw_bytes / (1024 * 1024):.1f} MB of which is rawContent, excluded below)")
+    print(f"  {'representation':<15} {'MB':>10} {'KB/graph':>10}")
+    for row in results:
+        print(f"  {row['representation']:<15} {row['bytes'] / (1024 * 1024):>10.1f} "
+              f"{row['bytes_per_graph'] / 1024:>10.1f}")
+    reduction = results[0]['bytes'] / results[1]['bytes'] if results[1]['bytes'] else 0
+    print(f"  reduction: {reduction:.1f}x")
+    return {'graphs': args.graphs, 'payload_kb': args.payload_kb, 'results': results,
+            'reduction': round(reduction, 2)}
+
+
+def make_vocabulary(size, seed=0):
+    """``size`` distinct random lowercase words of 4 to 10 letters"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def zipf_words(rng, vocabulary, count):
+    """``count`` words drawn from ``vocabulary``, the first words far more often"""
+    return [vocabulary[int(len(vocabulary) ** rng.random()) - 1] for _ in range(count)]
+
+
+def bench_search(args):
+    """Search index build throughput and query latency"""
+    from search_index import SearchIndex, parse_query
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, args.seed)
+    index = SearchIndex()
+    started = time.perf_counter()
+    for i in range(args.graphs):
+        video = i % args.videos
+        # Concept labels of one to three words; common words occur in many
+        # videos and rare ones in few, as with real lecture vocabularies
+        labels = [' '.join(zipf_words(rng, vocabulary, rng.randint(1, 3)))
+                  for _ in range(args.labels)]
+        predicates = rng.sample(PREDICATES, 3)
+        index.add(f'video{video}', labels=labels, predicates=predicates,
+                  title=f'Lecture {video} on {labels[0]}', channel=f'Channel {video % 50}')
+    build_seconds = time.perf_counter() - started
+
+    queries = {
+        'token': [zipf_words(rng, vocabulary, 1)[0] for _ in range(args.queries)],
+        'two tokens': [' '.join(zipf_words(rng, vocabulary, 2)) for _ in range(args.queries)],
+        'prefix': [zipf_words(rng, vocabulary, 1)[0][:3] + '*' for _ in range(args.queries)],
+        # Worst case: a word in every video, so every video is scored
+        'every video': ['lecture'] * args.queries,
+    }
+    results = []
+    for kind, texts in queries.items():
+        latencies = []
+        matched = 0
+        for text in texts:
+            started = time.perf_counter()
+            total, _ = index.search(parse_query(text), limit=20)
+            latencies.append(time.perf_counter() - started)
+            matched += total
+        latencies.sort()
+        results.append({
+            'query': kind,
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 4),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+            'mean_matches': round(matched / len(texts), 1)
+        })
+
+    print(f"Search index over {args.graphs} graphs in {len(index)} videos, "
+          f"{index.vocabulary_size} distinct tokens, built in {build_seconds:.2f}s "
+          f"({args.graphs / build_seconds:.0f} graphs/s)")
+    print(f"  {'query':<12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'matches':>9}")
+    for row in results:
+        print(f"  {row['query']:<12} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} "
+              f"{row['mean_matches']:>9.0f}")
+    return {'graphs': args.graphs, 'videos': len(index), 'vocabulary': index.vocabulary_size,
+            'build_seconds': round(build_seconds, 3), 'results': results}
+
+
+def make_concept_edges(nodes, seed=0):
+    """Edges of a graph where new concepts mostly attach to well-connected ones"""
+    rng = random.Random(seed)
+    sources, targets, ends = [], [], [0]
+    for node in range(1, nodes):
+        for _ in range(1 if rng.random() < 0.7 else 2):
+            other = rng.choice(ends)
+            sources.append(node)
+            targets.append(other)
+            ends += [node, other]
+    return sources, targets
+
+
+def bench_layout(args):
+    """Cold and warm-started server-side layout time by graph size"""
+    import graph_layout
+    if graph_layout.np is None:
+        raise SystemExit("The layout benchmark needs NumPy (pip install numpy)")
+    np = graph_layout.np
+
+    results = []
+    for nodes in args.nodes:
+        grown = int(nodes * (1 + args.growth))
+        sources, targets = make_concept_edges(grown, args.seed)
+        # The same graph before its last batch: edges between the first nodes
+        old_edges = [(a, b) for a, b in zip(sources, targets) if a < nodes and b < nodes]
+
+        started = time.perf_counter()
+        positions = graph_layout.force_layout(nodes, [a for a, _ in old_edges], [b for _, b in old_edges])
+        cold_seconds = time.perf_counter() - started
+
+        initial = np.full((grown, 2), np.nan)
+        initial[:nodes] = positions
+        started = time.perf_counter()
+        grown_positions = graph_layout.force_layout(grown, sources, targets, initial=initial)
+        warm_seconds = time.perf_counter() - started
+
+        lengths = np.linalg.norm(grown_positions[sources] - grown_positions[targets], axis=1)
+        moved = np.linalg.norm(grown_positions[:nodes] - positions, axis=1)
+        results.append({
+            'nodes': nodes,
+            'edges': len(old_edges),
+            'method': 'exact' if nodes <= graph_layout.EXACT_REPULSION_MAX_NODES else 'grid',
+            'cold_ms': round(cold_seconds * 1000, 1),
+            'warm_ms': round(warm_seconds * 1000, 1),
+            'median_edge_length': round(float(np.median(lengths)), 1),
+            'median_moved': round(float(np.median(moved)), 1)
+        })
+
+    print(f"Layout with {args.growth:.0%} new nodes per warm start "
+          f"(ideal edge length {graph_layout.IDEAL_EDGE_LENGTH:.0f})")
+    print(f"  {'nodes':>7} {'edges':>7} {'method':>6} {'cold ms':>9} {'warm ms':>9} {'edge len':>9} {'moved':>7}")
+    for row in results:
+        print(f"  {row['nodes']:>7} {row['edges']:>7} {row['method']:>6} {row['cold_ms']:>9.1f} "
+              f"{row['warm_ms']:>9.1f} {row['median_edge_length']:>9.1f} {row['median_moved']:>7.1f}")
+    return {'growth': args.growth, 'results': results}
+
+
+def bench_parse_pool(args):
+    """Inline versus process pool parsing throughput by payload size, and the crossover size"""
+    from compact_graph import CompactGraph
+    from parse_pool import ParsePool
+    from triple_parser import parse_into
+
+    processes = args.processes or os.cpu_count() or 1
+    concurrency = args.concurrency or processes
+    pool = ParsePool(processes=processes, min_bytes=0)
+
+    def parse_inline(content):
+        return CompactGraph.from_triples(parse_into(content, []))
+
+    results = []
+    try:
+        for size_kb in args.sizes_kb:
+            contents = [make_raw_content(int(size_kb * 1024), seed=args.seed + i) for i in range(args.payloads)]
+            megabytes = sum(len(content) for content in contents) / (1024 * 1024)
+            row = {'size_kb': size_kb, 'payloads': args.payloads}
+            for name, parse in (('inline', parse_inline), ('pool', pool.parse)):
+                # One payload at a time: the added latency of a round trip to a worker
+                single, _ = best_of(lambda: parse(contents[0]), args.repeat)
+                # Concurrent requests: whether workers beat threads sharing the GIL
+                with ThreadPoolExecutor(max_workers=concurrency) as threads:
+                    elapsed, _ = best_of(lambda: list(threads.map(parse, contents)), args.repeat)
+                row[f'{name}_single_ms'] = round(single * 1000, 3)
+                row[f'{name}_mb_per_second'] = round(megabytes / elapsed, 2)
+            results.append(row)
+    finally:
+        pool.close()
+
+    # The smallest size from which the pool is at least as fast at every larger size
+    crossover = None
+    for row in reversed(results):
+        if row['pool_mb_per_second'] < row['inline_mb_per_second']:
+            break
+        crossover = row['size_kb']
+
+    print(f"Parsing {args.payloads} payloads per size with {concurrency} threads, "
+          f"{processes} worker processes, {os.cpu_count()} CPUs (best of {args.repeat})")
+    print(f"  {'size KB':>8} {'inline ms':>10} {'pool ms':>10} {'inline MB/s':>12} {'pool MB/s':>10}")
+    for row in results:
+        print(f"  {row['size_kb']:>8g} {row['inline_single_ms']:>10.2f} {row['pool_single_ms']:>10.2f} "
+              f"{row['inline_mb_per_second']:>12.2f} {row['pool_mb_per_second']:>10.2f}")
+    if crossover is None:
+        print("  crossover: none, the pool never beat inline parsing at these sizes; keep GRAPH_PARSE_PROCESSES=0")
+    else:
+        print(f"  crossover: {crossover:g} KB, e.g. GRAPH_PARSE_PROCESS_MIN_BYTES={int(crossover * 1024)}")
+
+    return {'processes': processes, 'concurrency': concurrency, 'cpus': os.cpu_count(),
+            'repeat': args.repeat, 'results': results, 'crossover_kb': crossover}
+
+
+def write_output(path, benchmark, results):
+    report = {
+        'benchmark': benchmark,
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live graph server benchmarks")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parse_parser = commands.add_parser('parse', help="triple parser throughput")
+    parse_parser.add_argument('--size-mb', type=float, default=5, help="size of synthetic content (default: 5)")
+    parse_parser.add_argument('--repeat', type=int, default=5, help="runs per parser, best is reported (default: 5)")
+    parse_parser.add_argument('--seed', type=int, default=0)
+    parse_parser.set_defaults(func=bench_parse)
+
+    ingest_parser = commands.add_parser('ingest', help="POST /api/graph-data load test")
+    ingest_parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess',
+                               help="call the Flask app directly or over HTTP (default: inprocess)")
+    ingest_parser.add_argument('--url', help="graph push URL of a running server (http mode); "
+                                             "by default a local server is started")
+    ingest_parser.add_argument('--requests', type=int, default=2000, help="pushes to send (default: 2000)")
+    ingest_parser.add_argument('--concurrency', type=int, default=16, help="client threads (default: 16)")
+    ingest_parser.add_argument('--payload-kb', type=float, default=4,
+                               help="size of rawContent per push in KB (default: 4)")
+    ingest_parser.add_argument('--batch-size', type=int, default=1,
+                               help="pushes per request; above 1 uses /api/graph-data/batch (default: 1)")
+    ingest_parser.add_argument('--videos', type=int, default=20, help="distinct videos (default: 20)")
+    ingest_parser.add_argument('--storage', choices=('memory', 'sqlite', 'jsonl'), default='memory',
+                               help="storage backend for the local app (default: memory)")
+    ingest_parser.add_argument('--workdir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_data'),
+                               help="directory for logs and storage of the local app")
+    ingest_parser.add_argument('--seed', type=int, default=0)
+    ingest_parser.set_defaults(func=bench_ingest)
+
+    compression_parser = commands.add_parser('compression', help="identity vs gzip vs zstd bodies over HTTP")
+    compression_parser.add_argument('--url', help="base URL of a running server; by default a local server is started")
+    compression_parser.add_argument('--requests', type=int, default=200, help="pushes per encoding (default: 200)")
+    compression_parser.add_argument('--payload-kb', type=float, default=16,
+                                    help="size of rawContent per push in KB (default: 16)")
+    compression_parser.add_argument('--list-limit', type=int, default=100,
+                                    help="graphs per /api/graphs?full=1 download (default: 100)")
+    compression_parser.add_argument('--repeat', type=int, default=10, help="downloads per encoding (default: 10)")
+    compression_parser.add_argument('--link-mbps', type=float, default=10,
+                                    help="link speed for the estimated latency column (default: 10)")
+    compression_parser.add_argument('--storage', choices=('memory', 'sqlite', 'jsonl'), default='memory',
+                                    help="storage backend for the local app (default: memory)")
+    compression_parser.add_argument('--workdir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_data'),
+                                    help="directory for logs and storage of the local app")
+    compression_parser.add_argument('--seed', type=int, default=0)
+    compression_parser.set_defaults(func=bench_compression)
+
+    memory_parser = commands.add_parser('memory', help="memory of stored graphs, expanded vs compact")
+    memory_parser.add_argument('--graphs', type=int, default=2000, help="graphs to hold (default: 2000)")
+    memory_parser.add_argument('--payload-kb', type=float, default=8,
+                               help="size of rawContent per graph in KB (default: 8)")
+    memory_parser.add_argument('--vocabulary', type=int, default=200,
+                               help="distinct synthetic contents the graphs are drawn from (default: 200)")
+    memory_parser.add_argument('--seed', type=int, default=0)
+    memory_parser.set_defaults(func=bench_memory)
+
+    search_parser = commands.add_parser('search', help="search index build and query latency")
+    search_parser.add_argument('--graphs', type=int, default=20000, help="graphs to index (default: 20000)")
+    search_parser.add_argument('--videos', type=int, default=2000, help="distinct videos (default: 2000)")
+    search_parser.add_argument('--labels', type=int, default=40, help="new concept labels per graph (default: 40)")
+    search_parser.add_argument('--vocabulary', type=int, default=50000,
+                               help="distinct words concepts are drawn from (default: 50000)")
+    search_parser.add_argument('--queries', type=int, default=1000, help="queries per kind (default: 1000)")
+    search_parser.add_argument('--seed', type=int, default=0)
+    search_parser.set_defaults(func=bench_search)
+
+    layout_parser = commands.add_parser('layout', help="server-side layout time, cold and warm-started")
+    layout_parser.add_argument('--nodes', type=int, nargs='+', default=[100, 500, 2000, 5000],
+                               help="graph sizes to lay out (default: 100 500 2000 5000)")
+    layout_parser.add_argument('--growth', type=float, default=0.05,
+                               help="share of nodes added before the warm-started layout (default: 0.05)")
+    layout_parser.add_argument('--seed', type=int, default=0)
+    layout_parser.set_defaults(func=bench_layout)
+
+    pool_parser = commands.add_parser('parse-pool', help="inline vs process pool parsing, and the crossover size")
+    pool_parser.add_argument('--sizes-kb', type=float, nargs='+', default=[4, 16, 64, 256, 1024, 4096],
+                             help="rawContent sizes to compare (default: 4 16 64 256 1024 4096)")
+    pool_parser.add_argument('--processes', type=int, default=0,
+                             help="worker processes (default: one per CPU)")
+    pool_parser.add_argument('--concurrency', type=int, default=0,
+                             help="threads parsing at once (default: one per worker process)")
+    pool_parser.add_argument('--payloads', type=int, default=8, help="payloads per size (default: 8)")
+    pool_parser.add_argument('--repeat', type=int, default=3, help="runs per size, best is reported (default: 3)")
+    pool_parser.add_argument('--seed', type=int, default=0)
+    pool_parser.set_defaults(func=bench_parse_pool)
+
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    results = args.func(args)
+    if args.output:
+        write_output(args.output, args.command, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Compact Graphs
+Interned, array-backed storage for parsed graphs
+
+Expanding every triple into node and edge dicts stores each concept string
+several times per graph and costs a few hundred bytes per edge in dict
+overhead. A CompactGraph instead keeps node labels as ids into a global
+string table and edges as a packed array of integers, and only builds the
+JSON shape (``nodes``, ``edges``, ``rawTriples``) when a graph is serialized.
+"""
+
+import threading
+from array import array
+
+from video_graphs import edge_json, node_json
+
+
+class StringTable:
+    """Process-wide intern table mapping strings to small integer ids
+
+    Ids are never reused, so the table grows with the number of distinct
+    labels and predicates ever seen, which is far smaller than the number of
+    times they occur across graphs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self.strings = []
+
+    def intern(self, text):
+        string_id = self._ids.get(text)
+        if string_id is None:
+            with self._lock:
+                string_id = self._ids.get(text)
+                if string_id is None:
+                    string_id = len(self.strings)
+                    self.strings.append(text)
+                    self._ids[text] = string_id
+        return string_id
+
+    def __len__(self):
+        return len(self.strings)
+
+
+STRINGS = StringTable()
+
+
+class CompactGraph:
+    """Graph of interned node labels with edges packed as integer triples
+
+    ``nodes`` holds a string id per node; a node's integer id is its position.
+    ``edges`` holds (source node id, predicate string id, target node id) for
+    every edge, flattened into one array.
+    """
+
+    __slots__ = ('nodes', 'edges')
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+
+    @classmethod
+    def from_triples(cls, triples, nodes=()):
+        """Build from (subject, predicate, object) triples and optional extra node labels"""
+        intern = STRINGS.intern
+        node_ids = {}
+        node_strings = array('I')
+        edges = array('I')
+
+        def node_id(label):
+            index = node_ids.get(label)
+            if index is None:
+                index = node_ids[label] = len(node_strings)
+                node_strings.append(intern(label))
+            return index
+
+        for label in nodes:
+            node_id(label)
+        for subject, predicate, obj in triples:
+            edges.append(node_id(subject))
+            edges.append(intern(predicate))
+            edges.append(node_id(obj))
+        return cls(node_strings, edges)
+
+    @classmethod
+    def from_packed(cls, strings, nodes, edges):
+        """Build from ``pack_triples`` output, e.g. a graph parsed in another process"""
+        intern = STRINGS.intern
+        string_ids = [intern(text) for text in strings]
+        nodes = array('I', [string_ids[string_id] for string_id in nodes])
+        # Only predicates are string ids; node ids are positions in ``nodes``
+        edges[1::3] = array('I', [string_ids[string_id] for string_id in edges[1::3]])
+        return cls(nodes, edges)
+
+    @property
+    def node_count(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        return len(self.edges) // 3
+
+    def labels(self):
+        strings = STRINGS.strings
+        return [strings[string_id] for string_id in self.nodes]
+
+    def triples(self):
+        """Edges as (subject, predicate, object) tuples of interned strings"""
+        strings = STRINGS.strings
+        labels = self.labels()
+        edges = self.edges
+        return [
+            (labels[edges[i]], strings[edges[i + 1]], labels[edges[i + 2]])
+            for i in range(0, len(edges), 3)
+        ]
+
+    def materialize(self, data):
+        """``data`` with the ``nodes``, ``edges`` and ``rawTriples`` lists it was parsed into"""
+        triples = self.triples()
+        return {
+            **data,
+            'nodes': [node_json(label) for label in self.labels()],
+            'edges': [edge_json(triple) for triple in triples],
+            'rawTriples': triples
+        }
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.nodes.__sizeof__() + self.edges.__sizeof__()
+
+
+def pack_triples(triples):
+    """Picklable (strings, nodes, edges) form of a CompactGraph of ``triples``
+
+    Laid out like a CompactGraph, except that string ids index the returned
+    ``strings`` list rather than the process-wide table, so the result can be
+    built in one process and turned into a CompactGraph in another.
+    """
+    string_ids = {}
+    strings = []
+    node_ids = {}
+    node_strings = array('I')
+    edges = array('I')
+
+    def string_id(text):
+        index = string_ids.get(text)
+        if index is None:
+            index = string_ids[text] = len(strings)
+            strings.append(text)
+        return index
+
+    def node_id(label):
+        index = node_ids.get(label)
+        if index is None:
+            index = node_ids[label] = len(node_strings)
+            node_strings.append(string_id(label))
+        return index
+
+    for subject, predicate, obj in triples:
+        edges.append(node_id(subject))
+        edges.append(string_id(predicate))
+        edges.append(node_id(obj))
+    return strings, node_strings, edges
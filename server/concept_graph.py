@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Global Concept Graph
+One knowledge graph across all videos, with concept labels normalized so
+that "Neural Network", "neural networks" and an aliased "NN" are one node
+
+Labels are normalized by case folding, treating underscores as spaces,
+dropping a leading article and reducing the last word to a singular form.
+An alias table maps further spellings to a canonical concept. When an alias
+joins two concepts that already exist, they are merged with union-find and
+their edges are moved onto the surviving concept.
+
+Each video's share of the occurrence counts is remembered, so a video can be
+removed again; concepts no video mentions any more are dropped and their ids
+reused.
+"""
+
+import json
+import re
+import threading
+import unicodedata
+
+_SPACE = re.compile(r'\s+')
+_EDGE_CHARACTERS = ' "\'`.,;:!?()[]{}-'
+_ARTICLES = ('the ', 'a ', 'an ')
+
+
+def singularize(word):
+    """Conservative plural-to-singular for English nouns"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'ches', 'shes', 'xes')):
+        return word[:-2]
+    if word.endswith(('ss', 'us', 'is', 'ics')):
+        return word
+    if word.endswith('s'):
+        return word[:-1]
+    return word
+
+
+def normalize(label):
+    """Canonical key of a concept label, or '' if nothing is left"""
+    text = unicodedata.normalize('NFKC', str(label)).casefold().replace('_', ' ')
+    text = _SPACE.sub(' ', text).strip(_EDGE_CHARACTERS)
+    for article in _ARTICLES:
+        if text.startswith(article) and len(text) > len(article):
+            text = text[len(article):]
+            break
+    if not text:
+        return ''
+    words = text.split(' ')
+    words[-1] = singularize(words[-1])
+    return ' '.join(words)
+
+
+def load_aliases(path):
+    """Alias table from a JSON object of {alias: canonical label}"""
+    with open(path, encoding='utf-8') as f:
+        aliases = json.load(f)
+    if not isinstance(aliases, dict):
+        raise ValueError(f"Alias file {path} must contain a JSON object")
+    return aliases
+
+
+class UnionFind:
+    """Disjoint sets of integer ids with path halving and union by size"""
+
+    def __init__(self):
+        self._parent = []
+        self._size = []
+        self._free = []
+
+    def add(self):
+        if self._free:
+            return self._free.pop()
+        new_id = len(self._parent)
+        self._parent.append(new_id)
+        self._size.append(1)
+        return new_id
+
+    def release(self, ids):
+        """Make ``ids``, a whole set that nothing refers to any more, available to ``add``"""
+        for item in ids:
+            self._parent[item] = item
+            self._size[item] = 1
+            self._free.append(item)
+
+    def find(self, item):
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Join the sets of ``a`` and ``b`` and return (root, absorbed root), or None"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return None
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        return a, b
+
+
+class ConceptGraph:
+    """Thread-safe global concept graph, updated incrementally per batch
+
+    Adjacency always refers to current root concepts: merging two concepts
+    rewrites the edges of the absorbed one, which costs O(its degree) and only
+    happens when an alias joins two existing concepts.
+    """
+
+    def __init__(self, aliases=None):
+        self._lock = threading.RLock()
+        self._aliases = {}      # normalized alias -> normalized canonical key
+        self._ids = {}          # normalized key -> concept id (resolve with find)
+        self._sets = UnionFind()
+        self._keys = []         # concept id -> canonical key
+        self._names = []        # concept id -> normalized keys in _ids that lead to it
+        self._members = []      # concept id -> ids merged into it, itself included
+        self._forms = []        # concept id -> {surface label: occurrences}
+        self._videos = []       # concept id -> {video id: None}
+        self._out = []          # concept id -> {target id: {predicate: occurrences}}
+        self._in = []           # concept id -> {source id: None}
+        # Occurrences each video added, by the concept ids they had then
+        self._video_forms = {}      # video id -> {(concept id, label): occurrences}
+        self._video_relations = {}  # video id -> {(source id, target id, predicate): occurrences}
+        self.concept_count = 0
+        self.relation_count = 0
+        for alias, canonical in (aliases or {}).items():
+            self.add_alias(alias, canonical)
+
+    def _new_concept(self, key):
+        concept = self._sets.add()
+        slots = (self._keys, self._names, self._members, self._forms, self._videos, self._out, self._in)
+        values = (key, [key], [concept], {}, {}, {}, {})
+        if concept == len(self._keys):
+            for slot, value in zip(slots, values):
+                slot.append(value)
+        else:
+            for slot, value in zip(slots, values):
+                slot[concept] = value
+        self._ids[key] = concept
+        self.concept_count += 1
+        return concept
+
+    def _concept(self, label, create=True):
+        key = normalize(label)
+        if not key:
+            return None
+        key = self._aliases.get(key, key)
+        concept = self._ids.get(key)
+        if concept is None:
+            if not create:
+                return None
+            concept = self._new_concept(key)
+        return self._sets.find(concept)
+
+    def add(self, video_id, triples, labels=()):
+        """Add a batch's new triples and node labels seen in ``video_id``"""
+        with self._lock:
+            video_forms = self._video_forms.setdefault(video_id, {})
+            video_relations = self._video_relations.setdefault(video_id, {})
+            for subject, predicate, obj in triples:
+                source = self._concept(subject)
+                target = self._concept(obj)
+                if source is None or target is None:
+                    continue
+                self._seen(source, subject, video_id, video_forms)
+                self._seen(target, obj, video_id, video_forms)
+                if source == target:
+                    continue
+                predicates = self._out[source].setdefault(target, {})
+                if predicate not in predicates:
+                    predicates[predicate] = 0
+                    self.relation_count += 1
+                predicates[predicate] += 1
+                self._in[target][source] = None
+                relation = (source, target, predicate)
+                video_relations[relation] = video_relations.get(relation, 0) + 1
+            for label in labels:
+                concept = self._concept(label)
+                if concept is not None:
+                    self._seen(concept, label, video_id, video_forms)
+
+    def _seen(self, concept, label, video_id, video_forms):
+        forms = self._forms[concept]
+        forms[label] = forms.get(label, 0) + 1
+        self._videos[concept][video_id] = None
+        form = (concept, label)
+        video_forms[form] = video_forms.get(form, 0) + 1
+
+    def remove(self, video_id):
+        """Take back everything ``video_id`` added; returns False if it added nothing"""
+        with self._lock:
+            video_forms = self._video_forms.pop(video_id, None)
+            video_relations = self._video_relations.pop(video_id, None)
+            if video_forms is None:
+                return False
+            find = self._sets.find
+            for (source, target, predicate), count in video_relations.items():
+                source, target = find(source), find(target)
+                # A merge of the two ends already dropped the relation
+                predicates = self._out[source].get(target) if source != target else None
+                if not predicates or predicate not in predicates:
+                    continue
+                predicates[predicate] -= count
+                if predicates[predicate] <= 0:
+                    del predicates[predicate]
+                    self.relation_count -= 1
+                    if not predicates:
+                        del self._out[source][target]
+                        del self._in[target][source]
+            touched = {}
+            for (concept, label), count in video_forms.items():
+                concept = find(concept)
+                touched[concept] = None
+                forms = self._forms[concept]
+                if forms.get(label, 0) > count:
+                    forms[label] -= count
+                else:
+                    forms.pop(label, None)
+            for concept in touched:
+                videos = self._videos[concept]
+                videos.pop(video_id, None)
+                if not videos:
+                    self._drop(concept)
+            return True
+
+    def _drop(self, concept):
+        """Delete a concept no video mentions; its relations are already gone"""
+        for key in self._names[concept]:
+            del self._ids[key]
+        members = self._members[concept]
+        for member in members:
+            self._keys[member] = self._names[member] = self._members[member] = None
+            self._forms[member] = self._videos[member] = None
+            self._out[member] = self._in[member] = None
+        self._sets.release(members)
+        self.concept_count -= 1
+
+    def add_alias(self, alias, canonical):
+        """Map ``alias`` to ``canonical``, merging the two concepts if both exist
+
+        Returns True if two existing concepts were merged.
+        """
+        alias_key = normalize(alias)
+        canonical_key = normalize(canonical)
+        if not alias_key or not canonical_key:
+            raise ValueError("Aliases and canonical labels must not be empty")
+        with self._lock:
+            canonical_key = self._aliases.get(canonical_key, canonical_key)
+            if alias_key == canonical_key:
+                return False
+            self._aliases[alias_key] = canonical_key
+            # Aliases that pointed at the alias now point at its canonical form
+            for key, target in self._aliases.items():
+                if target == alias_key:
+                    self._aliases[key] = canonical_key
+
+            alias_id = self._ids.get(alias_key)
+            canonical_id = self._ids.get(canonical_key)
+            if alias_id is None:
+                return False
+            if canonical_id is None:
+                self._ids[canonical_key] = alias_id
+                root = self._sets.find(alias_id)
+                self._keys[root] = canonical_key
+                self._names[root].append(canonical_key)
+                return False
+            merged = self._merge(alias_id, canonical_id)
+            if merged is not None:
+                self._keys[merged] = canonical_key
+            return merged is not None
+
+    def aliases(self):
+        with self._lock:
+            return dict(self._aliases)
+
+    def _merge(self, a, b):
+        joined = self._sets.union(a, b)
+        if joined is None:
+            return None
+        root, absorbed = joined
+        self.concept_count -= 1
+        forms = self._forms[root]
+        for label, count in self._forms[absorbed].items():
+            forms[label] = forms.get(label, 0) + count
+        self._videos[root].update(self._videos[absorbed])
+        self._names[root].extend(self._names[absorbed])
+        self._members[root].extend(self._members[absorbed])
+
+        for target, predicates in self._out[absorbed].items():
+            del self._in[target][absorbed]
+            if target == root:
+                self.relation_count -= len(predicates)
+                continue
+            self._move_predicates(predicates, self._out[root].setdefault(target, {}))
+            self._in[target][root] = None
+        for source in self._in[absorbed]:
+            predicates = self._out[source].pop(absorbed)
+            if source == root:
+                self.relation_count -= len(predicates)
+                continue
+            self._move_predicates(predicates, self._out[source].setdefault(root, {}))
+            self._in[root][source] = None
+
+        self._forms[absorbed] = self._videos[absorbed] = None
+        self._out[absorbed] = self._in[absorbed] = None
+        self._names[absorbed] = self._members[absorbed] = None
+        return root
+
+    def _move_predicates(self, predicates, destination):
+        for predicate, count in predicates.items():
+            if predicate in destination:
+                self.relation_count -= 1
+                destination[predicate] += count
+            else:
+                destination[predicate] = count
+
+    def _label(self, concept):
+        forms = self._forms[concept]
+        return max(forms, key=forms.get) if forms else self._keys[concept]
+
+    def _node_json(self, concept):
+        return {
+            'id': self._keys[concept],
+            'label': self._label(concept),
+            'type': 'concept',
+            'videoCount': len(self._videos[concept]),
+            'degree': len(self._out[concept]) + len(self._in[concept])
+        }
+
+    def _neighbors(self, concept):
+        neighbors = dict.fromkeys(self._out[concept])
+        neighbors.update(self._in[concept])
+        return neighbors
+
+    def _edges_json(self, concepts):
+        edges = []
+        for source in concepts:
+            for target, predicates in self._out[source].items():
+                if target not in concepts:
+                    continue
+                for predicate, count in predicates.items():
+                    edges.append({'from': self._keys[source], 'to': self._keys[target],
+                                  'label': predicate, 'type': 'relationship', 'count': count})
+        return edges
+
+    def neighborhood(self, label, depth=1, limit=100, video_limit=50):
+        """Concepts within ``depth`` hops of ``label`` and the edges among them, or None
+
+        Hops ignore edge direction. When more than ``limit`` concepts are in
+        range, those seen in the most videos are kept.
+        """
+        with self._lock:
+            center = self._concept(label, create=False)
+            if center is None:
+                return None
+            included = {center: None}
+            frontier = [center]
+            truncated = False
+            for _ in range(depth):
+                candidates = {}
+                for concept in frontier:
+                    for neighbor in self._neighbors(concept):
+                        if neighbor not in included:
+                            candidates[neighbor] = None
+                if len(included) + len(candidates) > limit:
+                    truncated = True
+                    ranked = sorted(candidates, key=lambda c: len(self._videos[c]), reverse=True)
+                    candidates = dict.fromkeys(ranked[:max(0, limit - len(included))])
+                included.update(candidates)
+                frontier = list(candidates)
+                if not frontier or truncated:
+                    break
+
+            concept = self._node_json(center)
+            concept['forms'] = sorted(self._forms[center], key=self._forms[center].get, reverse=True)
+            concept['videoIds'] = list(self._videos[center])[:video_limit]
+            return {
+                'concept': concept,
+                'depth': depth,
+                'truncated': truncated,
+                'nodes': [self._node_json(c) for c in included],
+                'edges': self._edges_json(included)
+            }
+
+    def shortest_path(self, start_label, end_label, max_depth=6, max_visits=100000):
+        """Fewest-hop path between two concepts, ignoring direction
+
+        Returns None if either concept is unknown, otherwise a dict whose
+        ``path`` is empty when no path within ``max_depth`` hops was found.
+        Searches from both ends at once, expanding the smaller frontier.
+        """
+        with self._lock:
+            start = self._concept(start_label, create=False)
+            end = self._concept(end_label, create=False)
+            if start is None or end is None:
+                return None
+            path = self._bidirectional_search(start, end, max_depth, max_visits)
+            edges = []
+            for source, target in zip(path, path[1:]):
+                forward = self._out[source].get(target)
+                predicates = forward if forward else self._out[target][source]
+                edges.append({
+                    'from': self._keys[source if forward else target],
+                    'to': self._keys[target if forward else source],
+                    'label': max(predicates, key=predicates.get),
+                    'type': 'relationship'
+                })
+            return {
+                'path': [self._keys[c] for c in path],
+                'hops': max(0, len(path) - 1),
+                'nodes': [self._node_json(c) for c in path],
+                'edges': edges
+            }
+
+    def _bidirectional_search(self, start, end, max_depth, max_visits):
+        if start == end:
+            return [start]
+        parents = ({start: None}, {end: None})
+        frontiers = ([start], [end])
+        visits = 0
+        for _ in range(max_depth):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, other = parents[side], parents[1 - side]
+            next_frontier = []
+            for concept in frontiers[side]:
+                for neighbor in self._neighbors(concept):
+                    if neighbor in mine:
+                        continue
+                    mine[neighbor] = concept
+                    if neighbor in other:
+                        return self._join_paths(parents, neighbor)
+                    next_frontier.append(neighbor)
+                    visits += 1
+                    if visits > max_visits:
+                        return []
+            if not next_frontier:
+                return []
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        return []
+
+    @staticmethod
+    def _join_paths(parents, meeting):
+        path = []
+        concept = meeting
+        while concept is not None:
+            path.append(concept)
+            concept = parents[0][concept]
+        path.reverse()
+        concept = parents[1][meeting]
+        while concept is not None:
+            path.append(concept)
+            concept = parents[1][concept]
+        return path
+
+    def stats(self):
+        return {
+            'concepts': self.concept_count,
+            'relations': self.relation_count,
+            'aliases': len(self._aliases)
+        }
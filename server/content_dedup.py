@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Duplicate Push Detection
+Bounded index from a hash of a payload's raw AI content to the graph id it
+was stored under
+
+The extension re-sends the same ``rawContent`` on manual pushes, retries and
+from several tabs on the same video. Hashing the content, normalized for
+line endings, surrounding whitespace and blank lines, together with its
+videoId and batchId identifies a repeat before it is parsed, so ingest can
+answer with the graph id it already has. The index keeps the most recently
+seen keys up to a fixed count, so lookups are O(1) and memory is constant.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Content is normalized and hashed in pieces of about this many characters
+HASH_CHUNK_CHARS = 64 * 1024
+
+
+def normalize_content(raw_content):
+    """Raw AI content with line endings, line padding and blank lines normalized away"""
+    lines = (line.strip() for line in raw_content.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def normalized_pieces(raw_content):
+    """The non-empty parts of ``normalize_content(raw_content)`` between which it has a newline
+
+    Pieces end at line boundaries, so a large payload is normalized about
+    HASH_CHUNK_CHARS characters at a time instead of being copied whole.
+    """
+    start = 0
+    while start < len(raw_content):
+        cut = raw_content.find('\n', start + HASH_CHUNK_CHARS)
+        end = len(raw_content) if cut < 0 else cut + 1
+        piece = normalize_content(raw_content[start:end])
+        if piece:
+            yield piece
+        start = end
+
+
+class DedupIndex:
+    """Thread-safe LRU map of content hash -> graph id"""
+
+    def __init__(self, enabled=True, max_entries=10000):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ids = OrderedDict()   # content hash -> graph id, least recently seen first
+
+    def __len__(self):
+        return len(self._ids)
+
+    def key(self, data):
+        """Content hash of an ``ai_triples`` payload, or None if it is not deduplicated"""
+        if not self.enabled:
+            return None
+        raw_content = data.get('rawContent')
+        if not raw_content or not isinstance(raw_content, str) or data.get('contentType') != 'ai_triples':
+            return None
+        metadata = data.get('metadata') or {}
+        digest = hashlib.blake2b(digest_size=16)
+        # Separators keep e.g. videoId "a1" + batchId "2" apart from "a" + "12"
+        for part in (metadata.get('videoId'), metadata.get('batchId')):
+            digest.update(str(part).encode('utf-8', 'surrogatepass'))
+            digest.update(b'\0')
+        separator = b''
+        for piece in normalized_pieces(raw_content):
+            digest.update(separator)
+            digest.update(piece.encode('utf-8', 'surrogatepass'))
+            separator = b'\n'
+        return digest.digest()
+
+    def get(self, key):
+        """Graph id stored for ``key``, or None"""
+        if key is None:
+            return None
+        with self._lock:
+            graph_id = self._ids.get(key)
+            if graph_id is not None:
+                self._ids.move_to_end(key)
+            return graph_id
+
+    def add(self, key, graph_id):
+        if key is None:
+            return
+        with self._lock:
+            self._ids[key] = graph_id
+            self._ids.move_to_end(key)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    def discard(self, key):
+        """Forget a key whose graph is no longer stored"""
+        with self._lock:
+            self._ids.pop(key, None)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._ids),
+            'max_entries': self.max_entries
+        }
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - In-process Event Bus
+Fans out ingest events to streaming dashboard connections
+"""
+
+import queue
+import threading
+
+
+class Subscription:
+    """A single subscriber's bounded event queue
+
+    Publishing never blocks: when the queue is full the oldest event is
+    dropped and ``dropped`` is incremented so the consumer knows it missed
+    updates and should resynchronise.
+    """
+
+    def __init__(self, bus, max_queue):
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, event):
+        """Enqueue an event without blocking, dropping the oldest on overflow"""
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Wait for the next event, returning None on timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def take_dropped(self):
+        """Return and reset the number of events dropped since the last call"""
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """Publish/subscribe fanout where slow subscribers never stall publishers"""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.closed = False
+
+    def subscribe(self):
+        subscription = Subscription(self, self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type, payload):
+        """Deliver an event to every current subscriber"""
+        event = (event_type, payload)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.offer(event)
+
+    def close(self):
+        """Tell every subscriber the server is shutting down"""
+        self.closed = True
+        self.publish('shutdown', {})
+
+    def __len__(self):
+        return len(self._subscribers)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Server-side Graph Layout
+Force-directed node positions for merged video graphs, computed on a
+background thread and cached per graph version
+
+The dashboard otherwise runs a full force simulation in the browser every
+time a merged graph is shown, which freezes the tab for graphs with
+thousands of nodes. Layouts use a vectorized Fruchterman-Reingold model in
+NumPy. Repulsion only reaches a few ideal edge lengths, like d3's
+``distanceMax``; unlimited 1/d repulsion adds up over the whole graph and
+stretches every edge further the bigger the graph gets. Above
+EXACT_REPULSION_MAX_NODES nodes, repulsion is approximated with a grid of
+cell centroids, a one-level Barnes-Hut. When a video grows, the new layout
+starts from the previous positions, so existing nodes barely move.
+
+NumPy is optional. Without it layouts are disabled and the dashboard lays
+graphs out itself.
+"""
+
+import time
+
+from graph_worker import VideoGraphWorker
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Preferred distance between linked nodes; matches the dashboard's link distance
+IDEAL_EDGE_LENGTH = 60.0
+# Up to this many nodes, repulsion is computed between every pair of nodes
+EXACT_REPULSION_MAX_NODES = 300
+# Nodes per grid cell when repulsion is approximated
+NODES_PER_CELL = 16
+COLD_ITERATIONS = 150
+WARM_ITERATIONS = 40
+# Pull towards the center, keeping disconnected components close together
+GRAVITY = 0.05
+# Nodes farther apart than this many ideal edge lengths do not repel each other
+REPULSION_RANGE = 3.0
+_CHUNK_ROWS = 256
+
+
+def _repulsion(x, y, other_x, other_y, weights, k2):
+    """Summed repulsion on points (x, y) from weighted points (other_x, other_y)"""
+    dx = x[:, None] - other_x[None, :]
+    dy = y[:, None] - other_y[None, :]
+    dist2 = dx * dx + dy * dy
+    np.maximum(dist2, 0.01, out=dist2)
+    # k^2 / d along the unit vector, i.e. delta * k^2 / d^2
+    scale = weights * k2 / dist2
+    scale[dist2 > REPULSION_RANGE * REPULSION_RANGE * k2] = 0.0
+    return np.stack([(dx * scale).sum(axis=1), (dy * scale).sum(axis=1)], axis=1)
+
+
+def _repulsion_exact(pos, k2, rng):
+    x, y = pos[:, 0], pos[:, 1]
+    displacement = np.empty_like(pos)
+    for start in range(0, len(pos), _CHUNK_ROWS):
+        rows = slice(start, start + _CHUNK_ROWS)
+        displacement[rows] = _repulsion(x[rows], y[rows], x, y, 1.0, k2)
+    return displacement
+
+
+def _repulsion_grid(pos, k2, rng):
+    """Repulsion from the centroids of other grid cells and the nodes of a node's own cell
+
+    Cost is about n * (n / NODES_PER_CELL + NODES_PER_CELL) instead of n^2.
+    The grid origin moves by a random fraction of a cell on every call;
+    with fixed cells, nodes on either side of a border only feel each other
+    through the centroids and pile up along it.
+    """
+    n = len(pos)
+    cells_per_side = max(2, int(np.sqrt(n / NODES_PER_CELL)))
+    low = pos.min(axis=0)
+    cell_size = np.maximum(pos.max(axis=0) - low, 1e-9) / cells_per_side
+    low = low - rng.uniform(0, 1, 2) * cell_size
+    cells_per_side += 1
+    size = cell_size * cells_per_side
+    cell_xy = np.minimum((pos - low) / size * cells_per_side, cells_per_side - 1).astype(np.intp)
+    cell = cell_xy[:, 0] * cells_per_side + cell_xy[:, 1]
+
+    cell_count = cells_per_side * cells_per_side
+    mass = np.bincount(cell, minlength=cell_count).astype(float)
+    sums = np.stack([np.bincount(cell, weights=pos[:, axis], minlength=cell_count) for axis in (0, 1)], axis=1)
+    occupied = np.nonzero(mass)[0]
+    centroids = sums[occupied] / mass[occupied, None]
+    weights = mass[occupied]
+    # Column of each node's own cell among the occupied cells
+    own = np.searchsorted(occupied, cell)
+
+    # Push from every occupied cell, then replace the push of a node's own
+    # cell by exact pushes from each node in it
+    displacement = np.empty_like(pos)
+    for start in range(0, n, _CHUNK_ROWS):
+        rows = slice(start, start + _CHUNK_ROWS)
+        displacement[rows] = _repulsion(pos[rows, 0], pos[rows, 1], centroids[:, 0], centroids[:, 1], weights, k2)
+    displacement -= _pairwise(pos, centroids[own], mass[cell], k2)
+
+    # Every (node, node in the same cell) pair, from nodes sorted by cell;
+    # a node paired with itself contributes nothing
+    order = np.argsort(cell, kind='stable')
+    cell_start = np.concatenate(([0], np.cumsum(mass[occupied]).astype(np.intp)[:-1]))
+    members = mass[cell].astype(np.intp)
+    first = np.repeat(np.arange(n), members)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(members) - members, members)
+    second = order[np.repeat(cell_start[own], members) + offsets]
+    push = _pairwise(pos[first], pos[second], 1.0, k2)
+    for axis in (0, 1):
+        displacement[:, axis] += np.bincount(first, weights=push[:, axis], minlength=n)
+    return displacement
+
+
+def _pairwise(pos, other, weights, k2):
+    """Repulsion on each point of ``pos`` from the matching weighted point of ``other``"""
+    delta = pos - other
+    dist2 = np.maximum(np.einsum('ij,ij->i', delta, delta), 0.01)
+    scale = weights * k2 / dist2
+    scale[dist2 > REPULSION_RANGE * REPULSION_RANGE * k2] = 0.0
+    return delta * scale[:, None]
+
+
+def force_layout(node_count, sources, targets, initial=None, iterations=None, seed=0):
+    """Positions of ``node_count`` nodes linked by ``sources[i]`` -> ``targets[i]``
+
+    ``initial`` is an optional (node_count, 2) array of starting positions
+    with NaN rows for nodes that have none yet; new nodes start next to their
+    placed neighbors. Returns an (node_count, 2) array centered on the origin.
+    """
+    k = IDEAL_EDGE_LENGTH
+    rng = np.random.default_rng(seed)
+    sources = np.asarray(sources, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+    if node_count == 0:
+        return np.zeros((0, 2))
+
+    radius = k * np.sqrt(node_count)
+    warm = initial is not None and not np.isnan(initial).all()
+    if warm:
+        pos = np.array(initial, dtype=float)
+        missing = np.isnan(pos[:, 0])
+        if missing.any():
+            # Mean position of each new node's already placed neighbors
+            placed = ~missing
+            sums = np.zeros((node_count, 2))
+            counts = np.zeros(node_count)
+            for a, b in ((sources, targets), (targets, sources)):
+                linked = missing[a] & placed[b]
+                np.add.at(sums, a[linked], pos[b[linked]])
+                np.add.at(counts, a[linked], 1)
+            anchored = missing & (counts > 0)
+            pos[anchored] = sums[anchored] / counts[anchored, None]
+            unanchored = missing & (counts == 0)
+            # Within the existing layout, whose extent sets the grid cell size
+            pos[unanchored] = rng.uniform(pos[placed].min(axis=0), pos[placed].max(axis=0),
+                                          (int(unanchored.sum()), 2))
+            pos[missing] += rng.normal(0, k / 2, (int(missing.sum()), 2))
+        temperature = k / 4
+        iterations = iterations or WARM_ITERATIONS
+    else:
+        pos = rng.uniform(-radius / 2, radius / 2, (node_count, 2))
+        temperature = radius / 4
+        iterations = iterations or COLD_ITERATIONS
+    cooling = (1.0 / max(temperature, 1.0)) ** (1.0 / iterations)
+
+    k2 = k * k
+    repulsion = _repulsion_exact if node_count <= EXACT_REPULSION_MAX_NODES else _repulsion_grid
+    for _ in range(iterations):
+        displacement = repulsion(pos, k2, rng)
+        if len(sources):
+            delta = pos[sources] - pos[targets]
+            # d^2 / k along the unit vector, i.e. delta * d / k
+            pull = delta * (np.sqrt(np.einsum('ij,ij->i', delta, delta)) / k)[:, None]
+            for axis in (0, 1):
+                displacement[:, axis] -= np.bincount(sources, weights=pull[:, axis], minlength=node_count)
+                displacement[:, axis] += np.bincount(targets, weights=pull[:, axis], minlength=node_count)
+        displacement -= GRAVITY * (pos - pos.mean(axis=0))
+
+        length = np.sqrt(np.einsum('ij,ij->i', displacement, displacement))
+        np.maximum(length, 1e-9, out=length)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature *= cooling
+    return pos - pos.mean(axis=0)
+
+
+class LayoutService(VideoGraphWorker):
+    """Lays out merged video graphs on a background thread, newest version per video"""
+
+    name = 'graph-layout'
+
+    def __init__(self, enabled=True, max_nodes=20000, on_layout=None):
+        super().__init__(enabled=enabled and np is not None, on_result=on_layout)
+        self.max_nodes = max_nodes
+        self.skipped = 0
+
+    def compute(self, video_graph, previous=None):
+        """Lay out the current version of ``video_graph``, starting from ``previous`` if any"""
+        version, instance, labels, pairs = video_graph.structure()
+        if previous and previous['instance'] == instance and previous['version'] == version:
+            return None
+        if len(labels) > self.max_nodes:
+            self.skipped += 1
+            return None
+
+        started = time.perf_counter()
+        index = {label: i for i, label in enumerate(labels)}
+        sources = [index[a] for a, _ in pairs]
+        targets = [index[b] for _, b in pairs]
+        initial = None
+        if previous and previous['instance'] == instance:
+            initial = np.full((len(labels), 2), np.nan)
+            for label, i in index.items():
+                xy = previous['positions'].get(label)
+                if xy is not None:
+                    initial[i] = xy
+        positions = force_layout(len(labels), sources, targets, initial=initial)
+        return {
+            'videoId': video_graph.video_id,
+            'instance': instance,
+            'version': version,
+            'warmStart': initial is not None,
+            'took_ms': round((time.perf_counter() - started) * 1000, 1),
+            'positions': {label: [round(float(x), 1), round(float(y), 1)]
+                          for label, (x, y) in zip(labels, positions)}
+        }
+
+    def stats(self):
+        return {
+            **super().stats(),
+            'max_nodes': self.max_nodes,
+            'layouts': len(self),
+            'skipped': self.skipped
+        }
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - In-memory Graph Store
+Bounded, indexed storage for graphs received by the live graph server
+"""
+
+import itertools
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+def estimate_size(obj):
+    """Approximate the memory footprint of a JSON-like object in bytes"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key) + estimate_size(value)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += estimate_size(item)
+    return size
+
+
+class GraphStore:
+    """Bounded in-memory graph store with LRU/age eviction and secondary indexes
+
+    Every graph gets a server-assigned unique id. Graphs are kept in insertion
+    order for listing and in access order for eviction. The store is capped
+    by graph count and by approximate bytes; either limit set to 0 disables
+    it. Lookups by graph id are O(1), and graphs can also be found by
+    ``metadata.videoId``, ``channelName`` and ``batchId``. Each stored graph
+    also gets an increasing sequence number, its position for ``page``.
+    """
+
+    INDEXED_FIELDS = {
+        'video': 'videoId',
+        'channel': 'channelName',
+        'batch': 'batchId',
+    }
+
+    def __init__(self, max_graphs=1000, max_bytes=256 * 1024 * 1024, max_age=0):
+        self.max_graphs = max_graphs
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.RLock()
+        self._graphs = {}            # graph_id -> record, insertion order
+        self._lru = OrderedDict()    # graph_id -> None, least recently used first
+        self._sizes = {}             # graph_id -> approximate bytes
+        self._added_at = {}          # graph_id -> monotonic insertion time
+        self._sequence = {}          # graph_id -> position in insertion order
+        self._next_sequence = itertools.count(1)
+        self._indexes = {name: {} for name in self.INDEXED_FIELDS}
+
+        self.total_bytes = 0
+        self.evictions = 0
+        self._version = 0            # changes whenever graphs are added or removed
+
+    def __len__(self):
+        return len(self._graphs)
+
+    def __contains__(self, graph_id):
+        return graph_id in self._graphs
+
+    def add(self, data, timestamp, graph_id=None, graph=None):
+        """Store a graph payload and return its graph id
+
+        A new unique id is assigned unless ``graph_id`` is given, which is
+        only done when restoring graphs from persistent storage. ``graph`` is
+        the payload's parsed CompactGraph, if it has one.
+        """
+        return self.add_many([(data, timestamp, graph_id, graph)])[0]
+
+    def add_many(self, items):
+        """Store (data, timestamp, graph_id, graph) items and return their graph ids
+
+        The lock is taken and eviction runs once for the whole batch.
+        """
+        records = []
+        for data, timestamp, graph_id, graph in items:
+            record = {
+                'id': graph_id if graph_id is not None else uuid.uuid4().hex,
+                'timestamp': timestamp,
+                'data': data,
+                'graph': graph
+            }
+            # Sizing walks the whole payload, so do it before taking the lock
+            records.append((record, estimate_size(record)))
+
+        with self._lock:
+            now = time.monotonic()
+            for record, size in records:
+                graph_id = record['id']
+                if graph_id in self._graphs:
+                    self._remove(graph_id)
+                self._graphs[graph_id] = record
+                self._lru[graph_id] = None
+                self._sizes[graph_id] = size
+                self._added_at[graph_id] = now
+                self._sequence[graph_id] = next(self._next_sequence)
+                self.total_bytes += size
+                self._index(graph_id, record['data'])
+
+            if records:
+                self._version += 1
+                self._evict(keep=records[-1][0]['id'])
+            return [record['id'] for record, _ in records]
+
+    def get(self, graph_id):
+        """Return a stored graph record by id, or None"""
+        with self._lock:
+            self._expire()
+            record = self._graphs.get(graph_id)
+            if record is not None:
+                self._lru.move_to_end(graph_id)
+            return record
+
+    @property
+    def version(self):
+        """Counter that changes whenever graphs are added, evicted or removed"""
+        with self._lock:
+            self._expire()
+            return self._version
+
+    def page(self, limit, before=None, after=None, video_id=None, channel=None, batch_id=None, where=None):
+        """Up to ``limit`` matching graphs next to a position, oldest first
+
+        Returns a list of (sequence number, record) and whether more matching
+        graphs lie beyond the page. With ``after`` the page holds the oldest
+        graphs positioned after it, otherwise the newest graphs positioned
+        before ``before`` (or at all). ``where(record)`` filters further. The
+        positions stay valid when the graphs at them are evicted.
+        """
+        with self._lock:
+            self._expire()
+            if limit <= 0:
+                return [], False
+            ids = self._matching_ids(video_id, channel, batch_id)
+            if after is None:
+                ids = reversed(ids)
+            records = []
+            more = False
+            for graph_id in ids:
+                sequence = self._sequence[graph_id]
+                if after is not None and sequence <= after:
+                    continue
+                if before is not None and sequence >= before:
+                    if after is None:
+                        continue
+                    break
+                record = self._graphs[graph_id]
+                if where is not None and not where(record):
+                    continue
+                if len(records) == limit:
+                    more = True
+                    break
+                records.append((sequence, record))
+            if after is None:
+                records.reverse()
+            return records, more
+
+    def remove(self, graph_id):
+        """Remove a graph from the store, returning its record or None"""
+        with self._lock:
+            return self._remove(graph_id)
+
+    def stats(self):
+        """Snapshot of store occupancy and eviction counters"""
+        with self._lock:
+            return {
+                'graphs': len(self._graphs),
+                'bytes': self.total_bytes,
+                'max_graphs': self.max_graphs,
+                'max_bytes': self.max_bytes,
+                'max_age': self.max_age,
+                'evictions': self.evictions
+            }
+
+    def _matching_ids(self, video_id, channel, batch_id):
+        """Ids of graphs matching every given metadata field, in insertion order"""
+        criteria = {'video': video_id, 'channel': channel, 'batch': batch_id}
+        matches = None
+        for name, value in criteria.items():
+            if value is None:
+                continue
+            ids = self._indexes[name].get(self._index_key(value), {})
+            if matches is None:
+                matches = ids
+            else:
+                matches = [graph_id for graph_id in matches if graph_id in ids]
+        return self._graphs if matches is None else matches
+
+    @staticmethod
+    def _index_key(value):
+        # batchId arrives as a number from the extension but as a string from
+        # query parameters, so index everything by its string form
+        return str(value)
+
+    def _index(self, graph_id, data):
+        metadata = data.get('metadata') or {}
+        for name, field in self.INDEXED_FIELDS.items():
+            value = metadata.get(field)
+            if value is None:
+                continue
+            self._indexes[name].setdefault(self._index_key(value), {})[graph_id] = None
+
+    def _unindex(self, graph_id, data):
+        metadata = data.get('metadata') or {}
+        for name, field in self.INDEXED_FIELDS.items():
+            value = metadata.get(field)
+            if value is None:
+                continue
+            key = self._index_key(value)
+            ids = self._indexes[name].get(key)
+            if ids is None:
+                continue
+            ids.pop(graph_id, None)
+            if not ids:
+                del self._indexes[name][key]
+
+    def _remove(self, graph_id):
+        record = self._graphs.pop(graph_id, None)
+        if record is None:
+            return None
+        del self._lru[graph_id]
+        del self._added_at[graph_id]
+        del self._sequence[graph_id]
+        self._version += 1
+        self.total_bytes -= self._sizes.pop(graph_id)
+        self._unindex(graph_id, record['data'])
+        return record
+
+    def _expire(self):
+        if not self.max_age:
+            return
+        cutoff = time.monotonic() - self.max_age
+        # Insertion order is also age order, so stop at the first fresh graph
+        while self._graphs:
+            graph_id = next(iter(self._graphs))
+            if self._added_at[graph_id] > cutoff:
+                break
+            self._remove(graph_id)
+            self.evictions += 1
+
+    def _evict(self, keep=None):
+        self._expire()
+        while self._lru and self._over_capacity():
+            graph_id = next(iter(self._lru))
+            if graph_id == keep:
+                # Never evict the graph that was just added, even if it alone
+                # exceeds the byte cap
+                break
+            self._remove(graph_id)
+            self.evictions += 1
+
+    def _over_capacity(self):
+        if self.max_graphs and len(self._graphs) > self.max_graphs:
+            return True
+        if self.max_bytes and self.total_bytes > self.max_bytes:
+            return True
+        return False
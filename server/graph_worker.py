@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Background Video Graph Workers
+Keep one derived result per merged video graph, such as its layout or its
+centrality metrics, up to date on a background thread
+
+Ingest only schedules a video; the work happens off the request path.
+Videos scheduled again before their turn are queued once and processed at
+their latest version, so a burst of batches costs one computation.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class VideoGraphWorker:
+    """Background thread keeping the newest result of ``compute`` per video
+
+    Subclasses implement ``compute(video_graph, previous)``, which returns a
+    dict with at least ``instance`` and ``version`` keys, or None to keep the
+    previous result.
+    """
+
+    name = 'video-graph-worker'
+
+    def __init__(self, enabled=True, on_result=None):
+        self.enabled = enabled
+        self.on_result = on_result      # called with each new result
+        self.computed = 0
+        self.compute_seconds = 0.0
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()   # video id -> VideoGraph
+        self._results = {}              # video id -> result dict
+        self._running = None            # video id being computed, None once discarded
+        self._thread = None
+
+    def schedule(self, video_graph):
+        if not self.enabled:
+            return
+        with self._cond:
+            self._pending[video_graph.video_id] = video_graph
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def discard(self, video_id):
+        """Forget a video's result, e.g. when its merged graph is evicted"""
+        with self._cond:
+            self._pending.pop(video_id, None)
+            self._results.pop(video_id, None)
+            if self._running == video_id:
+                self._running = None
+
+    def get(self, video_id):
+        with self._cond:
+            return self._results.get(video_id)
+
+    def is_pending(self, video_id):
+        with self._cond:
+            return video_id in self._pending or self._running == video_id
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def __len__(self):
+        return len(self._results)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                video_id, video_graph = self._pending.popitem(last=False)
+                previous = self._results.get(video_id)
+                self._running = video_id
+            started = time.perf_counter()
+            try:
+                result = self.compute(video_graph, previous)
+            except Exception as e:
+                logger.error(f"{self.name} failed for video {video_id}: {str(e)}")
+                result = None
+            if result is not None:
+                self.computed += 1
+                self.compute_seconds += time.perf_counter() - started
+            with self._cond:
+                # A video evicted while it was being computed stays forgotten
+                if self._running != video_id:
+                    result = None
+                self._running = None
+                if result is not None:
+                    self._results[video_id] = result
+            if result is not None and self.on_result:
+                self.on_result(result)
+
+    def compute(self, video_graph, previous=None):
+        raise NotImplementedError
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'pending': self.pending,
+            'computed': self.computed,
+            'compute_seconds': round(self.compute_seconds, 3)
+        }
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - HTTP Compression
+gzip and zstd request bodies and negotiated, optionally streamed, compressed
+responses
+
+Raw AI content and the node/edge lists parsed from it are very repetitive
+text, so they typically compress 5-10x. zstd needs the optional
+``zstandard`` package; gzip is always available.
+"""
+
+import gzip
+import io
+import zlib
+
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.wsgi import LimitedStream
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Preferred first when the client accepts several equally
+ENCODINGS = ('zstd', 'gzip') if zstandard else ('gzip',)
+_ALIASES = {'x-gzip': 'gzip'}
+
+
+class DecodedStream(io.RawIOBase):
+    """Readable stream of the decompressed bytes of ``raw``, at most ``max_bytes`` long"""
+
+    def __init__(self, raw, encoding, max_bytes=None):
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.decoded_bytes = 0
+        if encoding == 'gzip':
+            self._reader = gzip.GzipFile(fileobj=raw, mode='rb')
+        else:
+            self._reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # Decompression output is bounded by the size of ``buffer``, so a
+        # small body cannot expand into an unbounded allocation
+        try:
+            count = self._reader.readinto(buffer)
+        except (OSError, EOFError, zlib.error) as e:
+            raise BadRequest(f'Invalid {self.encoding} request body: {str(e)}')
+        except Exception as e:
+            if zstandard is not None and isinstance(e, zstandard.ZstdError):
+                raise BadRequest(f'Invalid {self.encoding} request body: {str(e)}')
+            raise
+        self.decoded_bytes += count
+        if self.max_bytes and self.decoded_bytes > self.max_bytes:
+            raise RequestEntityTooLarge(f'Decompressed request body exceeds {self.max_bytes} bytes')
+        return count
+
+
+class DecompressingMiddleware:
+    """WSGI middleware that decodes gzip or zstd ``Content-Encoding`` request bodies
+
+    The decoded body has no known length, so the Content-Length header is
+    dropped and the stream is marked terminated. ``max_bytes`` caps the
+    decompressed size, rejecting compression bombs with 413 as they are read.
+    """
+
+    def __init__(self, app, max_bytes=None):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def __call__(self, environ, start_response):
+        header = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if header in ('', 'identity'):
+            return self.app(environ, start_response)
+
+        encoding = _ALIASES.get(header, header)
+        if encoding not in ENCODINGS:
+            error = UnsupportedMediaType(
+                f"Unsupported Content-Encoding {header!r}; supported: {', '.join(ENCODINGS)}")
+            return error(environ, start_response)
+
+        raw = environ['wsgi.input']
+        length = environ.get('CONTENT_LENGTH')
+        if length:
+            raw = LimitedStream(raw, int(length))
+        elif 'wsgi.input_terminated' not in environ:
+            raw = io.BytesIO()
+        environ['wsgi.input'] = io.BufferedReader(
+            DecodedStream(raw, encoding, self.max_bytes), STREAM_CHUNK_BYTES)
+        environ['wsgi.input_terminated'] = True
+        environ.pop('CONTENT_LENGTH', None)
+        del environ['HTTP_CONTENT_ENCODING']
+        return self.app(environ, start_response)
+
+
+def negotiate(accept_encodings):
+    """Best response encoding for a werkzeug ``Accept-Encoding`` header, or None"""
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def compress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def _compressor(encoding):
+    if encoding == 'gzip':
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+
+def iter_compressed(chunks, encoding):
+    """Compress an iterable of byte chunks, yielding output about every 64 KB"""
+    compressor = _compressor(encoding)
+    pending = []
+    pending_bytes = 0
+    for chunk in chunks:
+        output = compressor.compress(chunk)
+        if output:
+            pending.append(output)
+            pending_bytes += len(output)
+            if pending_bytes >= STREAM_CHUNK_BYTES:
+                yield b''.join(pending)
+                pending = []
+                pending_bytes = 0
+    pending.append(compressor.flush())
+    yield b''.join(pending)
+
+
+class ResponseCompressor:
+    """Compresses buffered responses for clients that accept gzip or zstd"""
+
+    def __init__(self, enabled=True, min_bytes=1024):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+
+    def __call__(self, request, response):
+        if not self.enabled:
+            return response
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or request.method == 'HEAD'):
+            return response
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_bytes:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity representation, so a
+        # strong validator may no longer be claimed for them
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
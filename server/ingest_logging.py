@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Ingest Logging
+Configures the live graph server's logging pipeline
+
+Two modes are supported, selected with ``GRAPH_LOG_MODE``:
+
+- ``verbose`` (default): the original human-readable, multi-line log of every
+  push, written synchronously from the request thread
+- ``structured``: one compact JSON line per ingest event, handed to a
+  background thread through a queue so formatting and disk I/O never run on
+  the request thread
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+PAYLOAD_MODES = ('full', 'truncate', 'off')
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format records as single-line JSON, merging any ``ingest`` event fields"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'message': record.getMessage()
+        }
+        event = getattr(record, 'ingest', None)
+        if event:
+            entry.update(event)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # The base class formats the message here, on the request thread. Only
+        # merge the message arguments and leave JSON formatting to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class IngestLogger:
+    """Decides what gets logged for each ingest and how much payload to keep"""
+
+    def __init__(self, logger, mode='verbose', payload='full', payload_chars=2000, sample_rate=1.0):
+        if payload not in PAYLOAD_MODES:
+            raise ValueError(f"GRAPH_LOG_PAYLOAD must be one of {', '.join(PAYLOAD_MODES)}, got {payload!r}")
+        self.logger = logger
+        self.mode = mode
+        self.payload = payload
+        self.payload_chars = payload_chars
+        self.sample_rate = sample_rate
+
+    @property
+    def verbose(self):
+        return self.mode == 'verbose'
+
+    def should_dump_payload(self):
+        """Whether this ingest's payload should be written to the log"""
+        if self.payload == 'off':
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def clip(self, text):
+        """Apply payload truncation to a string"""
+        if self.payload == 'truncate' and len(text) > self.payload_chars:
+            return text[:self.payload_chars] + f"... [{len(text) - self.payload_chars} more characters]"
+        return text
+
+    def event(self, message, **fields):
+        """Log one structured ingest event (no-op in verbose mode)"""
+        if self.verbose:
+            return
+        payload = fields.pop('payload', None)
+        if payload is not None and self.should_dump_payload():
+            fields['payload'] = self.clip(payload)
+        self.logger.info(message, extra={'ingest': fields})
+
+
+def configure_logging(log_file='graph_data.log'):
+    """Set up root logging from environment variables and return an IngestLogger"""
+    mode = os.environ.get('GRAPH_LOG_MODE', 'verbose')
+    if mode not in ('verbose', 'structured'):
+        raise ValueError(f"GRAPH_LOG_MODE must be 'verbose' or 'structured', got {mode!r}")
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=int(os.environ.get('GRAPH_LOG_MAX_BYTES', 10 * 1024 * 1024)),
+        backupCount=int(os.environ.get('GRAPH_LOG_BACKUPS', 5)),
+        encoding='utf-8'
+    )
+    handlers = [file_handler, logging.StreamHandler()]
+
+    if mode == 'verbose':
+        logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, handlers=handlers)
+    else:
+        formatter = JsonLineFormatter()
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(maxsize=int(os.environ.get('GRAPH_LOG_QUEUE_SIZE', 10000)))
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logging.basicConfig(level=logging.INFO, handlers=[DroppingQueueHandler(log_queue)])
+
+    return IngestLogger(
+        logging.getLogger('graph_ingest'),
+        mode=mode,
+        payload=os.environ.get('GRAPH_LOG_PAYLOAD', 'full'),
+        payload_chars=int(os.environ.get('GRAPH_LOG_PAYLOAD_CHARS', 2000)),
+        sample_rate=float(os.environ.get('GRAPH_LOG_SAMPLE_RATE', 1.0))
+    )
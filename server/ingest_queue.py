@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Asynchronous Ingest Queue
+Bounded queue and worker pool that parse and store graph pushes after the
+request has been acknowledged
+
+In async ingest mode the endpoint only decodes and validates a payload,
+assigns its graph id and queues it, so the extension's request returns
+before parsing, merging, indexing and persistence. Workers take whatever has
+queued up, up to ``batch_size`` payloads, and hand it to the handler in one
+call, so a burst is stored as a batch. A full queue refuses new payloads and
+the endpoint sheds load instead of letting requests pile up.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueue:
+    """Bounded queue of (graph id, item) drained in batches by worker threads
+
+    ``handler(entries)`` receives a list of (graph id, item, enqueued at)
+    tuples and returns {graph id: error message} for the ones that failed.
+    """
+
+    def __init__(self, handler, workers=2, max_queue=1000, batch_size=64, max_failures=1000):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.max_failures = max_failures
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._states = {}               # graph id -> 'queued' or 'processing'
+        self._failures = OrderedDict()  # graph id -> error, oldest first
+        self._threads = []
+        self._stopping = threading.Event()
+
+    def submit(self, graph_id, item):
+        """Queue an item under ``graph_id``; returns False if the queue is full"""
+        with self._lock:
+            if not self._threads:
+                self._start()
+            self._states[graph_id] = 'queued'
+        try:
+            self._queue.put_nowait((graph_id, item, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._states.pop(graph_id, None)
+                self.rejected += 1
+            return False
+        return True
+
+    def _start(self):
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'graph-ingest-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def status(self, graph_id):
+        """'queued', 'processing' or 'failed' with its error, or (None, None) if unknown"""
+        with self._lock:
+            state = self._states.get(graph_id)
+            if state is not None:
+                return state, None
+            error = self._failures.get(graph_id)
+            return ('failed', error) if error is not None else (None, None)
+
+    def is_pending(self, graph_id):
+        return graph_id in self._states
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                entries = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(entries) < self.batch_size:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                for graph_id, _, _ in entries:
+                    self._states[graph_id] = 'processing'
+            try:
+                failures = self.handler(entries) or {}
+            except Exception as e:
+                logger.error(f"Failed to ingest {len(entries)} queued graphs: {str(e)}")
+                failures = {graph_id: f'Processing error: {str(e)}' for graph_id, _, _ in entries}
+            with self._lock:
+                for graph_id, _, _ in entries:
+                    self._states.pop(graph_id, None)
+                for graph_id, error in failures.items():
+                    self._failures[graph_id] = error
+                while len(self._failures) > self.max_failures:
+                    self._failures.popitem(last=False)
+                self.processed += len(entries) - len(failures)
+                self.failed += len(failures)
+
+    def close(self, timeout=10):
+        """Let the workers finish queued items, then stop them"""
+        self._stopping.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'depth': self.depth,
+            'max_queue': self.max_queue,
+            'processed': self.processed,
+            'failed': self.failed,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Ingest State
+Thread-safe counters for the live graph server's statistics
+
+Counters and sets are split into shards with their own locks, so concurrent
+pushes only contend when they land on the same shard instead of serializing
+on one global lock.
+"""
+
+import itertools
+import threading
+from datetime import datetime
+
+DEFAULT_SHARDS = 16
+
+# Thread idents are aligned addresses that mostly share a remainder, so each
+# thread instead takes the next number the first time it updates a counter
+_thread_shard = threading.local()
+_next_shard = itertools.count()
+
+
+def _shard_index():
+    try:
+        return _thread_shard.index
+    except AttributeError:
+        _thread_shard.index = next(_next_shard)
+        return _thread_shard.index
+
+
+class ShardedCounter:
+    """Integer counter spread over per-thread shards"""
+
+    def __init__(self, shards=DEFAULT_SHARDS):
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._values = [0] * shards
+
+    def add(self, amount=1):
+        shard = _shard_index() % len(self._values)
+        with self._locks[shard]:
+            self._values[shard] += amount
+
+    @property
+    def value(self):
+        return sum(self._values)
+
+    @property
+    def shards(self):
+        return len(self._values)
+
+    @property
+    def shards_used(self):
+        """Number of shards that have been added to"""
+        return sum(1 for value in self._values if value)
+
+
+class ShardedSet:
+    """Set of hashable items spread over hash-partitioned shards"""
+
+    def __init__(self, shards=DEFAULT_SHARDS):
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._sets = [set() for _ in range(shards)]
+
+    def add(self, item):
+        """Add an item, returning True if it was not already present"""
+        shard = hash(item) % len(self._sets)
+        with self._locks[shard]:
+            if item in self._sets[shard]:
+                return False
+            self._sets[shard].add(item)
+            return True
+
+    def __contains__(self, item):
+        return item in self._sets[hash(item) % len(self._sets)]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._sets)
+
+
+class IngestStats:
+    """Server-wide ingest statistics, safe to update from concurrent requests"""
+
+    def __init__(self, shards=DEFAULT_SHARDS):
+        self.start_time = datetime.now()
+        self.total_received = ShardedCounter(shards)
+        self.duplicates = ShardedCounter(shards)
+        self.unique_videos = ShardedSet(shards)
+        self.unique_users = ShardedSet(shards)
+
+    def record(self, video_id):
+        """Count one received graph for ``video_id``"""
+        self.total_received.add()
+        self.unique_videos.add(video_id)
+
+    def record_many(self, video_ids):
+        """Count one received graph for each of ``video_ids``"""
+        self.total_received.add(len(video_ids))
+        for video_id in video_ids:
+            self.unique_videos.add(video_id)
+
+    def restore(self, total_received, video_ids):
+        """Seed the counters from persistent storage on startup"""
+        self.total_received.add(total_received)
+        for video_id in video_ids:
+            self.unique_videos.add(video_id)
+
+    @property
+    def uptime(self):
+        return datetime.now() - self.start_time
@@ -4,94 +4,227 @@ YouTube Learning Extension - Live Graph Visualization Server
 Receives graph data from the browser extension and displays live graph visualizations
 """
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, g, request, jsonify, render_template_string
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+import atexit
+import base64
+import heapq
 import json
 import logging
 from datetime import datetime
 import threading
 import time
 import uuid
-import re
+import os
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('graph_data.log'),
-        logging.StreamHandler()
-    ]
+from compact_graph import STRINGS, CompactGraph
+from concept_graph import ConceptGraph, load_aliases
+from content_dedup import DedupIndex
+from event_bus import EventBus
+from graph_layout import LayoutService
+from graph_metrics import MetricsService
+from graph_store import GraphStore
+from http_compression import DecompressingMiddleware, ResponseCompressor, iter_compressed, negotiate
+from ingest_logging import configure_logging
+from ingest_queue import IngestQueue
+from ingest_state import IngestStats
+from parse_pool import ParsePool
+from persistence import PersistentWriter, create_backend
+from prometheus_metrics import SIZE_BUCKETS, MetricsRegistry
+from response_cache import ResponseCache, dumps_json
+from search_index import SearchIndex, parse_query
+from streaming_ingest import StreamingPayloadReader
+from triple_parser import TripleParser, parse_ai_triples
+from video_graphs import VideoGraphIndex, edge_json, node_json
+
+def env_flag(name, default=True):
+    """Whether the environment toggle ``name`` is on; 0, off, false and no turn it off"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'off', 'false', 'no')
+
+# Large rawContent is parsed in worker processes. They are forked first, before
+# the structured log listener or any other thread exists, so no child starts
+# with a lock held by a thread that was not copied into it
+parse_pool = ParsePool(
+    processes=int(os.environ.get('GRAPH_PARSE_PROCESSES', 0)),
+    min_bytes=int(os.environ.get('GRAPH_PARSE_PROCESS_MIN_BYTES', 256 * 1024))
 )
+atexit.register(parse_pool.close)
+
+# Configure logging
+ingest_log = configure_logging('graph_data.log')
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for browser extension
 
+# Reject oversized request bodies before they are read
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('GRAPH_MAX_BODY_BYTES', 32 * 1024 * 1024))
+# Accept gzip/zstd encoded request bodies, limited by their decompressed size
+app.wsgi_app = DecompressingMiddleware(app.wsgi_app, max_bytes=app.config['MAX_CONTENT_LENGTH'])
+# Each open event stream holds a server thread; 0 means unlimited
+app.config['STREAM_MAX_CLIENTS'] = int(os.environ.get('GRAPH_STREAM_MAX_CLIENTS', 0))
+
 # Store received data
-received_graphs = []
-stats = {
-    'total_received': 0,
-    'unique_videos': set(),
-    'unique_users': set(),
-    'start_time': datetime.now()
-}
+graph_store = GraphStore(
+    max_graphs=int(os.environ.get('GRAPH_STORE_MAX_GRAPHS', 1000)),
+    max_bytes=int(os.environ.get('GRAPH_STORE_MAX_BYTES', 256 * 1024 * 1024)),
+    max_age=int(os.environ.get('GRAPH_STORE_MAX_AGE', 0))
+)
+# Videos are searchable, laid out and ranked for as long as their merged graph is kept
+search_index = SearchIndex()
 
-def parse_ai_triples(raw_content):
-    """Parse raw AI triple content into nodes, edges, and triples"""
-    nodes = set()
-    edges = []
-    raw_triples = []
-    
-    # Split by lines and process each line
-    lines = raw_content.strip().split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Look for patterns like (a,b,c) or (a,b,c,d)
-        # Use regex to find all parenthesized groups
-        matches = re.findall(r'\(([^)]+)\)', line)
-        
-        for match in matches:
-            # Split by comma and clean up
-            parts = [part.strip() for part in match.split(',')]
-            
-            if len(parts) >= 3:
-                # Handle both 3-part and 4-part tuples
-                if len(parts) == 3:
-                    # Standard triple: (subject, predicate, object)
-                    subject, predicate, object = parts
-                    nodes.add(subject)
-                    nodes.add(object)
-                    edges.append((subject, predicate, object))
-                    raw_triples.append((subject, predicate, object))
-                elif len(parts) == 4:
-                    # 4-part tuple: (subject, predicate, object, additional)
-                    subject, predicate, object, additional = parts
-                    nodes.add(subject)
-                    nodes.add(object)
-                    nodes.add(additional)
-                    # Create multiple relationships
-                    edges.append((subject, predicate, object))
-                    edges.append((object, 'related_to', additional))
-                    raw_triples.append((subject, predicate, object))
-                    raw_triples.append((object, 'related_to', additional))
-                else:
-                    # Handle longer tuples by taking first 3 parts
-                    subject, predicate, object = parts[:3]
-                    nodes.add(subject)
-                    nodes.add(object)
-                    edges.append((subject, predicate, object))
-                    raw_triples.append((subject, predicate, object))
-    
-    return {
-        'nodes': list(nodes),
-        'edges': edges,
-        'raw_triples': raw_triples
-    }
+def forget_video(video_id):
+    """Drop the search entry, layout, metrics and concepts of an evicted video graph"""
+    search_index.remove(video_id)
+    layouts.discard(video_id)
+    video_metrics.discard(video_id)
+    concept_graph.remove(video_id)
+
+video_graphs = VideoGraphIndex(
+    max_videos=int(os.environ.get('GRAPH_MAX_VIDEOS', 500)),
+    on_evict=forget_video
+)
+# Concepts of every video received, merged across videos by normalized label
+concept_graph = ConceptGraph(
+    aliases=load_aliases(os.environ['GRAPH_CONCEPT_ALIASES']) if os.environ.get('GRAPH_CONCEPT_ALIASES') else None
+)
+event_bus = EventBus(max_queue=int(os.environ.get('GRAPH_STREAM_QUEUE_SIZE', 100)))
+# Merged video graphs are laid out on a background thread after ingest
+layouts = LayoutService(
+    enabled=env_flag('GRAPH_LAYOUT'),
+    max_nodes=int(os.environ.get('GRAPH_LAYOUT_MAX_NODES', 20000)),
+    on_layout=lambda layout: event_bus.publish('layout', {
+        key: layout[key] for key in ('videoId', 'version', 'warmStart', 'took_ms')
+    })
+)
+# PageRank and communities of merged video graphs, refreshed after ingest
+video_metrics = MetricsService(
+    enabled=env_flag('GRAPH_METRICS'),
+    max_nodes=int(os.environ.get('GRAPH_METRICS_MAX_NODES', 50000))
+)
+STREAM_HEARTBEAT_SECONDS = 15
+response_compressor = ResponseCompressor(
+    enabled=env_flag('GRAPH_COMPRESSION'),
+    min_bytes=int(os.environ.get('GRAPH_COMPRESS_MIN_BYTES', 1024))
+)
+# Serialized /api/graphs and /api/stats bodies, reused until the store changes
+response_cache = ResponseCache(
+    enabled=env_flag('GRAPH_RESPONSE_CACHE'),
+    max_entries=int(os.environ.get('GRAPH_RESPONSE_CACHE_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('GRAPH_RESPONSE_CACHE_BYTES', 32 * 1024 * 1024)),
+    compress=response_compressor.enabled,
+    compress_min_bytes=response_compressor.min_bytes
+)
+# Counters in /api/stats that do not change with ingest, such as uptime and
+# queue depths, are refreshed at least this often
+STATS_CACHE_SECONDS = float(os.environ.get('GRAPH_STATS_CACHE_SECONDS', 5))
+# Payload fields rebuilt from rawContent, stored compactly instead
+DERIVED_FIELDS = ('nodes', 'edges', 'rawTriples')
+# Pushes of at least this many bytes, or of unknown length, are decoded from the
+# request stream as they arrive, and with dedup off their rawContent parsed on the way
+STREAMING_INGEST = env_flag('GRAPH_STREAMING_INGEST')
+STREAMING_MIN_BYTES = int(os.environ.get('GRAPH_STREAMING_MIN_BYTES', 1024 * 1024))
+# Longest field other than rawContent a streamed push may have
+STREAMING_MAX_FIELD_BYTES = int(os.environ.get('GRAPH_STREAMING_MAX_FIELD_BYTES', 1024 * 1024))
+# Most graphs accepted by one /api/graph-data/batch request; 0 means unlimited
+BATCH_MAX_ITEMS = int(os.environ.get('GRAPH_BATCH_MAX_ITEMS', 500))
+
+stats = IngestStats()
+# Repeated pushes of the same rawContent for the same video and batch are not stored again
+dedup_index = DedupIndex(
+    enabled=env_flag('GRAPH_DEDUP'),
+    max_entries=int(os.environ.get('GRAPH_DEDUP_MAX_ENTRIES', 10000))
+)
+
+# Prometheus metrics for /metrics; when off, recording a value returns at once
+prometheus = MetricsRegistry(
+    enabled=env_flag('GRAPH_PROMETHEUS')
+)
+http_requests = prometheus.counter(
+    'graph_http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+http_duration = prometheus.histogram(
+    'graph_http_request_duration_seconds', 'Time to produce a response, by route', ('route',))
+ingest_stage_duration = prometheus.histogram(
+    'graph_ingest_stage_duration_seconds',
+    'Time spent in each ingest stage: decode, dedup, parse, store and log', ('endpoint', 'stage'))
+ingest_payload_bytes = prometheus.histogram(
+    'graph_ingest_payload_bytes', 'Decoded size of ingest request bodies', ('endpoint',), buckets=SIZE_BUCKETS)
+ingest_graphs = prometheus.counter(
+    'graph_ingest_graphs_total', 'Graph payloads accepted, rejected or found duplicate by ingest',
+    ('endpoint', 'result'))
+
+# Durable storage, written in batches by a background thread
+storage_backend = create_backend(
+    os.environ.get('GRAPH_STORAGE', 'sqlite'),
+    os.environ.get('GRAPH_STORAGE_PATH')
+)
+persistence = PersistentWriter(storage_backend) if storage_backend else None
+if persistence:
+    atexit.register(persistence.close)
+
+# 'sync' parses and stores a push before answering it; 'async' answers 202
+# once the push is queued and a worker pool parses and stores it
+INGEST_MODE = os.environ.get('GRAPH_INGEST_MODE', 'sync')
+if INGEST_MODE not in ('sync', 'async'):
+    raise ValueError(f"GRAPH_INGEST_MODE must be 'sync' or 'async', got {INGEST_MODE!r}")
+INGEST_RETRY_AFTER_SECONDS = 5
+ingest_queue = None
+if INGEST_MODE == 'async':
+    ingest_queue = IngestQueue(
+        handler=lambda entries: ingest_queued(entries),
+        workers=int(os.environ.get('GRAPH_INGEST_WORKERS', 2)),
+        max_queue=int(os.environ.get('GRAPH_INGEST_QUEUE_SIZE', 1000))
+    )
+    # Registered after persistence, so queued pushes are stored before it flushes
+    atexit.register(ingest_queue.close)
+
+prometheus.counter_callback('graph_received_total', 'Graphs received since startup, including restored ones',
+                            lambda: stats.total_received.value)
+prometheus.counter_callback('graph_duplicates_total', 'Repeated pushes answered with an existing graph',
+                            lambda: stats.duplicates.value)
+prometheus.gauge('graph_dedup_entries', 'Content hashes held by the duplicate index', lambda: len(dedup_index))
+prometheus.gauge('graph_unique_videos', 'Distinct videos received', lambda: len(stats.unique_videos))
+prometheus.gauge('graph_uptime_seconds', 'Seconds since the server started', lambda: stats.uptime.total_seconds())
+prometheus.gauge('graph_store_graphs', 'Graphs held in the in-memory store', lambda: len(graph_store))
+prometheus.gauge('graph_store_bytes', 'Approximate memory footprint of the graph store', lambda: graph_store.total_bytes)
+prometheus.counter_callback('graph_store_evictions_total', 'Graphs evicted from the store by size or age limits',
+                            lambda: graph_store.evictions)
+prometheus.gauge('graph_video_graphs', 'Merged video graphs held in memory', lambda: len(video_graphs))
+prometheus.counter_callback('graph_video_graph_evictions_total', 'Merged video graphs evicted',
+                            lambda: video_graphs.evictions)
+prometheus.gauge('graph_interned_strings', 'Distinct labels interned by compact graphs', lambda: len(STRINGS))
+if parse_pool.enabled:
+    prometheus.counter_callback('graph_parse_pool_payloads_total',
+                                'Large payloads parsed by a worker process, or inline after a worker failed',
+                                lambda: {('offloaded',): parse_pool.offloaded, ('fallback',): parse_pool.fallbacks},
+                                ('result',))
+prometheus.counter_callback('graph_response_cache_requests_total',
+                            'Cached read responses served from cache, rebuilt, or answered 304 Not Modified',
+                            lambda: {('hit',): response_cache.hits, ('miss',): response_cache.misses,
+                                     ('not_modified',): response_cache.not_modified}, ('result',))
+prometheus.gauge('graph_response_cache_bytes', 'Serialized response bodies held by the response cache',
+                 lambda: response_cache.total_bytes)
+prometheus.gauge('graph_stream_clients', 'Open event stream connections', lambda: len(event_bus))
+prometheus.gauge('graph_worker_pending', 'Videos waiting for a background computation', lambda: {
+    ('layout',): layouts.pending, ('metrics',): video_metrics.pending
+}, ('worker',))
+if ingest_queue:
+    prometheus.gauge('graph_ingest_queue_depth', 'Pushes waiting for an ingest worker', lambda: ingest_queue.depth)
+    prometheus.gauge('graph_ingest_queue_capacity', 'Most pushes the ingest queue holds',
+                     lambda: ingest_queue.max_queue)
+    prometheus.counter_callback('graph_ingest_queue_items_total', 'Queued pushes stored, failed or refused',
+                                lambda: {('processed',): ingest_queue.processed, ('failed',): ingest_queue.failed,
+                                         ('rejected',): ingest_queue.rejected}, ('result',))
+if persistence:
+    prometheus.gauge('graph_persistence_pending', 'Records waiting to be written to storage',
+                     lambda: persistence.pending)
+    prometheus.counter_callback('graph_persistence_records_total', 'Records written to or failed in storage',
+                                lambda: {('written',): persistence.written, ('failed',): persistence.failed},
+                                ('result',))
 
 # HTML template for the live dashboard
 DASHBOARD_TEMPLATE = """
@@ -327,6 +460,14 @@ DASHBOARD_TEMPLATE = """
         .btn-secondary:hover {
             background: #5a6268;
         }
+        
+        .concept-input {
+            padding: 9px 12px;
+            border: 1px solid #ced4da;
+            border-radius: 6px;
+            margin: 0 5px;
+            font-size: 14px;
+        }
     </style>
 </head>
 <body>
@@ -364,6 +505,9 @@ DASHBOARD_TEMPLATE = """
                     <button class="btn" onclick="refreshGraph()">🔄 Refresh</button>
                     <button class="btn btn-secondary" onclick="clearGraph()">🗑️ Clear</button>
                     <button class="btn btn-secondary" onclick="toggleAutoRefresh()">⏸️ Auto Refresh</button>
+                    <input class="concept-input" id="conceptInput" placeholder="Concept across all videos"
+                           onkeydown="if (event.key === 'Enter') exploreConcept(this.value)">
+                    <button class="btn" onclick="exploreConcept(document.getElementById('conceptInput').value)">🌐 Explore</button>
                 </div>
                 
                 <div class="graph-title" id="graphTitle">No Graph Data</div>
@@ -409,24 +553,85 @@ DASHBOARD_TEMPLATE = """
 
     <script>
         let currentGraphData = null;
+        let currentVideoGraphId = null;
         let autoRefresh = true;
-        let refreshInterval;
+        let eventSource = null;
+        let serverStartTime = null;
+        const RECENT_GRAPH_LIMIT = 10;
+        let recentGraphs = [];
+        // Set from /api/stats when the server lays out merged video graphs
+        let serverLayout = null;
+        // Larger merged graphs are shown as their most central concepts
+        const VIDEO_GRAPH_NODE_LIMIT = 300;
+        // Graphs with more nodes are drawn on a canvas instead of as SVG elements
+        const CANVAS_NODE_THRESHOLD = 500;
+        // Canvas labels are only drawn when zoomed in far enough to read them
+        const CANVAS_NODE_LABEL_ZOOM = 0.6;
+        const CANVAS_EDGE_LABEL_ZOOM = 1.2;
+        const CANVAS_MAX_LABELS = 400;
+        const NODE_RADIUS = 12;
         
         // Initialize
         document.addEventListener('DOMContentLoaded', function() {
             loadStats();
             loadRecentGraphs();
-            startAutoRefresh();
+            connectEventStream();
+            setInterval(updateUptime, 1000);
         });
         
-        function startAutoRefresh() {
-            if (refreshInterval) clearInterval(refreshInterval);
-            refreshInterval = setInterval(() => {
+        function connectEventStream() {
+            // The server pushes new graph summaries and stats changes, so there is nothing to poll
+            eventSource = new EventSource('/api/stream');
+            
+            eventSource.onopen = () => setOnline(true);
+            eventSource.onerror = () => setOnline(false);
+            
+            eventSource.addEventListener('stats', event => {
+                applyStats(JSON.parse(event.data));
+            });
+            
+            eventSource.addEventListener('graph', event => {
+                const summary = JSON.parse(event.data);
+                recentGraphs = [...recentGraphs, summary].slice(-RECENT_GRAPH_LIMIT);
                 if (autoRefresh) {
-                    loadStats();
-                    loadRecentGraphs();
+                    renderRecentGraphs();
+                    if (!currentGraphData) {
+                        console.log('Auto-loading graph:', summary.id);
+                        loadGraph(summary.id);
+                    }
                 }
-            }, 2000); // Refresh every 2 seconds
+            });
+            
+            eventSource.addEventListener('video', event => {
+                const video = JSON.parse(event.data);
+                // Keep an open merged view up to date as new batches arrive,
+                // once its new layout is ready if the server computes one
+                const layoutComing = serverLayout && serverLayout.enabled && video.nodeCount <= serverLayout.max_nodes;
+                if (autoRefresh && currentVideoGraphId === video.videoId && !layoutComing) {
+                    loadVideoGraph(video.videoId);
+                }
+            });
+            
+            eventSource.addEventListener('layout', event => {
+                const layout = JSON.parse(event.data);
+                if (autoRefresh && currentVideoGraphId === layout.videoId) {
+                    loadVideoGraph(layout.videoId);
+                }
+            });
+            
+            eventSource.addEventListener('shutdown', () => setOnline(false));
+            
+            eventSource.addEventListener('resync', () => {
+                // We missed events while the connection was backed up
+                loadStats();
+                loadRecentGraphs();
+            });
+        }
+        
+        function setOnline(online) {
+            document.getElementById('statusIndicator').className =
+                `status-indicator ${online ? 'status-online' : 'status-offline'}`;
+            document.getElementById('statusText').textContent = online ? 'Online' : 'Offline';
         }
         
         function toggleAutoRefresh() {
@@ -434,67 +639,173 @@ DASHBOARD_TEMPLATE = """
             const btn = event.target;
             btn.textContent = autoRefresh ? '⏸️ Auto Refresh' : '▶️ Auto Refresh';
             btn.className = autoRefresh ? 'btn btn-secondary' : 'btn';
+            if (autoRefresh) renderRecentGraphs();
         }
         
         function loadStats() {
             fetch('/api/stats')
                 .then(response => response.json())
-                .then(data => {
-                    document.getElementById('totalGraphs').textContent = data.total_received;
-                    document.getElementById('uniqueVideos').textContent = data.unique_videos;
-                    
-                    // Calculate uptime
-                    const uptime = new Date() - new Date(data.start_time);
-                    const hours = Math.floor(uptime / 3600000);
-                    const minutes = Math.floor((uptime % 3600000) / 60000);
-                    const seconds = Math.floor((uptime % 60000) / 1000);
-                    document.getElementById('serverUptime').textContent = 
-                        `${hours.toString().padStart(2, '0')}:${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
-                })
+                .then(applyStats)
                 .catch(error => console.error('Error loading stats:', error));
         }
         
+        function applyStats(data) {
+            // Stream events only carry the counters that changed
+            if (data.total_received !== undefined) {
+                document.getElementById('totalGraphs').textContent = data.total_received;
+            }
+            if (data.unique_videos !== undefined) {
+                document.getElementById('uniqueVideos').textContent = data.unique_videos;
+            }
+            if (data.start_time !== undefined) {
+                serverStartTime = new Date(data.start_time);
+                updateUptime();
+            }
+            if (data.layout !== undefined) {
+                serverLayout = data.layout;
+            }
+        }
+        
+        function updateUptime() {
+            if (!serverStartTime) return;
+            const uptime = new Date() - serverStartTime;
+            const hours = Math.floor(uptime / 3600000);
+            const minutes = Math.floor((uptime % 3600000) / 60000);
+            const seconds = Math.floor((uptime % 60000) / 1000);
+            document.getElementById('serverUptime').textContent = 
+                `${hours.toString().padStart(2, '0')}:${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
+        }
+        
         function loadRecentGraphs() {
-            fetch('/api/graphs?limit=10')
+            fetch(`/api/graphs?limit=${RECENT_GRAPH_LIMIT}`)
                 .then(response => response.json())
                 .then(data => {
                     console.log('Recent graphs response:', data);
-                    const container = document.getElementById('recentGraphsList');
-                    if (data.graphs.length === 0) {
-                        container.innerHTML = '<div class="no-data">No graphs received yet</div>';
-                        return;
+                    recentGraphs = data.graphs;
+                    renderRecentGraphs();
+                    if (!currentGraphData && recentGraphs.length > 0) {
+                        loadGraph(recentGraphs[recentGraphs.length - 1].id);
                     }
-                    
-                    container.innerHTML = data.graphs.map(graph => {
-                        const metadata = graph.data.metadata || {};
-                        const time = new Date(graph.timestamp).toLocaleTimeString();
-                        const preview = `${graph.data.nodes?.length || 0} nodes, ${graph.data.edges?.length || 0} edges`;
-                        
-                        return `
-                            <div class="graph-item" onclick="loadGraph('${graph.timestamp}')">
-                                <div class="graph-time">${time}</div>
-                                <div class="graph-preview">${metadata.videoTitle || 'Unknown Video'} - ${preview}</div>
-                            </div>
-                        `;
-                    }).join('');
                 })
                 .catch(error => console.error('Error loading recent graphs:', error));
         }
         
-        function loadGraph(timestamp) {
-            fetch('/api/graphs')
-                .then(response => response.json())
-                .then(data => {
-                    const graph = data.graphs.find(g => g.timestamp === timestamp);
-                    if (graph) {
-                        renderGraph(graph.data);
-                        updateGraphInfo(graph.data);
-                    }
+        function renderRecentGraphs() {
+            const container = document.getElementById('recentGraphsList');
+            if (recentGraphs.length === 0) {
+                container.innerHTML = '<div class="no-data">No graphs received yet</div>';
+                return;
+            }
+            
+            container.innerHTML = recentGraphs.map(graph => {
+                const time = new Date(graph.timestamp).toLocaleTimeString();
+                const preview = `${graph.nodeCount} nodes, ${graph.edgeCount} edges`;
+                
+                return `
+                    <div class="graph-item" onclick="loadGraph('${graph.id}')">
+                        <div class="graph-time">${time}</div>
+                        <div class="graph-preview">${graph.videoTitle || 'Unknown Video'} - ${preview}</div>
+                    </div>
+                `;
+            }).join('');
+        }
+        
+        function loadGraph(graphId) {
+            fetch(`/api/graphs/${graphId}`)
+                .then(response => {
+                    if (!response.ok) throw new Error(`Graph ${graphId} not found`);
+                    return response.json();
+                })
+                .then(graph => {
+                    currentVideoGraphId = null;
+                    renderGraph(graph.data);
+                    updateGraphInfo(graph.data);
                 })
                 .catch(error => console.error('Error loading graph:', error));
         }
         
-        function renderGraph(graphData) {
+        function loadVideoLayout(videoId) {
+            if (serverLayout && !serverLayout.enabled) return Promise.resolve(null);
+            // 202 means the layout is still being computed
+            return fetch(`/api/videos/${encodeURIComponent(videoId)}/layout`)
+                .then(response => response.status === 200 ? response.json() : null)
+                .catch(() => null);
+        }
+        
+        function loadVideoGraph(videoId) {
+            const top = `/api/videos/${encodeURIComponent(videoId)}/graph/top?k=${VIDEO_GRAPH_NODE_LIMIT}`;
+            // PageRank is computed shortly after ingest; until then rank by degree
+            const graphRequest = fetch(`${top}&by=pagerank`)
+                .then(response => response.status === 200 ? response : fetch(`${top}&by=degree`))
+                .then(response => {
+                    if (!response.ok) throw new Error(`No merged graph for video ${videoId}`);
+                    return response.json();
+                });
+            Promise.all([graphRequest, loadVideoLayout(videoId)])
+                .then(([graph, layout]) => {
+                    currentVideoGraphId = videoId;
+                    renderGraph(graph, layout);
+                    updateGraphInfo(graph);
+                    const title = document.getElementById('graphTitle');
+                    title.textContent += ` (merged from ${graph.batches.length} batches)`;
+                    if (graph.truncated) {
+                        title.textContent += `, top ${graph.nodes.length} of ${graph.totalNodes} concepts by ${graph.view.by}`;
+                    }
+                })
+                .catch(error => console.error('Error loading merged graph:', error));
+        }
+        
+        function exploreConcept(concept, depth = 1) {
+            if (!concept.trim()) return;
+            fetch(`/api/concepts/neighborhood?concept=${encodeURIComponent(concept)}&depth=${depth}`)
+                .then(response => {
+                    if (!response.ok) throw new Error(`Unknown concept ${concept}`);
+                    return response.json();
+                })
+                .then(neighborhood => {
+                    const center = neighborhood.concept;
+                    const graph = {
+                        nodes: neighborhood.nodes,
+                        edges: neighborhood.edges,
+                        metadata: {
+                            videoTitle: `Concept: ${center.label}`,
+                            channelName: `Seen in ${center.videoCount} videos as ${center.forms.slice(0, 5).join(', ')}`
+                        }
+                    };
+                    currentVideoGraphId = null;
+                    renderGraph(graph);
+                    updateGraphInfo(graph);
+                    if (neighborhood.truncated) {
+                        document.getElementById('graphTitle').textContent += ' (most connected shown)';
+                    }
+                })
+                .catch(error => {
+                    console.error('Error loading concept:', error);
+                    document.getElementById('graphTitle').textContent = error.message;
+                });
+        }
+        
+        function loadVideoCommunities(videoId) {
+            fetch(`/api/videos/${encodeURIComponent(videoId)}/graph/communities`)
+                .then(response => {
+                    if (response.status !== 200) throw new Error('Communities are not computed yet');
+                    return response.json();
+                })
+                .then(graph => {
+                    // A community view is not refreshed by new batches
+                    currentVideoGraphId = null;
+                    renderGraph(graph);
+                    updateGraphInfo(graph);
+                    document.getElementById('graphTitle').textContent =
+                        `${graph.metadata.videoTitle || 'Graph'} - ${graph.nodes.length} of ${graph.totalCommunities} communities, ${graph.totalNodes} concepts`;
+                })
+                .catch(error => {
+                    console.error('Error loading communities:', error);
+                    document.getElementById('graphTitle').textContent = error.message;
+                });
+        }
+        
+        function renderGraph(graphData, layout = null) {
             currentGraphData = graphData;
             const container = document.getElementById('graphContainer');
             container.innerHTML = '';
@@ -512,6 +823,43 @@ DASHBOARD_TEMPLATE = """
             const width = container.offsetWidth;
             const height = 600;
             
+            // Convert edges to D3.js format (source/target instead of from/to)
+            const d3Edges = graphData.edges.map(edge => ({
+                source: edge.from,
+                target: edge.to,
+                label: edge.label
+            }));
+            
+            // Start from server-computed positions, centered in the view
+            let placed = 0;
+            if (layout) {
+                graphData.nodes.forEach(n => {
+                    const xy = layout.positions[n.id];
+                    if (xy) {
+                        n.x = width / 2 + xy[0];
+                        n.y = height / 2 + xy[1];
+                        placed++;
+                    }
+                });
+            }
+            
+            // Create force simulation with tighter clustering
+            const simulation = d3.forceSimulation(graphData.nodes)
+                .force('link', d3.forceLink(d3Edges).id(d => d.id).distance(60))
+                .force('charge', d3.forceManyBody().strength(-200))
+                .force('center', d3.forceCenter(width / 2, height / 2))
+                .force('collision', d3.forceCollide().radius(15))
+                .force('x', d3.forceX(width / 2).strength(0.1))
+                .force('y', d3.forceY(height / 2).strength(0.1));
+            const neighbors = adjacencyMap(graphData.nodes, d3Edges);
+            
+            // Thousands of SVG elements are slow to draw and hover, so large
+            // graphs are drawn on a canvas instead
+            if (graphData.nodes.length > CANVAS_NODE_THRESHOLD) {
+                renderGraphCanvas(container, graphData.nodes, d3Edges, neighbors, simulation, placed, width, height);
+                return;
+            }
+            
             // Create SVG with zoom container
             const svg = d3.select(container)
                 .append('svg')
@@ -532,22 +880,6 @@ DASHBOARD_TEMPLATE = """
             
             svg.call(zoom);
             
-            // Convert edges to D3.js format (source/target instead of from/to)
-            const d3Edges = graphData.edges.map(edge => ({
-                source: edge.from,
-                target: edge.to,
-                label: edge.label
-            }));
-            
-            // Create force simulation with tighter clustering
-            const simulation = d3.forceSimulation(graphData.nodes)
-                .force('link', d3.forceLink(d3Edges).id(d => d.id).distance(60))
-                .force('charge', d3.forceManyBody().strength(-200))
-                .force('center', d3.forceCenter(width / 2, height / 2))
-                .force('collision', d3.forceCollide().radius(15))
-                .force('x', d3.forceX(width / 2).strength(0.1))
-                .force('y', d3.forceY(height / 2).strength(0.1));
-            
             // Create links
             const link = g.append('g')
                 .selectAll('line')
@@ -600,12 +932,8 @@ DASHBOARD_TEMPLATE = """
                     );
                     
                     // Highlight connected nodes
-                    node.style('opacity', n => 
-                        n.id === d.id || d3Edges.some(e => 
-                            (e.source.id === d.id && e.target.id === n.id) || 
-                            (e.target.id === d.id && e.source.id === n.id)
-                        ) ? 1 : 0.3
-                    );
+                    const connected = neighbors.get(d.id);
+                    node.style('opacity', n => n.id === d.id || connected.has(n.id) ? 1 : 0.3);
                 })
                 .on('mouseout', function(event, d) {
                     d3.select(this)
@@ -647,7 +975,7 @@ DASHBOARD_TEMPLATE = """
                 .text(d => `${d.label || d.id}\\nType: ${d.type || 'concept'}`);
             
             // Update positions on simulation tick
-            simulation.on('tick', () => {
+            function ticked() {
                 link
                     .attr('x1', d => d.source.x)
                     .attr('y1', d => d.source.y)
@@ -665,7 +993,18 @@ DASHBOARD_TEMPLATE = """
                 nodeLabel
                     .attr('x', d => d.x)
                     .attr('y', d => d.y);
-            });
+            }
+            simulation.on('tick', ticked);
+            
+            if (placed === graphData.nodes.length) {
+                // Fully laid out by the server: draw once and fit it in view
+                simulation.stop();
+                ticked();
+                svg.call(zoom.transform, fitTransform(graphData.nodes, width, height));
+            } else if (placed > 0) {
+                // Only nodes added since the layout was computed need to settle
+                simulation.alpha(0.3);
+            }
             
             // Drag functions
             function dragstarted(event, d) {
@@ -689,10 +1028,232 @@ DASHBOARD_TEMPLATE = """
             addGraphControls(svg, simulation, zoom);
         }
         
-        function addGraphControls(svg, simulation, zoom) {
+        function adjacencyMap(nodes, edges) {
+            // Node id -> ids of its neighbors, so hover checks are O(1) per node
+            const neighbors = new Map(nodes.map(n => [n.id, new Set()]));
+            edges.forEach(e => {
+                // forceLink has replaced ids with node objects by now
+                neighbors.get(e.source.id).add(e.target.id);
+                neighbors.get(e.target.id).add(e.source.id);
+            });
+            return neighbors;
+        }
+        
+        function fitTransform(nodes, width, height) {
+            const xs = nodes.map(n => n.x);
+            const ys = nodes.map(n => n.y);
+            const [minX, maxX, minY, maxY] = [d3.min(xs), d3.max(xs), d3.min(ys), d3.max(ys)];
+            const scale = Math.max(0.1, Math.min(1, 0.9 * width / (maxX - minX + 1), 0.9 * height / (maxY - minY + 1)));
+            return d3.zoomIdentity
+                .translate(width / 2 - scale * (minX + maxX) / 2, height / 2 - scale * (minY + maxY) / 2)
+                .scale(scale);
+        }
+        
+        function renderGraphCanvas(container, nodes, edges, neighbors, simulation, placed, width, height) {
+            const ratio = window.devicePixelRatio || 1;
+            const canvas = d3.select(container)
+                .append('canvas')
+                .attr('width', width * ratio)
+                .attr('height', height * ratio)
+                .style('width', `${width}px`)
+                .style('height', `${height}px`)
+                .style('display', 'block')
+                .style('border', '1px solid #ccc')
+                .style('background', '#fafafa');
+            const context = canvas.node().getContext('2d');
+            
+            // Zoom buttons and legend are drawn on an SVG overlay
+            const overlay = d3.select(container)
+                .append('svg')
+                .attr('width', width)
+                .attr('height', height)
+                .style('position', 'absolute')
+                .style('left', 0)
+                .style('top', 0)
+                .style('pointer-events', 'none');
+            
+            let transform = d3.zoomIdentity;
+            let hovered = null;
+            let tree = null;
+            let frame = null;
+            
+            // Quadtree for hit testing, rebuilt lazily after nodes move
+            function findNode(x, y) {
+                if (!tree) tree = d3.quadtree(nodes, d => d.x, d => d.y);
+                return tree.find(x, y, NODE_RADIUS + 2) || null;
+            }
+            
+            function pointerNode(event) {
+                const [x, y] = transform.invert(d3.pointer(event, canvas.node()));
+                return findNode(x, y);
+            }
+            
+            function redraw() {
+                if (frame === null) frame = requestAnimationFrame(draw);
+            }
+            
+            function draw() {
+                frame = null;
+                context.setTransform(ratio, 0, 0, ratio, 0, 0);
+                context.clearRect(0, 0, width, height);
+                context.translate(transform.x, transform.y);
+                context.scale(transform.k, transform.k);
+                
+                // Only nodes inside the visible area are drawn
+                const [x0, y0] = transform.invert([-NODE_RADIUS, -NODE_RADIUS]);
+                const [x1, y1] = transform.invert([width + NODE_RADIUS, height + NODE_RADIUS]);
+                const visible = nodes.filter(n => n.x >= x0 && n.x <= x1 && n.y >= y0 && n.y <= y1);
+                const connected = hovered ? neighbors.get(hovered.id) : null;
+                const isActive = n => !hovered || n === hovered || connected.has(n.id);
+                
+                context.lineWidth = 2;
+                context.strokeStyle = 'rgba(153, 153, 153, 0.6)';
+                context.beginPath();
+                edges.forEach(e => {
+                    context.moveTo(e.source.x, e.source.y);
+                    context.lineTo(e.target.x, e.target.y);
+                });
+                context.stroke();
+                if (hovered) {
+                    context.lineWidth = 4;
+                    context.strokeStyle = '#ff6b6b';
+                    context.beginPath();
+                    edges.forEach(e => {
+                        if (e.source === hovered || e.target === hovered) {
+                            context.moveTo(e.source.x, e.source.y);
+                            context.lineTo(e.target.x, e.target.y);
+                        }
+                    });
+                    context.stroke();
+                }
+                
+                context.lineWidth = 2;
+                context.strokeStyle = '#fff';
+                [true, false].forEach(active => {
+                    context.globalAlpha = active ? 1 : 0.3;
+                    context.fillStyle = '#69b3a2';
+                    context.beginPath();
+                    visible.forEach(n => {
+                        if (isActive(n) !== active || n === hovered) return;
+                        context.moveTo(n.x + NODE_RADIUS, n.y);
+                        context.arc(n.x, n.y, NODE_RADIUS, 0, 2 * Math.PI);
+                    });
+                    context.fill();
+                    context.stroke();
+                });
+                context.globalAlpha = 1;
+                if (hovered) {
+                    context.fillStyle = '#ff6b6b';
+                    context.beginPath();
+                    context.arc(hovered.x, hovered.y, NODE_RADIUS + 4, 0, 2 * Math.PI);
+                    context.fill();
+                    context.stroke();
+                }
+                
+                // Labels are culled by zoom level; the hovered node and its
+                // neighbors are always labeled
+                context.textAlign = 'center';
+                context.fillStyle = '#333';
+                context.font = '12px sans-serif';
+                let labels = 0;
+                visible.forEach(n => {
+                    const wanted = hovered ? isActive(n) : transform.k >= CANVAS_NODE_LABEL_ZOOM;
+                    if (wanted && labels < CANVAS_MAX_LABELS) {
+                        context.fillText(n.label || n.id, n.x, n.y + 3);
+                        labels++;
+                    }
+                });
+                if (transform.k >= CANVAS_EDGE_LABEL_ZOOM) {
+                    context.fillStyle = '#666';
+                    context.font = '10px sans-serif';
+                    edges.forEach(e => {
+                        const x = (e.source.x + e.target.x) / 2;
+                        const y = (e.source.y + e.target.y) / 2;
+                        if (e.label && x >= x0 && x <= x1 && y >= y0 && y <= y1 && labels < CANVAS_MAX_LABELS) {
+                            context.fillText(e.label, x, y);
+                            labels++;
+                        }
+                    });
+                }
+            }
+            
+            const zoom = d3.zoom()
+                .scaleExtent([0.1, 4])
+                .on('zoom', event => {
+                    transform = event.transform;
+                    redraw();
+                });
+            
+            // Dragging a node moves it; dragging empty space pans
+            const drag = d3.drag()
+                .container(canvas.node())
+                .subject(event => findNode(...transform.invert([event.x, event.y])))
+                .on('start', event => {
+                    if (!event.active) simulation.alphaTarget(0.3).restart();
+                    event.subject.fx = event.subject.x;
+                    event.subject.fy = event.subject.y;
+                })
+                .on('drag', event => {
+                    const [x, y] = transform.invert(d3.pointer(event.sourceEvent, canvas.node()));
+                    event.subject.fx = x;
+                    event.subject.fy = y;
+                })
+                .on('end', event => {
+                    if (!event.active) simulation.alphaTarget(0);
+                    event.subject.fx = null;
+                    event.subject.fy = null;
+                });
+            
+            canvas.call(drag).call(zoom)
+                .on('dblclick.zoom', null)
+                .on('mousemove', event => {
+                    const node = pointerNode(event);
+                    if (node !== hovered) {
+                        hovered = node;
+                        canvas.style('cursor', node ? 'pointer' : 'default')
+                            .attr('title', node ? `${node.label || node.id}\nType: ${node.type || 'concept'}` : null);
+                        redraw();
+                    }
+                })
+                .on('mouseleave', () => {
+                    hovered = null;
+                    redraw();
+                })
+                .on('dblclick', event => {
+                    // Focus on the node under the pointer, as in the SVG view
+                    const node = pointerNode(event);
+                    if (!node) return;
+                    const scale = 2;
+                    canvas.transition()
+                        .duration(750)
+                        .call(zoom.transform, d3.zoomIdentity
+                            .translate(width / 2 - scale * node.x, height / 2 - scale * node.y)
+                            .scale(scale));
+                });
+            
+            simulation.on('tick', () => {
+                tree = null;
+                redraw();
+            });
+            
+            if (placed === nodes.length) {
+                // Fully laid out by the server: draw once and fit it in view
+                simulation.stop();
+                canvas.call(zoom.transform, fitTransform(nodes, width, height));
+            } else if (placed > 0) {
+                simulation.alpha(0.3);
+            }
+            redraw();
+            
+            addGraphControls(overlay, simulation, zoom, canvas);
+        }
+        
+        function addGraphControls(svg, simulation, zoom, zoomTarget = svg) {
+            const width = +svg.attr('width');
             const controls = svg.append('g')
                 .attr('class', 'graph-controls')
-                .attr('transform', 'translate(10, 10)');
+                .attr('transform', 'translate(10, 10)')
+                .style('pointer-events', 'all');
             
             // Zoom in button
             controls.append('rect')
@@ -705,7 +1266,7 @@ DASHBOARD_TEMPLATE = """
                 .attr('rx', 4)
                 .style('cursor', 'pointer')
                 .on('click', () => {
-                    svg.transition().call(zoom.scaleBy, 1.5);
+                    zoomTarget.transition().call(zoom.scaleBy, 1.5);
                 });
             
             controls.append('text')
@@ -727,7 +1288,7 @@ DASHBOARD_TEMPLATE = """
                 .attr('rx', 4)
                 .style('cursor', 'pointer')
                 .on('click', () => {
-                    svg.transition().call(zoom.scaleBy, 1 / 1.5);
+                    zoomTarget.transition().call(zoom.scaleBy, 1 / 1.5);
                 });
             
             controls.append('text')
@@ -749,7 +1310,7 @@ DASHBOARD_TEMPLATE = """
                 .attr('rx', 4)
                 .style('cursor', 'pointer')
                 .on('click', () => {
-                    svg.transition().call(zoom.transform, d3.zoomIdentity);
+                    zoomTarget.transition().call(zoom.transform, d3.zoomIdentity);
                 });
             
             controls.append('text')
@@ -878,15 +1439,23 @@ DASHBOARD_TEMPLATE = """
             const metadata = graphData.metadata || {};
             
             // Update video info
+            const videoId = graphData.videoId || metadata.videoId;
+            let mergedButton = '';
+            if (videoId && videoId !== 'unknown') {
+                mergedButton = graphData.batches
+                    ? `<button class="btn" style="margin: 10px 0 0 0" onclick="loadVideoCommunities('${videoId}')">🫧 Communities</button>`
+                    : `<button class="btn" style="margin: 10px 0 0 0" onclick="loadVideoGraph('${videoId}')">🧩 Merged Video Graph</button>`;
+            }
             document.getElementById('videoInfo').innerHTML = `
                 <div class="video-title">${metadata.videoTitle || 'Unknown Video'}</div>
                 <div class="video-channel">${metadata.channelName || 'Unknown Channel'}</div>
+                ${mergedButton}
             `;
             
             // Update graph stats
             document.getElementById('nodeCount').textContent = graphData.nodes?.length || 0;
             document.getElementById('edgeCount').textContent = graphData.edges?.length || 0;
-            document.getElementById('tripleCount').textContent = graphData.rawTriples?.length || 0;
+            document.getElementById('tripleCount').textContent = (graphData.rawTriples || graphData.edges)?.length || 0;
             document.getElementById('captionCount').textContent = metadata.captionCount || 0;
             
             // Update graph title
@@ -914,180 +1483,1139 @@ DASHBOARD_TEMPLATE = """
             document.getElementById('tripleCount').textContent = '0';
             document.getElementById('captionCount').textContent = '0';
             currentGraphData = null;
+            currentVideoGraphId = null;
         }
         
-        // Auto-load latest graph if available
-        setInterval(() => {
-            if (!currentGraphData) {
-                console.log('Auto-loading latest graph...');
-                fetch('/api/graphs?limit=1')
-                    .then(response => response.json())
-                    .then(data => {
-                        console.log('Auto-load response:', data);
-                        if (data.graphs.length > 0) {
-                            console.log('Auto-loading graph:', data.graphs[0].data);
-                            renderGraph(data.graphs[0].data);
-                            updateGraphInfo(data.graphs[0].data);
-                        } else {
-                            console.log('No graphs available for auto-load');
-                        }
-                    })
-                    .catch(error => console.error('Error auto-loading graph:', error));
-            }
-        }, 5000);
     </script>
 </body>
 </html>
 """
 
+def log_received_data(data, metadata):
+    """Verbose log of an incoming payload and its metadata"""
+    logger.info("=" * 80)
+    logger.info("NEW GRAPH DATA RECEIVED")
+    logger.info(f"Timestamp: {data.get('timestamp', 'N/A')}")
+    logger.info(f"Source: {data.get('source', 'N/A')}")
+    logger.info(f"Version: {data.get('version', 'N/A')}")
+    
+    # Print complete JSON received
+    if ingest_log.should_dump_payload():
+        logger.info("COMPLETE JSON DATA RECEIVED:")
+        logger.info(ingest_log.clip(json.dumps(data, indent=2, ensure_ascii=False)))
+    
+    # Log metadata
+    logger.info(f"Video: {metadata.get('videoTitle', 'N/A')}")
+    logger.info(f"Channel: {metadata.get('channelName', 'N/A')}")
+    logger.info(f"Video ID: {metadata.get('videoId', 'N/A')}")
+    logger.info(f"Caption Count: {metadata.get('captionCount', 'N/A')}")
+    logger.info(f"Batch ID: {metadata.get('batchId', 'N/A')}")
+    logger.info(f"Prompt Used: {metadata.get('promptUsed', 'N/A')}")
+
+def log_parsed_graph(content_type, raw_content, nodes, edges, raw_triples):
+    """Verbose log of the graph parsed from raw AI content"""
+    logger.info("Raw AI Content Received:")
+    logger.info(f"   Content Type: {content_type}")
+    logger.info(f"   Raw Content Length: {len(raw_content)} characters")
+    
+    logger.info("Parsed Graph Structure:")
+    logger.info(f"   Nodes: {len(nodes)}")
+    logger.info(f"   Edges: {len(edges)}")
+    logger.info(f"   Raw Triples: {len(raw_triples)}")
+    
+    # Log parsed nodes
+    if nodes:
+        logger.info("Parsed Nodes:")
+        for node in nodes[:10]:  # Show first 10 nodes
+            logger.info(f"   - {node}")
+        if len(nodes) > 10:
+            logger.info(f"   ... and {len(nodes) - 10} more nodes")
+    
+    # Log parsed edges
+    if edges:
+        logger.info("Parsed Edges:")
+        for edge in edges[:10]:  # Show first 10 edges
+            logger.info(f"   - {edge}")
+        if len(edges) > 10:
+            logger.info(f"   ... and {len(edges) - 10} more edges")
+    
+    # Log raw triples
+    if raw_triples:
+        logger.info("Raw Triples:")
+        for triple in raw_triples[:10]:  # Show first 10 triples
+            logger.info(f"   - {triple}")
+        if len(raw_triples) > 10:
+            logger.info(f"   ... and {len(raw_triples) - 10} more triples")
+
+def log_statistics():
+    """Verbose log of the running server statistics"""
+    logger.info("Statistics:")
+    logger.info(f"   Total Graphs Received: {stats.total_received.value}")
+    logger.info(f"   Unique Videos: {len(stats.unique_videos)}")
+    logger.info(f"   Server Uptime: {stats.uptime}")
+    
+    logger.info("=" * 80)
+
+def legacy_triples(nodes, edges):
+    """Triples and node labels from a legacy payload's node/edge dicts"""
+    triples = [
+        (edge['from'], edge.get('label', ''), edge['to'])
+        for edge in edges
+        if isinstance(edge, dict) and 'from' in edge and 'to' in edge
+    ]
+    labels = [node['id'] for node in nodes if isinstance(node, dict) and 'id' in node]
+    return triples, labels
+
+def compact_stored_graph(data):
+    """Split a stored payload into (payload, CompactGraph or None), parsing rawContent again if needed
+
+    Graphs are stored without the fields derived from rawContent; rows
+    written before that still carry rawTriples, which are used as they are.
+    """
+    if not (data.get('rawContent') and data.get('contentType') == 'ai_triples'):
+        return data, None
+    if 'rawTriples' in data:
+        graph = CompactGraph.from_triples(data['rawTriples'])
+    else:
+        graph = CompactGraph.from_triples(parse_ai_triples(data['rawContent'])['raw_triples'])
+    return {key: value for key, value in data.items() if key not in DERIVED_FIELDS}, graph
+
+def record_json(record):
+    """A stored graph record in its public JSON shape"""
+    graph = record['graph']
+    data = graph.materialize(record['data']) if graph is not None else record['data']
+    return {'id': record['id'], 'timestamp': record['timestamp'], 'data': data}
+
+def merge_video_graph(record):
+    """Merge a stored graph into its video's merged graph, returning (graph, delta) or None"""
+    graph_id = record['id']
+    data = record['data']
+    metadata = data.get('metadata') or {}
+    video_id = metadata.get('videoId')
+    if not video_id or video_id == 'unknown':
+        return None
+    if record['graph'] is not None:
+        triples = record['graph'].triples()
+        extra_nodes = ()
+    elif data.get('contentType') == 'ai_triples' and 'rawTriples' in data:
+        # Triples restored from storage come back as lists
+        triples = [tuple(triple) for triple in data['rawTriples']]
+        extra_nodes = ()
+    else:
+        triples, extra_nodes = legacy_triples(data.get('nodes') or [], data.get('edges') or [])
+    video_graph, delta = video_graphs.merge(
+        video_id, metadata.get('batchId', graph_id), triples, extra_nodes,
+        graph_id=graph_id, metadata=metadata
+    )
+    search_index.add(
+        video_id,
+        labels=delta['nodes'],
+        predicates=dict.fromkeys(triple[1] for triple in delta['edges']),
+        title=metadata.get('videoTitle'),
+        channel=metadata.get('channelName')
+    )
+    concept_graph.add(video_id, delta['edges'], delta['nodes'])
+    return video_graph, delta
+
+def parse_graph(data, parsed=None):
+    """Parse a payload's AI content and return (CompactGraph or None, counts to log)
+
+    The graph parsed from an ``ai_triples`` payload's ``rawContent`` is kept
+    compact and only expanded into ``nodes``, ``edges`` and ``rawTriples``
+    when served; legacy payloads carry their own node and edge lists.
+    ``parsed`` is the parse result of ``rawContent`` if it was already
+    parsed while the request body was read.
+    """
+    metadata = data.get('metadata', {})
+    if ingest_log.verbose:
+        log_received_data(data, metadata)
+
+    # Handle raw AI content
+    raw_content = data.get('rawContent', '')
+    content_type = data.get('contentType', '')
+
+    if raw_content and content_type == 'ai_triples' and parsed is None and parse_pool.offloads(raw_content) \
+            and not ingest_log.verbose:
+        # Large content is parsed in a worker process, straight into compact form
+        graph = parse_pool.parse(raw_content)
+        for key in DERIVED_FIELDS:
+            data.pop(key, None)
+        return graph, {
+            'content_type': content_type,
+            'raw_content': raw_content,
+            'nodes': graph.node_count,
+            'edges': graph.edge_count,
+            'triples': graph.edge_count
+        }
+
+    if raw_content and content_type == 'ai_triples':
+        # Parse the raw AI content
+        parsed_data = parsed if parsed is not None else parse_ai_triples(raw_content)
+        nodes = parsed_data['nodes']
+        edges = parsed_data['edges']
+        raw_triples = parsed_data['raw_triples']
+
+        if ingest_log.verbose:
+            log_parsed_graph(content_type, raw_content, nodes, edges, raw_triples)
+
+        # Replace any client-sent lists with the parsed graph
+        graph = CompactGraph.from_triples(raw_triples)
+        for key in DERIVED_FIELDS:
+            data.pop(key, None)
+
+    else:
+        graph = None
+        # Handle legacy format
+        nodes = data.get('nodes', [])
+        edges = data.get('edges', [])
+        raw_triples = data.get('rawTriples', [])
+
+        if ingest_log.verbose:
+            logger.info("Legacy Graph Structure:")
+            logger.info(f"   Nodes: {len(nodes)}")
+            logger.info(f"   Edges: {len(edges)}")
+            logger.info(f"   Raw Triples: {len(raw_triples)}")
+
+    return graph, {
+        'content_type': content_type,
+        'raw_content': raw_content,
+        'nodes': len(nodes),
+        'edges': len(edges),
+        'triples': len(raw_triples)
+    }
+
+def find_duplicate(content_key):
+    """Graph id of an earlier push with the same content hash, stored or queued, or None"""
+    graph_id = dedup_index.get(content_key)
+    if graph_id is None:
+        return None
+    if graph_id in graph_store or (ingest_queue and ingest_queue.is_pending(graph_id)):
+        graph_store.get(graph_id)   # a repeat counts as a use for LRU eviction
+        return graph_id
+    # The earlier copy has been evicted or failed, so this one is stored again
+    dedup_index.discard(content_key)
+    return None
+
+def log_duplicate(graph_id, data, endpoint):
+    """Count a repeated push and log which graph it matched"""
+    stats.duplicates.add()
+    ingest_graphs.inc(endpoint, 'duplicate')
+    metadata = data.get('metadata') or {}
+    if ingest_log.verbose:
+        logger.info(f"Duplicate graph data for video {metadata.get('videoId')}, already received as {graph_id}")
+    else:
+        ingest_log.event('graph duplicate', graph_id=graph_id, video_id=metadata.get('videoId'),
+                         batch_id=metadata.get('batchId'))
+
+def store_graphs(parsed, content_keys=None, graph_ids=None):
+    """Record, store, persist, merge and announce parsed (payload, graph) pairs
+
+    Statistics, the graph store and the persistence queue are each updated
+    once for the whole list, and one stats event is published at the end.
+    ``content_keys`` are the payloads' duplicate index keys, if known, and
+    ``graph_ids`` ids assigned when the payloads were queued.
+    Returns the stored records in order.
+    """
+    metadatas = [data.get('metadata', {}) for data, _ in parsed]
+    stats.record_many([metadata.get('videoId', 'unknown') for metadata in metadatas])
+
+    received_at = datetime.now().isoformat()
+    graph_ids = graph_store.add_many([
+        (data, received_at, graph_id, graph)
+        for (data, graph), graph_id in zip(parsed, graph_ids or [None] * len(parsed))
+    ])
+    records = [
+        {'id': graph_id, 'timestamp': received_at, 'data': data, 'graph': graph}
+        for graph_id, (data, graph) in zip(graph_ids, parsed)
+    ]
+    if persistence:
+        persistence.enqueue_many(records)
+    for content_key, graph_id in zip(content_keys or (), graph_ids):
+        dedup_index.add(content_key, graph_id)
+
+    # Extend the merged graph of each video, announcing each video once
+    video_events = {}
+    for record, metadata in zip(records, metadatas):
+        video_update = merge_video_graph(record)
+        event_bus.publish('graph', graph_summary(record))
+        if not video_update:
+            continue
+        video_graph, video_delta = video_update
+        if not (video_delta['nodes'] or video_delta['edges']):
+            continue
+        event = video_events.get(video_graph.video_id)
+        if event is None:
+            event = video_events[video_graph.video_id] = {'graph': video_graph, 'newNodes': 0, 'newEdges': 0}
+        event['batchId'] = str(metadata.get('batchId', record['id']))
+        event['newNodes'] += len(video_delta['nodes'])
+        event['newEdges'] += len(video_delta['edges'])
+    for event in video_events.values():
+        layouts.schedule(event['graph'])
+        video_metrics.schedule(event['graph'])
+        event_bus.publish('video', {
+            **event['graph'].summary(),
+            'batchId': event['batchId'],
+            'newNodes': event['newNodes'],
+            'newEdges': event['newEdges']
+        })
+    event_bus.publish('stats', stats_snapshot())
+    return records
+
+def log_ingested(record, counts, started):
+    """Structured log event for one stored graph"""
+    metadata = record['data'].get('metadata', {})
+    ingest_log.event(
+        'graph received',
+        graph_id=record['id'],
+        video_id=metadata.get('videoId'),
+        channel=metadata.get('channelName'),
+        batch_id=metadata.get('batchId'),
+        content_type=counts['content_type'],
+        raw_length=len(counts['raw_content']),
+        nodes=counts['nodes'],
+        edges=counts['edges'],
+        triples=counts['triples'],
+        duration_ms=round((time.perf_counter() - started) * 1000, 3),
+        payload=counts['raw_content']
+    )
+
+def timed_stage(endpoint, stage, since):
+    """Record the time since ``since`` as one ingest stage and return the current time"""
+    now = time.perf_counter()
+    ingest_stage_duration.observe(now - since, endpoint, stage)
+    return now
+
+def streams_body():
+    """Whether to decode this push from the request stream instead of buffering it"""
+    if not STREAMING_INGEST or not request.is_json:
+        return False
+    # Compressed bodies have no known decoded length
+    return request.content_length is None or request.content_length >= STREAMING_MIN_BYTES
+
+def read_streamed_payload():
+    """Decode a push from the request stream, returning (payload, parsed rawContent or None, body bytes)
+
+    rawContent is parsed while it arrives unless it is going to an ingest
+    worker or a parse process instead, or dedup is on: a repeated push must
+    not be parsed at all, and whether it repeats is only known once the
+    whole body has been read. Bodies over the size limit are
+    rejected with 413 before they are read, or as soon as the limit is
+    passed when their length is not known.
+    """
+    parser = None if ingest_queue or parse_pool.enabled or dedup_index.enabled else TripleParser()
+    reader = StreamingPayloadReader(request.stream, parser, max_field_chars=STREAMING_MAX_FIELD_BYTES)
+    data = reader.read()
+    parsed = parser.close() if parser is not None and data.get('rawContent') else None
+    return data, parsed, reader.bytes_read
+
 @app.route('/api/graph-data', methods=['POST'])
 def receive_graph_data():
     """Receive graph data from the YouTube Learning Extension"""
+    started = time.perf_counter()
     try:
         # Get the JSON data
-        data = request.get_json()
+        if streams_body():
+            data, parsed, body_bytes = read_streamed_payload()
+        else:
+            data, parsed = request.get_json(), None
+            body_bytes = len(request.get_data())
+        mark = timed_stage('single', 'decode', started)
+        ingest_payload_bytes.observe(body_bytes, 'single')
         
         if not data:
             logger.warning("Received empty or invalid JSON data")
+            ingest_graphs.inc('single', 'rejected')
             return jsonify({'error': 'No data received'}), 400
+        if not isinstance(data, dict):
+            ingest_graphs.inc('single', 'rejected')
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        content_key = dedup_index.key(data)
+        duplicate = find_duplicate(content_key)
+        mark = timed_stage('single', 'dedup', mark)
+        if duplicate is not None:
+            log_duplicate(duplicate, data, 'single')
+            return jsonify({
+                'success': True,
+                'message': 'Graph data already received',
+                'timestamp': datetime.now().isoformat(),
+                'graph_id': duplicate,
+                'duplicate': True
+            }), 200
         
-        # Log the received data
-        logger.info("=" * 80)
-        logger.info("NEW GRAPH DATA RECEIVED")
-        logger.info(f"Timestamp: {data.get('timestamp', 'N/A')}")
-        logger.info(f"Source: {data.get('source', 'N/A')}")
-        logger.info(f"Version: {data.get('version', 'N/A')}")
-        
-        # Print complete JSON received
-        logger.info("COMPLETE JSON DATA RECEIVED:")
-        logger.info(json.dumps(data, indent=2, ensure_ascii=False))
-        
-        # Log metadata
-        metadata = data.get('metadata', {})
-        logger.info(f"Video: {metadata.get('videoTitle', 'N/A')}")
-        logger.info(f"Channel: {metadata.get('channelName', 'N/A')}")
-        logger.info(f"Video ID: {metadata.get('videoId', 'N/A')}")
-        logger.info(f"Caption Count: {metadata.get('captionCount', 'N/A')}")
-        logger.info(f"Batch ID: {metadata.get('batchId', 'N/A')}")
-        logger.info(f"Prompt Used: {metadata.get('promptUsed', 'N/A')}")
-        
-        # Handle raw AI content
-        raw_content = data.get('rawContent', '')
-        content_type = data.get('contentType', '')
-        
-        if raw_content and content_type == 'ai_triples':
-            logger.info("Raw AI Content Received:")
-            logger.info(f"   Content Type: {content_type}")
-            logger.info(f"   Raw Content Length: {len(raw_content)} characters")
-            
-            # Parse the raw AI content
-            parsed_data = parse_ai_triples(raw_content)
-            nodes = parsed_data['nodes']
-            edges = parsed_data['edges']
-            raw_triples = parsed_data['raw_triples']
-            
-            logger.info("Parsed Graph Structure:")
-            logger.info(f"   Nodes: {len(nodes)}")
-            logger.info(f"   Edges: {len(edges)}")
-            logger.info(f"   Raw Triples: {len(raw_triples)}")
-            
-            # Log parsed nodes
-            if nodes:
-                logger.info("Parsed Nodes:")
-                for node in nodes[:10]:  # Show first 10 nodes
-                    logger.info(f"   - {node}")
-                if len(nodes) > 10:
-                    logger.info(f"   ... and {len(nodes) - 10} more nodes")
-            
-            # Log parsed edges
-            if edges:
-                logger.info("Parsed Edges:")
-                for edge in edges[:10]:  # Show first 10 edges
-                    logger.info(f"   - {edge}")
-                if len(edges) > 10:
-                    logger.info(f"   ... and {len(edges) - 10} more edges")
-            
-            # Log raw triples
-            if raw_triples:
-                logger.info("Raw Triples:")
-                for triple in raw_triples[:10]:  # Show first 10 triples
-                    logger.info(f"   - {triple}")
-                if len(raw_triples) > 10:
-                    logger.info(f"   ... and {len(raw_triples) - 10} more triples")
-            
-            # Update the data with parsed content
-            data['nodes'] = [{'id': node, 'label': node, 'type': 'concept'} for node in nodes]
-            data['edges'] = [{'from': edge[0], 'to': edge[2], 'label': edge[1], 'type': 'relationship'} for edge in edges]
-            data['rawTriples'] = raw_triples
-            
-        else:
-            # Handle legacy format
-            nodes = data.get('nodes', [])
-            edges = data.get('edges', [])
-            raw_triples = data.get('rawTriples', [])
-            
-            logger.info("Legacy Graph Structure:")
-            logger.info(f"   Nodes: {len(nodes)}")
-            logger.info(f"   Edges: {len(edges)}")
-            logger.info(f"   Raw Triples: {len(raw_triples)}")
-        
-        # Update statistics
-        stats['total_received'] += 1
-        stats['unique_videos'].add(metadata.get('videoId', 'unknown'))
-        
-        # Store the data
-        received_graphs.append({
-            'timestamp': datetime.now().isoformat(),
-            'data': data
-        })
+        if ingest_queue:
+            return enqueue_graph(data, content_key, started)
         
-        # Log statistics
-        logger.info("Statistics:")
-        logger.info(f"   Total Graphs Received: {stats['total_received']}")
-        logger.info(f"   Unique Videos: {len(stats['unique_videos'])}")
-        logger.info(f"   Server Uptime: {datetime.now() - stats['start_time']}")
+        graph, counts = parse_graph(data, parsed)
+        mark = timed_stage('single', 'parse', mark)
+        record = store_graphs([(data, graph)], [content_key])[0]
+        mark = timed_stage('single', 'store', mark)
         
-        logger.info("=" * 80)
+        if ingest_log.verbose:
+            log_statistics()
+        else:
+            log_ingested(record, counts, started)
+        timed_stage('single', 'log', mark)
+        ingest_graphs.inc('single', 'accepted')
         
         # Return success response
         return jsonify({
             'success': True,
             'message': 'Graph data received successfully',
             'timestamp': datetime.now().isoformat(),
-            'graph_id': len(received_graphs)
+            'graph_id': record['id']
         }), 200
         
+    except HTTPException:
+        # Malformed or oversized bodies keep their own status code
+        raise
     except Exception as e:
         logger.error(f"Error processing graph data: {str(e)}")
         return jsonify({'error': f'Processing error: {str(e)}'}), 500
 
+def enqueue_graph(data, content_key, started):
+    """Queue a validated payload for the ingest workers and answer 202, or 429 if the queue is full"""
+    if not isinstance(data, dict) or not isinstance(data.get('rawContent', ''), str):
+        ingest_graphs.inc('single', 'rejected')
+        return jsonify({'error': 'Expected a JSON object with a string rawContent'}), 400
+    graph_id = uuid.uuid4().hex
+    if not ingest_queue.submit(graph_id, (data, content_key, started)):
+        ingest_graphs.inc('single', 'shed')
+        response = jsonify({'error': 'Ingest queue is full, retry later'})
+        response.headers['Retry-After'] = str(INGEST_RETRY_AFTER_SECONDS)
+        return response, 429
+    # Repeats arriving while this push is queued get the same id
+    dedup_index.add(content_key, graph_id)
+    ingest_graphs.inc('single', 'queued')
+    return jsonify({
+        'success': True,
+        'message': 'Graph data queued for processing',
+        'timestamp': datetime.now().isoformat(),
+        'graph_id': graph_id,
+        'status_url': f'/api/graphs/{graph_id}/status'
+    }), 202
+
+def ingest_queued(entries):
+    """Parse and store pushes queued in async mode; returns {graph id: error} for failures"""
+    picked_up = time.perf_counter()
+    failures = {}
+    accepted = []   # (graph id, payload, graph, counts, content key, started)
+    for graph_id, (data, content_key, started), queued_at in entries:
+        ingest_stage_duration.observe(picked_up - queued_at, 'async', 'queue')
+        mark = time.perf_counter()
+        try:
+            accepted.append((graph_id, data, *parse_graph(data), content_key, started))
+        except Exception as e:
+            logger.error(f"Error processing queued graph {graph_id}: {str(e)}")
+            failures[graph_id] = f'Processing error: {str(e)}'
+            dedup_index.discard(content_key)
+        timed_stage('async', 'parse', mark)
+    if not accepted:
+        return failures
+
+    mark = time.perf_counter()
+    records = store_graphs(
+        [(data, graph) for _, data, graph, _, _, _ in accepted],
+        [content_key for _, _, _, _, content_key, _ in accepted],
+        [graph_id for graph_id, *_ in accepted]
+    )
+    mark = timed_stage('async', 'store', mark)
+    for (_, _, _, counts, _, started), record in zip(accepted, records):
+        if not ingest_log.verbose:
+            log_ingested(record, counts, started)
+    if ingest_log.verbose:
+        log_statistics()
+    timed_stage('async', 'log', mark)
+    ingest_graphs.inc('async', 'accepted', amount=len(records))
+    ingest_graphs.inc('async', 'rejected', amount=len(failures))
+    return failures
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines')
+
+def read_batch_items():
+    """Decode a batch request body into a list of (payload, error) pairs"""
+    if request.mimetype in NDJSON_TYPES:
+        items = []
+        for line in request.get_data().splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append((json.loads(line), None))
+            except ValueError as e:
+                items.append((None, f'Invalid JSON: {str(e)}'))
+        return items
+    payloads = request.get_json(silent=True)
+    if not isinstance(payloads, list):
+        return None
+    return [(payload, None) for payload in payloads]
+
+@app.route('/api/graph-data/batch', methods=['POST'])
+def receive_graph_data_batch():
+    """Receive many graph payloads in one request, as a JSON array or NDJSON"""
+    started = time.perf_counter()
+    items = read_batch_items()
+    mark = timed_stage('batch', 'decode', started)
+    ingest_payload_bytes.observe(len(request.get_data()), 'batch')
+    if items is None:
+        logger.warning("Received batch that is not a JSON array or NDJSON")
+        return jsonify({'error': 'Expected a JSON array or NDJSON body'}), 400
+    if BATCH_MAX_ITEMS and len(items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Batch of {len(items)} graphs exceeds the limit of {BATCH_MAX_ITEMS}'}), 413
+
+    results = [None] * len(items)
+    accepted = []   # (index, payload, graph, counts, content key)
+    batch_keys = {}     # content key -> index of its first payload in this batch
+    repeats = []        # (index, index of the identical payload stored by this batch)
+    duplicates = 0
+    parse_seconds = 0.0
+    for index, (data, error) in enumerate(items):
+        if error is None and not (isinstance(data, dict) and data):
+            error = 'No data received'
+        if error is None:
+            content_key = dedup_index.key(data)
+            duplicate = find_duplicate(content_key)
+            if duplicate is not None:
+                log_duplicate(duplicate, data, 'batch')
+                results[index] = {'index': index, 'success': True, 'graph_id': duplicate, 'duplicate': True}
+                duplicates += 1
+                continue
+            if content_key is not None and content_key in batch_keys:
+                repeats.append((index, batch_keys[content_key]))
+                continue
+            parse_started = time.perf_counter()
+            try:
+                accepted.append((index, data, *parse_graph(data), content_key))
+                if content_key is not None:
+                    batch_keys[content_key] = index
+                continue
+            except Exception as e:
+                error = f'Processing error: {str(e)}'
+            finally:
+                parse_seconds += time.perf_counter() - parse_started
+        results[index] = {'index': index, 'success': False, 'error': error}
+    # The loop's time is split into parsing and everything else, mostly hashing
+    ingest_stage_duration.observe(parse_seconds, 'batch', 'parse')
+    mark = timed_stage('batch', 'dedup', mark + parse_seconds)
+
+    try:
+        records = store_graphs(
+            [(data, graph) for _, data, graph, _, _ in accepted],
+            [content_key for *_, content_key in accepted]
+        ) if accepted else []
+    except Exception as e:
+        logger.error(f"Error processing graph batch: {str(e)}")
+        return jsonify({'error': f'Processing error: {str(e)}'}), 500
+    mark = timed_stage('batch', 'store', mark)
+
+    stored = {}
+    for (index, _, _, counts, _), record in zip(accepted, records):
+        stored[index] = record
+        results[index] = {'index': index, 'success': True, 'graph_id': record['id']}
+        if not ingest_log.verbose:
+            log_ingested(record, counts, started)
+    for index, first in repeats:
+        results[index] = {'index': index, 'success': True, 'graph_id': stored[first]['id'], 'duplicate': True}
+        log_duplicate(stored[first]['id'], items[index][0], 'batch')
+    duplicates += len(repeats)
+    if ingest_log.verbose:
+        log_statistics()
+    timed_stage('batch', 'log', mark)
+    ingest_graphs.inc('batch', 'accepted', amount=len(records))
+    ingest_graphs.inc('batch', 'rejected', amount=len(items) - len(records) - duplicates)
+
+    return jsonify({
+        'success': len(records) + duplicates == len(items),
+        'received': len(items),
+        'accepted': len(records),
+        'duplicates': duplicates,
+        'rejected': len(items) - len(records) - duplicates,
+        'timestamp': datetime.now().isoformat(),
+        'results': results
+    }), 200
+
+def stats_snapshot():
+    """Counters shared by /api/stats and the event stream"""
+    return {
+        'total_received': stats.total_received.value,
+        'duplicates': stats.duplicates.value,
+        'unique_videos': len(stats.unique_videos),
+        'start_time': stats.start_time.isoformat(),
+        'latest_graphs': len(graph_store)
+    }
+
+def stats_version():
+    """Changes with every ingest, and at least every STATS_CACHE_SECONDS"""
+    clock = int(time.monotonic() // STATS_CACHE_SECONDS) if STATS_CACHE_SECONDS > 0 else time.monotonic()
+    return graph_store.version, stats.total_received.value, stats.duplicates.value, clock
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get server statistics"""
-    return jsonify({
-        'total_received': stats['total_received'],
-        'unique_videos': len(stats['unique_videos']),
-        'server_uptime': str(datetime.now() - stats['start_time']),
-        'start_time': stats['start_time'].isoformat(),
-        'latest_graphs': len(received_graphs)
+    return response_cache.respond(request, ('stats',), stats_version(), build_stats)
+
+def build_stats():
+    return {
+        **stats_snapshot(),
+        'server_uptime': str(stats.uptime),
+        'store': {**graph_store.stats(), 'interned_strings': len(STRINGS)},
+        'dedup': dedup_index.stats(),
+        'concepts': concept_graph.stats(),
+        'layout': layouts.stats(),
+        'metrics': video_metrics.stats(),
+        'persistence': persistence.stats() if persistence else None,
+        'parse_pool': parse_pool.stats(),
+        'ingest': {'mode': INGEST_MODE, **(ingest_queue.stats() if ingest_queue else {})},
+        'response_cache': response_cache.stats(),
+        'stream_clients': len(event_bus)
+    }
+
+def format_sse(event_type, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event_type}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.route('/api/stream', methods=['GET'])
+def stream_events():
+    """Stream new graph summaries and stats changes as Server-Sent Events"""
+    max_clients = app.config['STREAM_MAX_CLIENTS']
+    if event_bus.closed or (max_clients and len(event_bus) >= max_clients):
+        response = jsonify({'error': 'Event stream unavailable, too many open dashboards'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    subscription = event_bus.subscribe()
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            last_stats = stats_snapshot()
+            yield format_sse('stats', last_stats)
+
+            while True:
+                event = subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                if subscription.take_dropped():
+                    # This client fell behind and lost events; have it refetch
+                    yield format_sse('resync', {})
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+
+                event_type, payload = event
+                if event_type == 'shutdown':
+                    yield format_sse(event_type, payload)
+                    return
+                if event_type == 'stats':
+                    # Only send counters that changed since this client last heard
+                    payload = {key: value for key, value in payload.items() if last_stats.get(key) != value}
+                    if not payload:
+                        continue
+                    last_stats.update(payload)
+                yield format_sse(event_type, payload)
+        finally:
+            subscription.close()
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
+def record_metadata(record):
+    return record['data'].get('metadata') or {}
+
+def record_nodes(record):
+    graph = record['graph']
+    if graph is None:
+        return record['data'].get('nodes') or []
+    return [node_json(label) for label in graph.labels()]
+
+def record_edges(record):
+    graph = record['graph']
+    if graph is None:
+        return record['data'].get('edges') or []
+    return [edge_json(triple) for triple in graph.triples()]
+
+def record_node_count(record):
+    graph = record['graph']
+    return graph.node_count if graph is not None else len(record['data'].get('nodes') or [])
+
+def record_edge_count(record):
+    graph = record['graph']
+    return graph.edge_count if graph is not None else len(record['data'].get('edges') or [])
+
+# Fields a graph list can be projected to, each computed from the stored record
+# only when it is requested
+GRAPH_FIELDS = {
+    'id': lambda record: record['id'],
+    'timestamp': lambda record: record['timestamp'],
+    'videoId': lambda record: record_metadata(record).get('videoId'),
+    'videoTitle': lambda record: record_metadata(record).get('videoTitle'),
+    'channelName': lambda record: record_metadata(record).get('channelName'),
+    'batchId': lambda record: record_metadata(record).get('batchId'),
+    'nodeCount': record_node_count,
+    'edgeCount': record_edge_count,
+    'metadata': record_metadata,
+    'contentType': lambda record: record['data'].get('contentType'),
+    'rawContent': lambda record: record['data'].get('rawContent'),
+    'nodes': record_nodes,
+    'edges': record_edges,
+    'data': lambda record: record_json(record)['data']
+}
+SUMMARY_FIELDS = ('id', 'timestamp', 'videoId', 'videoTitle', 'channelName', 'batchId', 'nodeCount', 'edgeCount')
+FULL_FIELDS = ('id', 'timestamp', 'data')
+# Fields large enough that a list carrying them is streamed
+LARGE_FIELDS = frozenset(('rawContent', 'nodes', 'edges', 'data'))
+
+def project_record(record, fields):
+    """The given GRAPH_FIELDS of a stored graph"""
+    return {name: GRAPH_FIELDS[name](record) for name in fields}
+
+def graph_summary(record):
+    """Lightweight summary of a stored graph for list views"""
+    return project_record(record, SUMMARY_FIELDS)
+
+@app.before_request
+def start_request_timer():
+    if prometheus.enabled:
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and time it by route; runs after compression"""
+    started = g.get('request_started')
+    if started is not None:
+        # The matched route pattern keeps label values bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_requests.inc(route, request.method, str(response.status_code))
+        http_duration.observe(time.perf_counter() - started, route)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress responses for clients that accept gzip or zstd"""
+    return response_compressor(request, response)
+
+def iter_json(fields, list_key, items):
+    """Serialize ``{**fields, list_key: items}`` one list item at a time"""
+    head = json.dumps(fields, ensure_ascii=False)[:-1]
+    yield f'{head}{", " if fields else ""}"{list_key}": ['.encode('utf-8')
+    separator = b''
+    for item in items:
+        yield separator + dumps_json(item)
+        separator = b', '
+    yield b']}'
+
+def stream_json(fields, list_key, items):
+    """Streamed JSON response, compressed on the fly when the client accepts it
+
+    The body is never held in memory as a whole, which matters for lists of
+    full graphs that carry their raw content and parsed structures.
+    """
+    chunks = iter_json(fields, list_key, items)
+    encoding = negotiate(request.accept_encodings) if response_compressor.enabled else None
+    if encoding is None:
+        return Response(chunks, mimetype='application/json')
+    response = Response(iter_compressed(chunks, encoding), mimetype='application/json')
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def encode_cursor(sequence):
+    """Opaque page cursor for a graph store position"""
+    return base64.urlsafe_b64encode(f'g{sequence}'.encode('ascii')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Graph store position of a page cursor; raises ValueError if it is not one"""
+    try:
+        text = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    if not text.startswith('g') or not text[1:].isdigit():
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return int(text[1:])
+
+def parse_time(value):
+    """Local naive datetime of an ISO 8601 query parameter, comparable to graph timestamps"""
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid ISO 8601 time: {value}')
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+def received_between(since, until):
+    """Record filter for graphs received at or after ``since`` and before ``until``"""
+    def where(record):
+        try:
+            received = datetime.fromisoformat(record['timestamp'])
+        except (TypeError, ValueError):
+            return False
+        if received.tzinfo is not None:
+            received = received.astimezone().replace(tzinfo=None)
+        return (since is None or received >= since) and (until is None or received < until)
+    return where
+
 @app.route('/api/graphs', methods=['GET'])
 def get_graphs():
-    """Get all received graphs"""
-    limit = request.args.get('limit', 10, type=int)
+    """Page through received graphs, optionally filtered by video, channel, batch or time"""
+    limit = min(max(1, request.args.get('limit', 10, type=int)), 1000)
+    full = request.args.get('full', '').lower() in ('1', 'true', 'yes')
+    fields = request.args.get('fields')
+    try:
+        before = decode_cursor(request.args['before']) if 'before' in request.args else None
+        after = decode_cursor(request.args['after']) if 'after' in request.args else None
+        since = parse_time(request.args['since']) if 'since' in request.args else None
+        until = parse_time(request.args['until']) if 'until' in request.args else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if fields:
+        fields = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+        unknown = [name for name in fields if name not in GRAPH_FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}; "
+                                     f"available: {', '.join(GRAPH_FIELDS)}"}), 400
+    else:
+        fields = FULL_FIELDS if full else SUMMARY_FIELDS
+
+    def build_page():
+        page, more = graph_store.page(
+            limit,
+            before=before,
+            after=after,
+            video_id=request.args.get('videoId'),
+            channel=request.args.get('channelName'),
+            batch_id=request.args.get('batchId'),
+            where=received_between(since, until) if since is not None or until is not None else None
+        )
+        # Cursors continue from either end of the page; with no graphs newer than
+        # an after cursor, polling continues from that same cursor
+        cursors = {
+            'before': encode_cursor(page[0][0]) if page else None,
+            'after': encode_cursor(page[-1][0]) if page else (encode_cursor(after) if after is not None else None)
+        }
+        if after is None and not more:
+            cursors['before'] = None
+        head = {'total': len(graph_store), 'cursors': cursors, 'hasMore': more}
+        return head, (project_record(record, fields) for _, record in page)
+
+    if LARGE_FIELDS.intersection(fields):
+        # Too big to keep; serialized as it is sent instead
+        head, graphs = build_page()
+        return stream_json(head, 'graphs', graphs)
+
+    def build():
+        head, graphs = build_page()
+        return {'graphs': list(graphs), **head}
+
+    key = ('graphs', tuple(sorted(request.args.items(multi=True))))
+    return response_cache.respond(request, key, graph_store.version, build)
+
+@app.route('/api/graphs/<graph_id>', methods=['GET'])
+def get_graph(graph_id):
+    """Get a single received graph by id"""
+    record = graph_store.get(graph_id)
+    if record is None:
+        return jsonify({'error': f'Graph not found: {graph_id}'}), 404
+
+    # Stored graphs never change, so the id is a valid strong validator
+    response = jsonify(record_json(record))
+    response.set_etag(graph_id)
+    return response.make_conditional(request)
+
+@app.route('/api/graphs/<graph_id>/status', methods=['GET'])
+def get_graph_status(graph_id):
+    """Whether a pushed graph is queued, being processed, stored or failed"""
+    if graph_id in graph_store:
+        return jsonify({'id': graph_id, 'status': 'stored'})
+    status, error = ingest_queue.status(graph_id) if ingest_queue else (None, None)
+    if status is None:
+        return jsonify({'error': f'Graph not found: {graph_id}'}), 404
+    body = {'id': graph_id, 'status': status}
+    if error:
+        body['error'] = error
+    return jsonify(body)
+
+@app.route('/api/videos', methods=['GET'])
+def get_videos():
+    """Get summaries of the merged per-video graphs"""
+    return jsonify({'videos': video_graphs.summaries()})
+
+@app.route('/api/videos/<video_id>/graph', methods=['GET'])
+def get_video_graph(video_id):
+    """Get the merged, deduplicated graph of every batch received for a video"""
+    video_graph = video_graphs.get(video_id)
+    if video_graph is None:
+        return jsonify({'error': f'No graph for video: {video_id}'}), 404
+
+    # The version changes whenever a batch adds nodes or edges
+    response = jsonify(video_graph.to_json())
+    response.set_etag(video_graph.etag)
+    return response.make_conditional(request)
+
+def ranked_view(video_graph, view, kind, **options):
+    """Finish a partial graph view: node metrics, view description and ETag"""
+    metrics = video_metrics.get(video_graph.video_id)
+    pagerank = metrics['pagerank'] if metrics else {}
+    community = metrics['community'] if metrics else {}
+    degrees = video_graph.degrees(node['id'] for node in view['nodes'])
+    for node in view['nodes']:
+        node['degree'] = degrees.get(node['id'], 0)
+        if metrics:
+            node['pagerank'] = round(pagerank.get(node['id'], 0.0), 6)
+            node['community'] = community.get(node['id'])
+    view['view'] = {'kind': kind, **options}
+    view['truncated'] = len(view['nodes']) < view['totalNodes']
+    # Metrics lag the graph by the time it takes to compute them
+    view['metricsVersion'] = metrics['version'] if metrics else None
+
+    response = jsonify(view)
+    option_key = '-'.join(f'{key}={value}' for key, value in options.items())
+    response.set_etag(f"{video_graph.etag}-{view['metricsVersion']}-{kind}-{option_key}")
+    return response.make_conditional(request)
+
+def metrics_unavailable(video_id):
+    """Response for views that need metrics a video does not have yet, or None"""
+    if not video_metrics.enabled:
+        return jsonify({'error': 'Graph metrics are disabled'}), 501
+    if video_metrics.get(video_id) is None:
+        status = 'pending' if video_metrics.is_pending(video_id) else 'unavailable'
+        return jsonify({'videoId': video_id, 'status': status}), 202
+    return None
+
+@app.route('/api/videos/<video_id>/graph/top', methods=['GET'])
+def get_video_graph_top(video_id):
+    """The k most connected or most central concepts of a video and the edges among them"""
+    video_graph = video_graphs.get(video_id)
+    if video_graph is None:
+        return jsonify({'error': f'No graph for video: {video_id}'}), 404
+    k = min(max(1, request.args.get('k', 100, type=int)), 2000)
+    by = request.args.get('by', 'degree')
+    if by == 'degree':
+        labels = video_graph.top_by_degree(k)
+    elif by == 'pagerank':
+        unavailable = metrics_unavailable(video_id)
+        if unavailable:
+            return unavailable
+        ranks = video_metrics.get(video_id)['pagerank']
+        labels = heapq.nlargest(k, ranks, key=ranks.get)
+    else:
+        return jsonify({'error': 'Parameter by must be degree or pagerank'}), 400
+    return ranked_view(video_graph, video_graph.subgraph_json(labels), 'top', by=by, k=k)
+
+@app.route('/api/videos/<video_id>/graph/neighborhood', methods=['GET'])
+def get_video_graph_neighborhood(video_id):
+    """Concepts within k hops of one concept of a video"""
+    video_graph = video_graphs.get(video_id)
+    if video_graph is None:
+        return jsonify({'error': f'No graph for video: {video_id}'}), 404
+    node = request.args.get('node', '')
+    depth = min(max(1, request.args.get('depth', 1, type=int)), 3)
+    limit = min(max(1, request.args.get('limit', 200, type=int)), 2000)
+    labels = video_graph.hop_neighborhood(node, depth=depth, limit=limit)
+    if labels is None:
+        return jsonify({'error': f'No node {node!r} in graph of video: {video_id}'}), 404
+    return ranked_view(video_graph, video_graph.subgraph_json(labels), 'neighborhood',
+                       node=node, depth=depth, limit=limit)
+
+@app.route('/api/videos/<video_id>/graph/communities', methods=['GET'])
+def get_video_graph_communities(video_id):
+    """A video's graph with each community collapsed into one super-node"""
+    video_graph = video_graphs.get(video_id)
+    if video_graph is None:
+        return jsonify({'error': f'No graph for video: {video_id}'}), 404
+    unavailable = metrics_unavailable(video_id)
+    if unavailable:
+        return unavailable
+    limit = min(max(1, request.args.get('limit', 50, type=int)), 500)
+    metrics = video_metrics.get(video_id)
+    community = metrics['community']
+    ranks = metrics['pagerank']
+
+    largest = heapq.nlargest(limit, metrics['communitySizes'].items(), key=lambda item: item[1])
+    shown = {community_id: [] for community_id, _ in largest}
+    for label, community_id in community.items():
+        if community_id in shown:
+            shown[community_id].append(label)
+    nodes = []
+    for community_id, size in largest:
+        members = heapq.nlargest(5, shown[community_id], key=ranks.get)
+        nodes.append({
+            'id': f'community:{community_id}',
+            'label': members[0] if size == 1 else f'{members[0]} (+{size - 1})',
+            'type': 'community',
+            'community': community_id,
+            'size': size,
+            'members': members
+        })
+
+    # Links between shown communities, counted in both directions together
+    _, _, _, pairs = video_graph.structure()
+    links = {}
+    for subject, obj in pairs:
+        source, target = community.get(subject), community.get(obj)
+        if source == target or source not in shown or target not in shown:
+            continue
+        key = (source, target) if source < target else (target, source)
+        links[key] = links.get(key, 0) + 1
+    edges = [
+        {'from': f'community:{a}', 'to': f'community:{b}', 'label': f'{count} links',
+         'type': 'relationship', 'count': count}
+        for (a, b), count in links.items()
+    ]
+
+    response = jsonify({
+        'videoId': video_id,
+        'version': video_graph.version,
+        'metricsVersion': metrics['version'],
+        'metadata': dict(video_graph.metadata),
+        'totalNodes': len(community),
+        'totalCommunities': len(metrics['communitySizes']),
+        'truncated': len(largest) < len(metrics['communitySizes']),
+        'view': {'kind': 'communities', 'limit': limit},
+        'nodes': nodes,
+        'edges': edges
+    })
+    response.set_etag(f"{video_graph.etag}-{metrics['version']}-communities-{limit}")
+    return response.make_conditional(request)
+
+@app.route('/api/videos/<video_id>/graph/communities/<int:community_id>', methods=['GET'])
+def get_video_graph_community(video_id, community_id):
+    """The concepts of one community of a video, most central first"""
+    video_graph = video_graphs.get(video_id)
+    if video_graph is None:
+        return jsonify({'error': f'No graph for video: {video_id}'}), 404
+    unavailable = metrics_unavailable(video_id)
+    if unavailable:
+        return unavailable
+    limit = min(max(1, request.args.get('limit', 200, type=int)), 2000)
+    metrics = video_metrics.get(video_id)
+    members = [label for label, community in metrics['community'].items() if community == community_id]
+    if not members:
+        return jsonify({'error': f'No community {community_id} in graph of video: {video_id}'}), 404
+    labels = heapq.nlargest(limit, members, key=metrics['pagerank'].get)
+    return ranked_view(video_graph, video_graph.subgraph_json(labels), 'community',
+                       community=community_id, limit=limit)
+
+@app.route('/api/videos/<video_id>/layout', methods=['GET'])
+def get_video_layout(video_id):
+    """Precomputed node positions for a video's merged graph"""
+    if not layouts.enabled:
+        return jsonify({'error': 'Server-side layout is disabled'}), 501
+    video_graph = video_graphs.get(video_id)
+    if video_graph is None:
+        return jsonify({'error': f'No graph for video: {video_id}'}), 404
+    layout = layouts.get(video_id)
+    if layout is None:
+        return jsonify({'videoId': video_id, 'status': 'pending' if layouts.is_pending(video_id) else 'unavailable'}), 202
+
+    # A layout lags its graph by the time it takes to compute; nodes added
+    # since then have no position yet
+    response = jsonify({
+        'videoId': video_id,
+        'version': layout['version'],
+        'graphVersion': video_graph.version,
+        'stale': layout['version'] != video_graph.version,
+        'warmStart': layout['warmStart'],
+        'took_ms': layout['took_ms'],
+        'positions': layout['positions']
+    })
+    response.set_etag(f"{video_id}-{layout['instance']}-{layout['version']}-{video_graph.version}-layout")
+    return response.make_conditional(request)
+
+@app.route('/api/videos/<video_id>/batches/<batch_id>/delta', methods=['GET'])
+def get_video_batch_delta(video_id, batch_id):
+    """Get the nodes and edges a batch added to its video's merged graph"""
+    video_graph = video_graphs.get(video_id)
+    delta = video_graph.delta_json(batch_id) if video_graph else None
+    if delta is None:
+        return jsonify({'error': f'No batch {batch_id} for video: {video_id}'}), 404
+    return jsonify(delta)
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Find videos whose concepts, relationships, title or channel match a query"""
+    started = time.perf_counter()
+    query = request.args.get('q', '')
+    prefix = request.args.get('prefix', '').lower() in ('1', 'true', 'yes')
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', 20, type=int)), 100)
+
+    terms = parse_query(query, prefix_last=prefix)
+    if not terms:
+        return jsonify({'error': 'Query parameter q must contain at least one word'}), 400
+
+    total, matches = search_index.search(terms, offset=offset, limit=limit)
+    results = []
+    for video_id, score, matched in matches:
+        video_graph = video_graphs.get(video_id)
+        summary = video_graph.summary() if video_graph else {'videoId': video_id}
+        results.append({**summary, 'score': round(score, 4), 'matched': matched})
+
     return jsonify({
-        'graphs': received_graphs[-limit:],
-        'total': len(received_graphs)
+        'query': query,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 3)
     })
 
+@app.route('/api/concepts/neighborhood', methods=['GET'])
+def get_concept_neighborhood():
+    """A concept and the concepts within a few hops of it, across all videos"""
+    concept = request.args.get('concept', '')
+    depth = min(max(1, request.args.get('depth', 1, type=int)), 3)
+    limit = min(max(1, request.args.get('limit', 100, type=int)), 500)
+    if not concept.strip():
+        return jsonify({'error': 'Query parameter concept is required'}), 400
+
+    neighborhood = concept_graph.neighborhood(concept, depth=depth, limit=limit)
+    if neighborhood is None:
+        return jsonify({'error': f'Unknown concept: {concept}'}), 404
+    return jsonify(neighborhood)
+
+@app.route('/api/concepts/path', methods=['GET'])
+def get_concept_path():
+    """Shortest chain of relationships linking two concepts"""
+    start = request.args.get('from', '')
+    end = request.args.get('to', '')
+    max_depth = min(max(1, request.args.get('maxDepth', 6, type=int)), 10)
+    if not start.strip() or not end.strip():
+        return jsonify({'error': 'Query parameters from and to are required'}), 400
+
+    path = concept_graph.shortest_path(start, end, max_depth=max_depth)
+    if path is None:
+        return jsonify({'error': f'Unknown concept: {start} or {end}'}), 404
+    return jsonify({'from': start, 'to': end, 'found': bool(path['path']), **path})
+
+@app.route('/api/concepts/aliases', methods=['GET', 'POST'])
+def concept_aliases():
+    """List aliases, or add {alias: canonical} pairs and merge existing concepts"""
+    if request.method == 'GET':
+        return jsonify({'aliases': concept_graph.aliases()})
+
+    aliases = request.get_json(silent=True)
+    if not isinstance(aliases, dict) or not all(
+            isinstance(alias, str) and isinstance(canonical, str) for alias, canonical in aliases.items()):
+        return jsonify({'error': 'Request body must be a JSON object of {alias: canonical label}'}), 400
+    try:
+        merged = sum(concept_graph.add_alias(alias, canonical) for alias, canonical in aliases.items())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'added': len(aliases), 'merged': merged, **concept_graph.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Server metrics in the Prometheus text exposition format"""
+    if not prometheus.enabled:
+        return jsonify({'error': 'Metrics are disabled (GRAPH_PROMETHEUS=off)'}), 501
+    return Response(prometheus.render(), content_type='text/plain; version=0.0.4; charset=utf-8',
+                    headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'uptime': str(datetime.now() - stats['start_time'])
+        'uptime': str(stats.uptime)
     })
 
 @app.route('/', methods=['GET'])
@@ -1095,6 +2623,32 @@ def index():
     """Live graph dashboard"""
     return render_template_string(DASHBOARD_TEMPLATE)
 
+def restore_from_storage():
+    """Rebuild the in-memory store, merged graphs, duplicate index and stats from persistent storage"""
+    if storage_backend is None:
+        return
+    started = time.perf_counter()
+    records, total, video_ids = storage_backend.load(graph_store.max_graphs)
+    restored_videos = {}
+    for record in records:
+        record['data'], record['graph'] = compact_stored_graph(record['data'])
+        graph_store.add(record['data'], record['timestamp'], graph_id=record['id'], graph=record['graph'])
+        dedup_index.add(dedup_index.key(record['data']), record['id'])
+        video_update = merge_video_graph(record)
+        if video_update:
+            restored_videos[video_update[0].video_id] = video_update[0]
+    for video_graph in restored_videos.values():
+        if video_graphs.get(video_graph.video_id) is video_graph:
+            layouts.schedule(video_graph)
+            video_metrics.schedule(video_graph)
+    stats.restore(total, video_ids)
+    logger.info(
+        f"Restored {len(records)} of {total} stored graphs from {storage_backend.name} "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+restore_from_storage()
+
 def print_startup_info():
     """Print startup information"""
     print("\n" + "="*80)
@@ -1104,6 +2658,7 @@ def print_startup_info():
     print(f"Dashboard URL: http://localhost:5000")
     print(f"Graph Data Endpoint: http://localhost:5000/api/graph-data")
     print(f"Stats Endpoint: http://localhost:5000/api/stats")
+    print("Metrics Endpoint: http://localhost:5000/metrics")
     print(f"Logs: Check console and graph_data.log file")
     print("\nExtension Configuration:")
     print("   Graph Push API URL: http://localhost:5000/api/graph-data")
@@ -1119,10 +2674,11 @@ def print_startup_info():
 if __name__ == '__main__':
     print_startup_info()
     
-    # Start the server
+    # Start the development server. For production use
+    # `python start_live_server.py serve` instead.
     app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=True,
+        host=os.environ.get('FLASK_HOST', '0.0.0.0'),
+        port=int(os.environ.get('FLASK_PORT', 5000)),
+        debug=env_flag('FLASK_DEBUG', default=True),
         threaded=True
     )
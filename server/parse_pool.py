@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Process Pool Parsing
+Parse large ``rawContent`` payloads in worker processes, so several big
+transcripts use several cores instead of queueing on the GIL
+
+Workers return the packed form of a CompactGraph: the distinct strings of
+the graph once, plus two integer arrays. That is much smaller to send back
+than a list of triples, and the server only interns each distinct string
+and renumbers the predicate ids to adopt it. Payloads below ``min_bytes``
+are parsed in the request thread, where sending them to a worker would
+cost more than parsing them (see ``benchmark.py parse-pool``).
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from compact_graph import CompactGraph, pack_triples
+from triple_parser import parse_into
+
+logger = logging.getLogger(__name__)
+# Longest wait for every worker to start when the pool is created
+STARTUP_TIMEOUT = 60
+_startup_barrier = None
+
+
+def parse_packed(raw_content):
+    """Parse ``raw_content`` into ``pack_triples`` form; runs in a worker process"""
+    return pack_triples(parse_into(raw_content, []))
+
+
+def _init_worker(barrier):
+    global _startup_barrier
+    _startup_barrier = barrier
+
+
+def _ready():
+    # Held until one task runs in every worker, so no worker is started later
+    _startup_barrier.wait(STARTUP_TIMEOUT)
+    return True
+
+
+class ParsePool:
+    """Process pool for parsing payloads of at least ``min_bytes`` characters
+
+    With ``processes`` set to 0 the pool is disabled and every payload is
+    parsed inline. Workers are forked when the pool is created, so create it
+    while the server process is still small and before it starts any thread.
+    """
+
+    def __init__(self, processes=0, min_bytes=256 * 1024):
+        self.processes = processes
+        self.min_bytes = min_bytes
+        self.offloaded = 0
+        self.fallbacks = 0
+        self._executor = None
+        if processes > 0:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+            # Locks can only reach workers as arguments of their process
+            barrier = context.Barrier(processes)
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes, mp_context=context, initializer=_init_worker, initargs=(barrier,)
+            )
+            # Some Python versions start workers on demand, one per submission
+            # that finds no idle worker. Tasks that wait for each other occupy
+            # every worker, so all of them are started here
+            for future in [self._executor.submit(_ready) for _ in range(processes)]:
+                future.result()
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+    def offloads(self, raw_content):
+        """Whether ``raw_content`` is big enough to parse in a worker"""
+        return self._executor is not None and len(raw_content) >= self.min_bytes
+
+    def parse(self, raw_content):
+        """CompactGraph of ``raw_content``, parsed in a worker process
+
+        Falls back to parsing inline if the worker fails. A pool broken by a
+        killed worker is shut down and later payloads are parsed inline.
+        """
+        executor = self._executor
+        try:
+            packed = executor.submit(parse_packed, raw_content).result()
+            self.offloaded += 1
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self._executor is executor:
+                logger.error("Parse process pool is broken, parsing inline from now on")
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                logger.error(f"Parse worker failed, parsing inline: {str(e)}")
+            self.fallbacks += 1
+            packed = parse_packed(raw_content)
+        return CompactGraph.from_packed(*packed)
+
+    def close(self):
+        """Cancel queued parses and wait for the workers to exit"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'processes': self.processes,
+            'min_bytes': self.min_bytes,
+            'offloaded': self.offloaded,
+            'fallbacks': self.fallbacks
+        }
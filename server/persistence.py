@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Graph Persistence
+Durable storage for received graphs so they survive server restarts
+
+Backends, selected with ``GRAPH_STORAGE``:
+
+- ``sqlite`` (default): a single SQLite database in WAL mode
+- ``jsonl``: append-only JSON Lines segment files in a directory
+- ``memory``: no persistence
+
+Writes happen on a background thread that commits queued graphs in batches,
+so requests never wait on disk I/O. Graphs are stored as they are kept in
+memory: ``rawContent`` without the nodes, edges and triples parsed from it,
+which a warm start parses again for the graphs it loads.
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteBackend:
+    """Graphs stored as rows in a WAL-mode SQLite database"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None     # owned by the writer thread
+        connection = self._connect()
+        try:
+            connection.executescript('''
+                CREATE TABLE IF NOT EXISTS graphs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    timestamp TEXT NOT NULL,
+                    video_id TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS graphs_video_id ON graphs (video_id);
+            ''')
+        finally:
+            connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # WAL keeps the database consistent on a crash with NORMAL; only the
+        # last few transactions can be lost on power failure
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def write_batch(self, records):
+        if self._connection is None:
+            self._connection = self._connect()
+        rows = [
+            (record['id'], record['timestamp'], record['video_id'], record['data'])
+            for record in records
+        ]
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO graphs (id, timestamp, video_id, data) VALUES (?, ?, ?, ?)',
+                rows
+            )
+
+    def load(self, limit):
+        """Return (records, total, video_ids) with the newest ``limit`` graphs, oldest first"""
+        connection = self._connect()
+        try:
+            total = connection.execute('SELECT COUNT(*) FROM graphs').fetchone()[0]
+            video_ids = [row[0] for row in connection.execute(
+                'SELECT DISTINCT video_id FROM graphs WHERE video_id IS NOT NULL')]
+            query = 'SELECT id, timestamp, data FROM graphs ORDER BY seq DESC'
+            params = ()
+            if limit:
+                query += ' LIMIT ?'
+                params = (limit,)
+            rows = connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
+        rows.reverse()
+        records = [{'id': row[0], 'timestamp': row[1], 'data': json.loads(row[2])} for row in rows]
+        return records, total, video_ids
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class JsonlBackend:
+    """Graphs appended to rotating JSON Lines segment files
+
+    ``index.json`` next to the segments holds each segment's size, graph
+    count and video ids, so loading only reads the segments it needs for the
+    newest graphs. A segment whose size no longer matches its entry, such as
+    the one being written when the server stopped, is scanned again, decoding
+    only the small envelope in front of each payload.
+    """
+
+    name = 'jsonl'
+    INDEX_NAME = 'index.json'
+    # Every line is the envelope object followed by this and the payload
+    _DATA_SEPARATOR = ', "data": '
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        segments = self._segments()
+        self._segment_number = int(segments[-1][len('graphs-'):-len('.jsonl')]) if segments else 1
+        self._file = None
+        self._index = self._read_index()   # segment name -> {'bytes', 'graphs', 'video_ids'}
+
+    def _segments(self):
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith('graphs-') and name.endswith('.jsonl')
+        )
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f'graphs-{number:06d}.jsonl')
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, self.INDEX_NAME), encoding='utf-8') as f:
+                entries = json.load(f)
+            return {
+                name: {'bytes': entry['bytes'], 'graphs': entry['graphs'], 'video_ids': set(entry['videoIds'])}
+                for name, entry in entries.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.warning(f"Ignoring unreadable {self.INDEX_NAME}; segments will be scanned")
+            return {}
+
+    def _write_index(self):
+        entries = {
+            name: {'bytes': entry['bytes'], 'graphs': entry['graphs'], 'videoIds': sorted(entry['video_ids'])}
+            for name, entry in self._index.items()
+        }
+        path = os.path.join(self.directory, self.INDEX_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def _envelope(cls, line):
+        """The id, timestamp and videoId of a segment line, or None if it is unreadable"""
+        # Quotes inside JSON strings are escaped, so the first separator ends the envelope
+        cut = line.find(cls._DATA_SEPARATOR)
+        if cut < 0 or not line.rstrip().endswith('}'):
+            return None
+        try:
+            return json.loads(line[:cut] + '}')
+        except ValueError:
+            return None
+
+    def _segment_entry(self, name):
+        """Index entry of a segment, scanning the segment if it changed since it was indexed"""
+        path = os.path.join(self.directory, name)
+        size = os.path.getsize(path)
+        entry = self._index.get(name)
+        if entry is not None and entry['bytes'] == size:
+            return entry
+        entry = {'bytes': size, 'graphs': 0, 'video_ids': set()}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                envelope = self._envelope(line)
+                if envelope is None:
+                    # A torn final line from a crash mid-write
+                    logger.warning(f"Skipping unreadable line in {name}")
+                    continue
+                entry['graphs'] += 1
+                if envelope.get('videoId') is not None:
+                    entry['video_ids'].add(envelope['videoId'])
+        self._index[name] = entry
+        return entry
+
+    @staticmethod
+    def _open_segment(path):
+        """Open a segment for appending, ending a torn last line left by a crash first"""
+        torn = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b'\n'
+        segment = open(path, 'a', encoding='utf-8')
+        if torn:
+            # Otherwise the next record would be appended to the torn line
+            # and both would be skipped on load
+            segment.write('\n')
+        return segment
+
+    def write_batch(self, records):
+        path = self._segment_path(self._segment_number)
+        name = os.path.basename(path)
+        if self._file is None:
+            if os.path.exists(path):
+                self._segment_entry(name)
+            self._file = self._open_segment(path)
+        entry = self._index.setdefault(name, {'bytes': 0, 'graphs': 0, 'video_ids': set()})
+        # The payload is already serialized; splice it into the envelope
+        # rather than decoding and re-encoding it
+        lines = ''.join(
+            json.dumps({'id': record['id'], 'timestamp': record['timestamp'],
+                        'videoId': record['video_id']}, ensure_ascii=False)[:-1]
+            + self._DATA_SEPARATOR + record['data'] + '}\n'
+            for record in records
+        )
+        self._file.write(lines)
+        self._file.flush()
+        entry['graphs'] += len(records)
+        entry['video_ids'].update(record['video_id'] for record in records if record['video_id'] is not None)
+        entry['bytes'] = self._file.tell()
+        if entry['bytes'] >= self.segment_bytes:
+            self._file.close()
+            self._segment_number += 1
+            self._file = None
+            self._write_index()
+
+    def load(self, limit):
+        """Return (records, total, video_ids) with the newest ``limit`` graphs, oldest first"""
+        segments = self._segments()
+        indexed = dict(self._index)
+        entries = [self._segment_entry(name) for name in segments]
+        total = sum(entry['graphs'] for entry in entries)
+        video_ids = set().union(*(entry['video_ids'] for entry in entries))
+        if self._index != indexed or set(self._index) != set(segments):
+            self._index = {name: self._index[name] for name in segments}
+            self._write_index()
+
+        # Only the newest segments holding the last ``limit`` graphs are decoded
+        needed = limit or total
+        chosen = deque()
+        for name, entry in zip(reversed(segments), reversed(entries)):
+            if needed <= 0:
+                break
+            chosen.appendleft(name)
+            needed -= entry['graphs']
+        lines = deque(maxlen=limit or None)
+        for name in chosen:
+            with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                lines.extend(line for line in f if self._envelope(line) is not None)
+        records = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping unreadable stored graph")
+                total -= 1
+                continue
+            records.append({'id': entry['id'], 'timestamp': entry['timestamp'], 'data': entry['data']})
+        return records, total, list(video_ids)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._write_index()
+
+
+class PersistentWriter:
+    """Background thread that writes queued graphs to a backend in batches"""
+
+    def __init__(self, backend, batch_size=200, flush_interval=0.5, max_queue=10000):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='graph-persistence', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, record):
+        """Queue a stored graph record for writing
+
+        Serialization happens on the writer thread. Blocks only if the writer
+        has fallen ``max_queue`` graphs behind.
+        """
+        self._queue.put(record)
+
+    def enqueue_many(self, records):
+        for record in records:
+            self._queue.put(record)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+        self.backend.close()
+
+    def _write(self, batch):
+        try:
+            rows = []
+            for record in batch:
+                # Stored compactly, like in memory; the graph is parsed from
+                # rawContent again when it is loaded
+                data = record['data']
+                metadata = data.get('metadata') or {}
+                rows.append({
+                    'id': record['id'],
+                    'timestamp': record['timestamp'],
+                    'video_id': metadata.get('videoId'),
+                    'data': json.dumps(data, ensure_ascii=False)
+                })
+            self.backend.write_batch(rows)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to persist {len(batch)} graphs: {str(e)}")
+
+    def close(self, timeout=10):
+        """Flush queued graphs and stop the writer thread"""
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            'backend': self.backend.name,
+            'written': self.written,
+            'failed': self.failed,
+            'pending': self.pending
+        }
+
+
+def create_backend(kind, path=None):
+    """Create the storage backend named by ``kind``, or None for memory only"""
+    if kind == 'memory':
+        return None
+    if kind == 'sqlite':
+        return SQLiteBackend(path or 'graph_data.db')
+    if kind == 'jsonl':
+        return JsonlBackend(
+            path or 'graph_segments',
+            segment_bytes=int(os.environ.get('GRAPH_STORAGE_SEGMENT_BYTES', 64 * 1024 * 1024))
+        )
+    raise ValueError(f"GRAPH_STORAGE must be 'sqlite', 'jsonl' or 'memory', got {kind!r}")
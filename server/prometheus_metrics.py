@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Prometheus Metrics
+Counters, histograms and scrape-time gauges rendered in the Prometheus text
+exposition format for the ``/metrics`` endpoint
+
+Recording a value is a dict lookup, a bisect over the bucket bounds and a
+few additions under a per-metric lock, a microsecond or less, so the ingest
+hot path can be timed stage by stage. Gauges such as store size are read
+from their source only when the endpoint is scraped. A disabled registry
+turns every update into an immediate return.
+"""
+
+import bisect
+import math
+import threading
+
+# Seconds; ingest stages range from microseconds (logging) to seconds (large batches)
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes, from a single short batch up to the default 32 MB body limit
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 33554432)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}       # label values tuple -> value
+
+    def header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}'
+                for labels, value in values]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution, with sum and count, per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        if not self.registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket counts (the last is +Inf), sum, count
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def render(self):
+        with self._lock:
+            values = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._values.items()]
+        lines = []
+        for labels, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                label_text = _format_labels(self.label_names, labels, (('le', _format_value(float(bound))),))
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose value is read from ``collect`` at scrape time
+
+    ``collect`` returns a number, or a dict of {label values tuple: number}.
+    """
+
+    def __init__(self, registry, name, help_text, collect, labels=(), kind='gauge'):
+        super().__init__(registry, name, help_text, labels)
+        self.kind = kind
+        self.collect = collect
+
+    def render(self):
+        values = self.collect()
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}'
+                for labels, value in values.items()]
+
+
+class MetricsRegistry:
+    """Named metrics of one server, rendered together on scrape"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(self, name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labels, buckets))
+
+    def gauge(self, name, help_text, collect, labels=()):
+        return self._register(CallbackMetric(self, name, help_text, collect, labels))
+
+    def counter_callback(self, name, help_text, collect, labels=()):
+        """A counter kept elsewhere, e.g. an eviction count, read at scrape time"""
+        return self._register(CallbackMetric(self, name, help_text, collect, labels, kind='counter'))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format, version 0.0.4"""
+        lines = []
+        for metric in self._metrics:
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return '\n'.join(lines) + '\n'
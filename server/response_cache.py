@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Response Cache
+Serialized, optionally pre-compressed JSON bodies of read endpoints, reused
+until the data behind them changes
+
+Dashboards poll the same graph lists and stats over and over while nothing
+new has arrived. Each cached body belongs to a data version, such as the
+graph store's change counter: a request for the same query at the same
+version is answered with the stored bytes, compressed once per encoding,
+and a request carrying the body's ETag gets ``304 Not Modified`` with no
+body. A new version replaces the entry on the
+next request, so nothing is invalidated by hand. ``orjson`` is used to
+serialize when it is installed.
+"""
+
+import json
+import threading
+import uuid
+from collections import OrderedDict
+
+from flask import Response
+
+from http_compression import compress, negotiate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_ENCODER = 'orjson' if orjson else 'json'
+
+
+def dumps_json(obj):
+    """UTF-8 JSON bytes of ``obj``, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+class CachedBody:
+    """One serialized response body and its compressed forms"""
+
+    __slots__ = ('version', 'data', 'etag', 'encoded')
+
+    def __init__(self, version, data, etag):
+        self.version = version
+        self.data = data
+        self.etag = etag
+        self.encoded = {}       # content encoding -> compressed data
+
+    @property
+    def size(self):
+        return len(self.data) + sum(len(data) for data in self.encoded.values())
+
+
+class ResponseCache:
+    """LRU of JSON bodies keyed by endpoint and query, each valid for one data version
+
+    Entries are dropped least recently used first beyond ``max_entries`` or
+    ``max_bytes``. With ``compress`` set, bodies of at least
+    ``compress_min_bytes`` are compressed once per encoding clients accept.
+    A disabled cache serializes every request and sends no validators.
+    """
+
+    def __init__(self, enabled=True, max_entries=256, max_bytes=32 * 1024 * 1024,
+                 compress=True, compress_min_bytes=1024):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.total_bytes = 0
+        # ETags must not repeat across restarts, where versions start over
+        self._instance = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> CachedBody, least recently used first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def respond(self, request, key, version, build):
+        """Response for ``key`` at ``version``, calling ``build()`` for the body object on a miss
+
+        ``version`` is any hashable value that changes whenever the body
+        would; ``key`` identifies the endpoint and its query.
+        """
+        if not self.enabled:
+            return Response(dumps_json(build()), mimetype='application/json')
+        entry = self._entry(key, version, build)
+
+        encoding = None
+        if self.compress and len(entry.data) >= self.compress_min_bytes:
+            encoding = negotiate(request.accept_encodings)
+        response = Response(self._encoded(key, entry, encoding), mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # Weak, because the same validator is sent for every content encoding
+        response.set_etag(entry.etag, weak=True)
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+
+    def _entry(self, key, version, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        data = dumps_json(build())
+        # No Last-Modified: HTTP dates have whole seconds, and a body rebuilt
+        # within the same second would look unchanged to If-Modified-Since
+        entry = CachedBody(version, data, f'{self._instance}-{uuid.uuid4().hex[:16]}')
+        with self._lock:
+            current = self._entries.pop(key, None)
+            if current is not None:
+                self.total_bytes -= current.size
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def _encoded(self, key, entry, encoding):
+        if encoding is None:
+            return entry.data
+        data = entry.encoded.get(encoding)
+        if data is None:
+            data = compress(entry.data, encoding)
+            with self._lock:
+                if encoding not in entry.encoded:
+                    entry.encoded[encoding] = data
+                    if self._entries.get(key) is entry:
+                        self.total_bytes += len(data)
+                        self._evict()
+        return data
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'encoder': JSON_ENCODER,
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
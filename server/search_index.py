@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Search Index
+Incremental inverted index over the concepts, predicates and metadata of
+received videos
+
+Every video is one document. Its node labels, predicates, title and channel
+are split into lowercase tokens, and each token keeps a posting of
+{video id: weight}. Ingest only adds the tokens of the nodes and edges a
+batch introduced, so indexing cost follows the size of the batch, not the
+size of the video. A sorted vocabulary answers prefix queries with a binary
+search.
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from operator import itemgetter
+
+# Matches in a concept label count more than matches in the title, channel
+# or a relationship name
+FIELD_WEIGHTS = {
+    'label': 3.0,
+    'title': 2.0,
+    'channel': 1.5,
+    'predicate': 1.0,
+}
+# Most vocabulary tokens a single prefix term expands to
+MAX_PREFIX_EXPANSION = 200
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    """Lowercase word tokens of ``text``; underscores and punctuation separate words"""
+    return _TOKEN.findall(str(text).lower())
+
+
+def parse_query(query, prefix_last=False):
+    """Split a query into (token, is_prefix) terms
+
+    A word ending in ``*`` is a prefix term, as is the last word when
+    ``prefix_last`` is set (search as you type).
+    """
+    terms = []
+    words = query.split()
+    for position, word in enumerate(words):
+        prefix = word.endswith('*') or (prefix_last and position == len(words) - 1)
+        tokens = tokenize(word)
+        for index, token in enumerate(tokens):
+            terms.append((token, prefix and index == len(tokens) - 1))
+    return terms
+
+
+class SearchIndex:
+    """Thread-safe inverted index of video documents"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}     # token -> {doc id: saturated weight}
+        self._vocabulary = []   # sorted tokens, for prefix lookups
+        self._docs = {}         # doc id -> {'terms': {token: weight}, 'title': ..., 'channel': ...}
+
+    def __len__(self):
+        return len(self._docs)
+
+    @property
+    def vocabulary_size(self):
+        return len(self._vocabulary)
+
+    def add(self, doc_id, labels=(), predicates=(), title=None, channel=None):
+        """Index new labels and predicates of a document and its current title and channel"""
+        with self._lock:
+            doc = self._docs.get(doc_id)
+            if doc is None:
+                doc = self._docs[doc_id] = {'terms': {}, 'title': None, 'channel': None}
+            terms = doc['terms']
+            for field, texts in (('label', labels), ('predicate', predicates)):
+                weight = FIELD_WEIGHTS[field]
+                for text in texts:
+                    for token in tokenize(text):
+                        self._add_term(doc_id, terms, token, weight)
+            for field, text in (('title', title), ('channel', channel)):
+                if text and text != doc[field]:
+                    doc[field] = text
+                    for token in tokenize(text):
+                        self._add_term(doc_id, terms, token, FIELD_WEIGHTS[field])
+
+    def _add_term(self, doc_id, terms, token, weight):
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = {}
+            bisect.insort(self._vocabulary, token)
+        total = terms.get(token, 0.0) + weight
+        terms[token] = total
+        # Repeated mentions raise the weight logarithmically
+        postings[doc_id] = 1 + math.log(total)
+
+    def remove(self, doc_id):
+        """Drop a document, e.g. when its video graph is evicted"""
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if doc is None:
+                return
+            for token in doc['terms']:
+                postings = self._postings[token]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[token]
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _expand(self, token, prefix):
+        if not prefix:
+            return [token] if token in self._postings else []
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, token)
+        expansions = []
+        for index in range(start, min(len(vocabulary), start + MAX_PREFIX_EXPANSION)):
+            if not vocabulary[index].startswith(token):
+                break
+            expansions.append(vocabulary[index])
+        return expansions
+
+    def search(self, terms, offset=0, limit=20):
+        """Return (total, [(doc id, score, matched tokens)]) for documents matching every term
+
+        Each term scores a document by its best matching token, weighted by
+        the token's inverse document frequency and a saturating term weight.
+        """
+        with self._lock:
+            documents = len(self._docs)
+            expanded = [self._expand(token, prefix) for token, prefix in terms]
+            if len(expanded) == 1 and len(expanded[0]) == 1:
+                # One token: rank its postings directly, idf is a constant factor
+                postings = self._postings[expanded[0][0]]
+                idf = math.log(1 + documents / len(postings))
+                top = heapq.nlargest(offset + limit, postings.items(), key=itemgetter(1))[offset:]
+                return len(postings), [(doc_id, idf * weight, expanded[0]) for doc_id, weight in top]
+            scores = None
+            # Start with the rarest term so later terms only score survivors
+            for tokens in sorted(expanded, key=lambda tokens: sum(len(self._postings[t]) for t in tokens)):
+                term_scores = None
+                for token in tokens:
+                    postings = self._postings[token]
+                    idf = math.log(1 + documents / len(postings))
+                    if scores is None:
+                        token_scores = {doc_id: idf * weight for doc_id, weight in postings.items()}
+                    elif len(scores) < len(postings):
+                        token_scores = {doc_id: idf * postings[doc_id] for doc_id in scores if doc_id in postings}
+                    else:
+                        token_scores = {doc_id: idf * weight for doc_id, weight in postings.items()
+                                        if doc_id in scores}
+                    if term_scores is None:
+                        term_scores = token_scores
+                    else:
+                        # A prefix term scores by its best matching token
+                        for doc_id, score in token_scores.items():
+                            if score > term_scores.get(doc_id, 0.0):
+                                term_scores[doc_id] = score
+                if not term_scores:
+                    return 0, []
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc_id: scores[doc_id] + score for doc_id, score in term_scores.items()}
+
+            if scores is None:
+                return 0, []
+            top = heapq.nlargest(offset + limit, scores.items(), key=itemgetter(1))[offset:]
+            results = []
+            for doc_id, score in top:
+                terms_in_doc = self._docs[doc_id]['terms']
+                matched = [token for tokens in expanded for token in tokens if token in terms_in_doc]
+                results.append((doc_id, score, matched))
+            return len(scores), results
@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 """
 Startup script for YouTube Learning Extension Live Graph Server
+
+    python start_live_server.py          Install requirements and run the dev server
+    python start_live_server.py serve    Run the server under a production WSGI server
 """
 
+import argparse
+import _thread
+import signal
 import subprocess
 import sys
 import os
@@ -23,8 +29,8 @@ def install_requirements():
 
 def check_python_version():
     """Check if Python version is compatible"""
-    if sys.version_info < (3, 6):
-        print("❌ Python 3.6 or higher is required")
+    if sys.version_info < (3, 9):
+        print("❌ Python 3.9 or higher is required")
         return False
     print(f"✅ Python {sys.version.split()[0]} detected")
     return True
@@ -63,5 +69,99 @@ def main():
     except KeyboardInterrupt:
         print("\n👋 Server stopped. Goodbye!")
 
+def serve(args):
+    """Run the live graph server under waitress for production use
+
+    The graph store, event stream and statistics live in process memory, so
+    the server runs as a single process with a pool of worker threads rather
+    than as several forked workers that would each see a different store.
+    """
+    try:
+        from waitress import create_server
+    except ImportError:
+        print("❌ waitress is not installed. Run: pip install -r requirements.txt")
+        sys.exit(1)
+
+    os.environ.setdefault('GRAPH_LOG_MODE', 'structured')
+    # Raw AI content can be megabytes per push; don't write it to production logs
+    os.environ.setdefault('GRAPH_LOG_PAYLOAD', 'off')
+    os.environ['GRAPH_MAX_BODY_BYTES'] = str(args.max_body_bytes)
+    # Every open dashboard pins a thread on its event stream; keep at least
+    # half the pool free for graph pushes
+    os.environ.setdefault('GRAPH_STREAM_MAX_CLIENTS', str(max(1, args.threads // 2)))
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import live_graph_server
+
+    server = create_server(
+        live_graph_server.app,
+        host=args.host,
+        port=args.port,
+        threads=args.threads,
+        connection_limit=args.connection_limit,
+        channel_timeout=args.keep_alive,
+        max_request_body_size=args.max_body_bytes,
+        backlog=args.backlog,
+        ident='live-graph-server'
+    )
+
+    def drain_and_exit():
+        # Wait for in-flight requests to finish, then stop the main loop
+        dispatcher = server.task_dispatcher
+        deadline = time.monotonic() + args.graceful_timeout
+        while time.monotonic() < deadline:
+            with dispatcher.lock:
+                busy = dispatcher.active_count or dispatcher.queue
+            if not busy:
+                break
+            time.sleep(0.1)
+        # Give the main loop a moment to flush the last responses
+        time.sleep(0.5)
+        _thread.interrupt_main()
+
+    def shutdown(signum, frame):
+        if getattr(shutdown, 'started', False):
+            # Second signal: either the drain finished or the user insists
+            raise SystemExit(0)
+        shutdown.started = True
+        print(f"\n🛑 Received signal {signum}, shutting down gracefully...")
+        server.accepting = False
+        live_graph_server.event_bus.close()
+        threading.Thread(target=drain_and_exit, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.threads} threads")
+    print(f"   Keep-alive timeout: {args.keep_alive}s, max request body: {args.max_body_bytes} bytes")
+    server.run()
+    print("👋 Server stopped. Goodbye!")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YouTube Learning Extension Live Graph Server")
+    commands = parser.add_subparsers(dest='command')
+
+    serve_parser = commands.add_parser('serve', help="run under a production WSGI server")
+    serve_parser.add_argument('--host', default=os.environ.get('FLASK_HOST', '0.0.0.0'))
+    serve_parser.add_argument('--port', type=int, default=int(os.environ.get('FLASK_PORT', 5000)))
+    serve_parser.add_argument('--threads', type=int, default=16,
+                              help="worker threads handling requests (default: 16)")
+    serve_parser.add_argument('--connection-limit', type=int, default=1000,
+                              help="maximum simultaneous client connections (default: 1000)")
+    serve_parser.add_argument('--keep-alive', type=int, default=120,
+                              help="seconds an idle keep-alive connection stays open (default: 120)")
+    serve_parser.add_argument('--max-body-bytes', type=int,
+                              default=int(os.environ.get('GRAPH_MAX_BODY_BYTES', 32 * 1024 * 1024)),
+                              help="reject request bodies larger than this (default: 32 MB)")
+    serve_parser.add_argument('--backlog', type=int, default=1024,
+                              help="listen socket backlog (default: 1024)")
+    serve_parser.add_argument('--graceful-timeout', type=float, default=30,
+                              help="seconds to let in-flight requests finish on shutdown (default: 30)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.command == 'serve':
+        serve(args)
+    else:
+        main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Streaming Payload Reader
+Decode a graph push from the request body as it arrives, parsing the
+triples of ``rawContent`` along the way
+
+``request.get_json()`` keeps the whole body as bytes and then decodes all
+of it, so a multi-megabyte push is held twice before parsing starts. This
+reader pulls the body in fixed-size chunks, decodes the ``rawContent``
+string piece by piece and hands the pieces to a TripleParser, so the body
+is never buffered and parsing overlaps the upload. Every other top-level
+field is small and is decoded with ``json.loads`` once it has been read,
+up to ``max_field_chars`` characters.
+"""
+
+import codecs
+import json
+import re
+
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+CHUNK_BYTES = 64 * 1024
+# Decoded rawContent is handed to the parser in pieces of about this many characters
+PARSE_CHARS = 64 * 1024
+STREAMED_FIELD = 'rawContent'
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Part of a JSON string: plain characters and complete escapes
+_STRING_SEGMENT = re.compile(r'(?:[^"\\]+|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*')
+_TRAILING_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}$')
+# Characters of a non-string value that need no special handling
+_VALUE_RUN = re.compile(r'[^"{}\[\],]*')
+
+
+class StreamingPayloadReader:
+    """Reads one JSON object from a binary stream, streaming its ``rawContent``
+
+    ``parser`` is a TripleParser, or None to only collect ``rawContent``.
+    Malformed JSON raises BadRequest; a field other than ``rawContent``
+    longer than ``max_field_chars`` raises RequestEntityTooLarge.
+    """
+
+    def __init__(self, stream, parser=None, max_field_chars=1024 * 1024, chunk_bytes=CHUNK_BYTES):
+        self.stream = stream
+        self.parser = parser
+        self.max_field_chars = max_field_chars
+        self.chunk_bytes = chunk_bytes
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def read(self):
+        """Decode the body and return the payload dict"""
+        data = {}
+        self._skip_whitespace()
+        self._expect('{')
+        self._skip_whitespace()
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                self._skip_whitespace()
+                self._expect('"')
+                key = self._read_string_value(limit=self.max_field_chars)
+                self._skip_whitespace()
+                self._expect(':')
+                self._skip_whitespace()
+                if key == STREAMED_FIELD and self._peek() == '"':
+                    self._pos += 1
+                    data[key] = self._read_streamed_string()
+                else:
+                    data[key] = self._read_value()
+                self._skip_whitespace()
+                separator = self._next()
+                if separator == '}':
+                    break
+                if separator != ',':
+                    self._fail(f"expected ',' or '}}' but found {separator!r}")
+        self._skip_whitespace()
+        if self._peek() is not None:
+            self._fail('unexpected data after the JSON object')
+        return data
+
+    # Buffer handling
+
+    def _fill(self):
+        """Read another chunk; returns False at the end of the body"""
+        if self._eof:
+            return False
+        chunk = self.stream.read(self.chunk_bytes)
+        if not chunk:
+            self._eof = True
+            try:
+                tail = self._decoder.decode(b'', final=True)
+            except UnicodeDecodeError as e:
+                raise BadRequest(f'Invalid JSON body: {str(e)}')
+            self._buffer = self._buffer[self._pos:] + tail
+            self._pos = 0
+            return bool(tail)
+        self.bytes_read += len(chunk)
+        try:
+            text = self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise BadRequest(f'Invalid JSON body: {str(e)}')
+        # Drop what has been consumed so the buffer stays about one chunk long
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _ensure(self, count):
+        """Make ``count`` characters available at the current position if the body has them"""
+        while len(self._buffer) - self._pos < count:
+            if not self._fill():
+                return False
+        return True
+
+    def _peek(self):
+        return self._buffer[self._pos] if self._ensure(1) else None
+
+    def _next(self):
+        char = self._peek()
+        if char is None:
+            self._fail('unexpected end of body')
+        self._pos += 1
+        return char
+
+    def _expect(self, char):
+        found = self._next()
+        if found != char:
+            self._fail(f'expected {char!r} but found {found!r}')
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _fail(self, message):
+        raise BadRequest(f'Invalid JSON body: {message}')
+
+    # Strings
+
+    def _read_string(self, emit):
+        """Decode a string whose opening quote was consumed, passing pieces to ``emit``
+
+        Everything buffered up to the closing quote, or up to an escape cut
+        off by the end of the buffer, is decoded in one ``json.loads`` call.
+        """
+        while True:
+            buffer = self._buffer
+            end = _STRING_SEGMENT.match(buffer, self._pos).end()
+            closed = end < len(buffer) and buffer[end] == '"'
+            if not closed:
+                if len(buffer) - end >= 6:
+                    self._fail('invalid escape in string')
+                # Keep a high surrogate together with the low one that follows it,
+                # unless its backslash is itself escaped
+                match = _TRAILING_HIGH_SURROGATE.search(buffer, self._pos, end)
+                if match:
+                    start = match.start()
+                    while start > self._pos and buffer[start - 1] == '\\':
+                        start -= 1
+                    if (match.start() - start) % 2 == 0:
+                        end -= 6
+            if end > self._pos:
+                try:
+                    emit(json.loads(f'"{buffer[self._pos:end]}"'))
+                except ValueError as e:
+                    self._fail(str(e))
+                self._pos = end
+            if closed:
+                self._pos += 1
+                return
+            if not self._fill():
+                self._fail('unterminated string')
+
+    def _read_string_value(self, limit):
+        pieces = []
+        length = 0
+
+        def emit(piece):
+            nonlocal length
+            length += len(piece)
+            if length > limit:
+                raise RequestEntityTooLarge(f'JSON field longer than {limit} characters')
+            pieces.append(piece)
+
+        self._read_string(emit)
+        return ''.join(pieces)
+
+    def _read_streamed_string(self):
+        """Decode ``rawContent``, feeding the parser about PARSE_CHARS characters at a time"""
+        batches = []
+        pending = []
+        pending_chars = 0
+
+        def emit(piece):
+            nonlocal pending_chars
+            pending.append(piece)
+            pending_chars += len(piece)
+            if pending_chars >= PARSE_CHARS:
+                flush()
+
+        def flush():
+            nonlocal pending_chars
+            batch = ''.join(pending)
+            pending.clear()
+            pending_chars = 0
+            if self.parser is not None:
+                self.parser.feed(batch)
+            batches.append(batch)
+
+        self._read_string(emit)
+        flush()
+        return ''.join(batches)
+
+    # Other values
+
+    def _read_value(self):
+        """Read any other JSON value as text, bracket-matched, and decode it"""
+        pieces = []
+        length = 0
+        depth = 0
+        while True:
+            if self._pos == len(self._buffer) and not self._fill():
+                break
+            start = self._pos
+            end = _VALUE_RUN.match(self._buffer, start).end()
+            char = self._buffer[end] if end < len(self._buffer) else None
+            if char is None:
+                self._pos = end
+            elif char == '"':
+                self._pos = end + 1
+                pieces.append(self._buffer[start:self._pos])
+                length += self._pos - start
+                # Re-encode the string so the whole value decodes with json.loads
+                text = self._read_string_value(self.max_field_chars - length)
+                pieces.append(json.dumps(text)[1:])
+                length += len(text) + 1
+                continue
+            elif char in '{[':
+                depth += 1
+                self._pos = end + 1
+            elif depth and char in '}]':
+                depth -= 1
+                self._pos = end + 1
+            elif depth and char == ',':
+                self._pos = end + 1
+            else:
+                # A top-level ',' or '}' ends the value
+                self._pos = end
+                pieces.append(self._buffer[start:end])
+                break
+            pieces.append(self._buffer[start:self._pos])
+            length += self._pos - start
+            if length > self.max_field_chars:
+                raise RequestEntityTooLarge(f'JSON field longer than {self.max_field_chars} characters')
+        try:
+            return json.loads(''.join(pieces))
+        except ValueError as e:
+            self._fail(str(e))
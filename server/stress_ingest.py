@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Ingest Stress Check
+Fires thousands of concurrent graph pushes at the live graph server in-process
+and checks that the statistics and graph ids come out exact.
+
+    python stress_ingest.py --requests 5000 --concurrency 64 --videos 50
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent ingest stress check")
+    parser.add_argument('--requests', type=int, default=5000, help="total pushes to send (default: 5000)")
+    parser.add_argument('--concurrency', type=int, default=64, help="concurrent client threads (default: 64)")
+    parser.add_argument('--videos', type=int, default=50, help="distinct video ids to spread pushes over (default: 50)")
+    args = parser.parse_args()
+
+    # Keep the log quiet and make sure nothing is evicted during the run
+    os.environ.setdefault('GRAPH_LOG_MODE', 'structured')
+    os.environ.setdefault('GRAPH_LOG_PAYLOAD', 'off')
+    os.environ.setdefault('GRAPH_STORAGE', 'memory')
+    os.environ['GRAPH_STORE_MAX_GRAPHS'] = str(args.requests)
+    os.environ['GRAPH_STORE_MAX_BYTES'] = '0'
+    # In async ingest mode, queue every push instead of shedding load
+    os.environ['GRAPH_INGEST_QUEUE_SIZE'] = str(args.requests)
+    # Switch threads as often as possible so unsynchronized updates would race
+    sys.setswitchinterval(1e-6)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import live_graph_server
+    logging.disable(logging.INFO)
+
+    app = live_graph_server.app
+
+    def push(i):
+        client = app.test_client()
+        response = client.post('/api/graph-data', json={
+            'timestamp': '2025-10-21T22:49:51.520Z',
+            'source': 'youtube-learning-extension',
+            'version': '1.2',
+            'metadata': {
+                'videoId': f'video-{i % args.videos}',
+                'videoTitle': f'Stress Video {i % args.videos}',
+                'channelName': 'Stress Channel',
+                'batchId': i
+            },
+            'rawContent': f'(concept {i},relates_to,topic {i % 7})\n(topic {i % 7},is_part_of,course)',
+            'contentType': 'ai_triples'
+        })
+        return response.status_code, response.get_json().get('graph_id'), threading.get_ident()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(push, range(args.requests)))
+    if live_graph_server.ingest_queue:
+        # Wait for the workers to store everything that was queued
+        live_graph_server.ingest_queue.close(timeout=300)
+    elapsed = time.perf_counter() - started
+
+    failures = [status for status, _, _ in results if status not in (200, 202)]
+    graph_ids = [graph_id for _, graph_id, _ in results]
+    stats = live_graph_server.stats_snapshot()
+    expected_videos = min(args.videos, args.requests)
+    # Graphs are counted by the request threads, or by the ingest workers in
+    # async mode; distinct counting threads must land on distinct shards
+    ingest_queue = live_graph_server.ingest_queue
+    counting_threads = ingest_queue.workers if ingest_queue else len({ident for _, _, ident in results})
+    counter = live_graph_server.stats.total_received
+    expected_shards = min(counting_threads, counter.shards)
+
+    checks = [
+        ('successful responses', args.requests - len(failures), args.requests),
+        ('unique graph ids', len(set(graph_ids)), args.requests),
+        ('total_received', stats['total_received'], args.requests),
+        ('unique_videos', stats['unique_videos'], expected_videos),
+        ('stored graphs', stats['latest_graphs'], args.requests),
+        ('counter shards used', min(counter.shards_used, expected_shards), expected_shards),
+    ]
+
+    print(f"Sent {args.requests} pushes with {args.concurrency} threads in {elapsed:.2f}s "
+          f"({args.requests / elapsed:.0f} req/s)")
+    ok = True
+    for name, actual, expected in checks:
+        passed = actual == expected
+        ok = ok and passed
+        print(f"  {'✅' if passed else '❌'} {name}: {actual} (expected {expected})")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Triple Parser
+Single-pass parser for the (subject, predicate, object) tuples in AI output
+
+Tuples are parenthesized, comma-separated groups on a single line, e.g.
+
+    (Emmanuel Kant,teaches,semester)
+    (Kant,_teaches_about,_world_work,philosophical_concept)
+
+Commas inside double quotes or nested parentheses do not split a tuple, so
+("New York, NY",located_in,USA) and (neural network (NN),is_a,model) both
+parse as three parts. Nesting is supported up to MAX_NESTING levels. A
+group made only of groups, such as ((a,b,c), (d,e,f)), is a list of tuples
+and each inner group is parsed on its own.
+
+The whole buffer is scanned once with a single precompiled pattern; there
+is no per-line split and each triple tuple is built exactly once.
+"""
+
+import re
+from itertools import chain
+from operator import itemgetter
+
+MAX_NESTING = 3
+
+
+def _group_pattern(max_nesting):
+    # A group is '(' ... ')' on one line. Its content is plain text, quoted
+    # strings, or nested groups up to ``max_nesting`` levels deep. Each level
+    # is written as  plain* (special plain*)*  so there is only one way to
+    # match any input and unterminated groups fail in linear time.
+    plain = r'[^()"\n]*'
+    # A quote with no partner later on the line is just a character
+    quoted = r'"[^"\n]*"|"(?![^"\n]*")'
+    level = r'%s(?:%s%s)*' % (plain, quoted, plain)
+    for _ in range(max_nesting):
+        level = r'%s(?:(?:%s|\(%s\))%s)*' % (plain, quoted, level, plain)
+    return re.compile(r'\((%s)\)' % level)
+
+
+_GROUP = _group_pattern(MAX_NESTING)
+# Tokens for splitting a group that contains quotes or nested parentheses
+_PART_TOKEN = re.compile(r'"[^"]*"|[(),"]|[^"(),]+')
+_ENDPOINTS = itemgetter(0, 2)
+_strip = str.strip
+
+
+def _split_nested(inner):
+    """Split a group on top-level commas, honouring quotes and parentheses"""
+    parts = []
+    current = []
+    depth = 0
+    for token in _PART_TOKEN.findall(inner):
+        if token == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        current.append(token)
+    parts.append(''.join(current))
+
+    cleaned = []
+    for part in parts:
+        part = part.strip()
+        if len(part) >= 2 and part[0] == '"' and part[-1] == '"':
+            part = part[1:-1].strip()
+        cleaned.append(part)
+    return cleaned
+
+
+def _is_group(part):
+    return len(part) >= 2 and part[0] == '(' and part[-1] == ')'
+
+
+def parse_into(text, triples):
+    """Append every triple parsed from ``text`` to ``triples``
+
+    3-part tuples become one triple. 4-part tuples (s, p, o, extra) become
+    (s, p, o) and (o, 'related_to', extra). Longer tuples keep their first
+    three parts. Groups with fewer than three parts are ignored, unless all
+    their parts are groups, which are then parsed instead.
+    """
+    append = triples.append
+    for inner in _GROUP.findall(text):
+        if '(' in inner or '"' in inner:
+            parts = _split_nested(inner)
+            if all(map(_is_group, parts)):
+                parse_into(inner, triples)
+                continue
+        else:
+            parts = list(map(_strip, inner.split(',')))
+        count = len(parts)
+        if count < 3:
+            continue
+        append((parts[0], parts[1], parts[2]))
+        if count == 4:
+            append((parts[2], 'related_to', parts[3]))
+    return triples
+
+
+def triple_nodes(triples):
+    """Subjects and objects of ``triples`` in first-seen order"""
+    return dict.fromkeys(chain.from_iterable(map(_ENDPOINTS, triples)))
+
+
+class TripleParser:
+    """Incremental triple parser for content that arrives in chunks
+
+    Tuples never span lines, so everything up to the last newline seen can be
+    parsed immediately and only the trailing partial line is buffered. The
+    partial line is kept as a list of chunks and joined once it ends, so a
+    long line fed in many chunks is not copied again for every chunk.
+    """
+
+    def __init__(self):
+        self.nodes = {}     # insertion-ordered set of node labels
+        self.triples = []
+        self._pending = []  # chunks of the trailing partial line
+
+    def feed(self, chunk):
+        cut = chunk.rfind('\n')
+        if cut < 0:
+            if chunk:
+                self._pending.append(chunk)
+            return
+        if self._pending:
+            self._pending.append(chunk[:cut + 1])
+            text = ''.join(self._pending)
+        else:
+            text = chunk[:cut + 1]
+        self._pending = [chunk[cut + 1:]] if cut + 1 < len(chunk) else []
+        self._consume(text)
+
+    def close(self):
+        """Parse any buffered partial line and return the result"""
+        if self._pending:
+            self._consume(''.join(self._pending))
+            self._pending = []
+        return self.result()
+
+    def result(self):
+        # Edges and raw triples are the same list; nothing is copied
+        return {
+            'nodes': list(self.nodes),
+            'edges': self.triples,
+            'raw_triples': self.triples
+        }
+
+    def _consume(self, text):
+        start = len(self.triples)
+        parse_into(text, self.triples)
+        self.nodes.update(triple_nodes(self.triples[start:]))
+
+
+def parse_ai_triples(raw_content):
+    """Parse raw AI triple content into nodes, edges, and triples"""
+    parser = TripleParser()
+    parser.feed(raw_content)
+    return parser.close()
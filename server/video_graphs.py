@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+YouTube Learning Extension - Per-video Knowledge Graphs
+Incrementally merges the graph of every caption batch into one deduplicated
+graph per video
+"""
+
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+
+_instances = itertools.count(1)
+
+
+def node_json(label):
+    return {'id': label, 'label': label, 'type': 'concept'}
+
+
+def edge_json(triple):
+    subject, predicate, obj = triple
+    return {'from': subject, 'to': obj, 'label': predicate, 'type': 'relationship'}
+
+
+class VideoGraph:
+    """Merged, deduplicated knowledge graph for a single video
+
+    Nodes and edges are kept in first-seen order together with the batch that
+    introduced them, and an adjacency index maps every node to the edges that
+    touch it. Merging a batch costs O(new triples), independent of how large
+    the graph already is.
+    """
+
+    def __init__(self, video_id):
+        self.video_id = video_id
+        self.lock = threading.Lock()
+        # Distinguishes a graph rebuilt after eviction from its predecessor
+        self.instance = next(_instances)
+        self.version = 0
+        self.nodes = {}         # label -> batch key that introduced it
+        self.edges = {}         # (subject, predicate, object) -> batch key
+        self.adjacency = {}     # label -> {edge triple: None}
+        self.batches = OrderedDict()  # batch key -> {'nodes': [...], 'edges': [...], 'graphIds': [...]}
+        self.metadata = {}
+
+    def merge(self, batch_id, triples, extra_nodes=(), graph_id=None, metadata=None):
+        """Add a batch's triples and return the nodes and edges it introduced"""
+        key = str(batch_id)
+        with self.lock:
+            delta = self.batches.get(key)
+            if delta is None:
+                delta = self.batches[key] = {'nodes': [], 'edges': [], 'graphIds': []}
+            if graph_id is not None:
+                delta['graphIds'].append(graph_id)
+            if metadata:
+                self.metadata = metadata
+
+            nodes = self.nodes
+            new_nodes = []
+            new_edges = []
+            for triple in triples:
+                if triple in self.edges:
+                    continue
+                self.edges[triple] = key
+                new_edges.append(triple)
+                for label in (triple[0], triple[2]):
+                    if label not in nodes:
+                        nodes[label] = key
+                        new_nodes.append(label)
+                        self.adjacency[label] = {}
+                    self.adjacency[label][triple] = None
+            for label in extra_nodes:
+                if label not in nodes:
+                    nodes[label] = key
+                    new_nodes.append(label)
+                    self.adjacency[label] = {}
+
+            delta['nodes'].extend(new_nodes)
+            delta['edges'].extend(new_edges)
+            if new_nodes or new_edges:
+                self.version += 1
+            return {'nodes': new_nodes, 'edges': new_edges, 'version': self.version}
+
+    def neighbors(self, label):
+        """Edges touching ``label``"""
+        with self.lock:
+            return list(self.adjacency.get(label, ()))
+
+    def degrees(self, labels=None):
+        """{label: number of edges touching it} for ``labels``, or every node"""
+        with self.lock:
+            adjacency = self.adjacency
+            if labels is None:
+                return {label: len(edges) for label, edges in adjacency.items()}
+            return {label: len(adjacency[label]) for label in labels if label in adjacency}
+
+    def top_by_degree(self, k):
+        """The ``k`` labels with the most edges, most connected first"""
+        with self.lock:
+            adjacency = self.adjacency
+            return heapq.nlargest(k, adjacency, key=lambda label: len(adjacency[label]))
+
+    def hop_neighborhood(self, label, depth=1, limit=200):
+        """Labels within ``depth`` hops of ``label`` in either direction, nearest first
+
+        Returns None if ``label`` is not in the graph. Stops at ``limit``
+        labels; on the last included hop the best connected labels win.
+        """
+        with self.lock:
+            adjacency = self.adjacency
+            if label not in adjacency:
+                return None
+            included = {label: None}
+            frontier = [label]
+            for _ in range(depth):
+                candidates = {}
+                for current in frontier:
+                    for subject, _, obj in adjacency[current]:
+                        other = obj if subject == current else subject
+                        if other not in included:
+                            candidates[other] = None
+                if len(included) + len(candidates) > limit:
+                    ranked = sorted(candidates, key=lambda other: len(adjacency[other]), reverse=True)
+                    included.update(dict.fromkeys(ranked[:max(0, limit - len(included))]))
+                    break
+                included.update(candidates)
+                frontier = list(candidates)
+                if not frontier:
+                    break
+            return list(included)
+
+    def subgraph_json(self, labels):
+        """Nodes ``labels`` and the edges among them, in the merged graph's JSON shape"""
+        with self.lock:
+            selected = {label: None for label in labels if label in self.nodes}
+            edges = []
+            for label in selected:
+                for triple in self.adjacency[label]:
+                    # Every edge is listed once, under its subject
+                    if triple[0] == label and triple[2] in selected:
+                        edges.append(edge_json(triple))
+            return {
+                'videoId': self.video_id,
+                'version': self.version,
+                'metadata': dict(self.metadata),
+                'batches': list(self.batches),
+                'totalNodes': len(self.nodes),
+                'totalEdges': len(self.edges),
+                'nodes': [node_json(label) for label in selected],
+                'edges': edges
+            }
+
+    def structure(self):
+        """(version, instance, node labels, distinct linked (subject, object) pairs)"""
+        with self.lock:
+            pairs = dict.fromkeys((subject, obj) for subject, _, obj in self.edges if subject != obj)
+            return self.version, self.instance, list(self.nodes), list(pairs)
+
+    @property
+    def etag(self):
+        return f'{self.video_id}-{self.instance}-{self.version}'
+
+    def summary(self):
+        with self.lock:
+            return {
+                'videoId': self.video_id,
+                'videoTitle': self.metadata.get('videoTitle'),
+                'channelName': self.metadata.get('channelName'),
+                'version': self.version,
+                'nodeCount': len(self.nodes),
+                'edgeCount': len(self.edges),
+                'batchCount': len(self.batches)
+            }
+
+    def to_json(self):
+        """Merged graph in the same node/edge shape as a single received graph"""
+        with self.lock:
+            return {
+                'videoId': self.video_id,
+                'version': self.version,
+                'metadata': dict(self.metadata),
+                'batches': list(self.batches),
+                'nodes': [node_json(label) for label in self.nodes],
+                'edges': [edge_json(triple) for triple in self.edges]
+            }
+
+    def delta_json(self, batch_id):
+        """Nodes and edges first introduced by ``batch_id``, or None"""
+        with self.lock:
+            delta = self.batches.get(str(batch_id))
+            if delta is None:
+                return None
+            return {
+                'videoId': self.video_id,
+                'batchId': str(batch_id),
+                'graphIds': list(delta['graphIds']),
+                'nodes': [node_json(label) for label in delta['nodes']],
+                'edges': [edge_json(triple) for triple in delta['edges']]
+            }
+
+
+class VideoGraphIndex:
+    """Merged graphs for recently active videos, least recently updated evicted first"""
+
+    def __init__(self, max_videos=500, on_evict=None):
+        self.max_videos = max_videos
+        self.on_evict = on_evict    # called with the video id of each evicted graph
+        self._lock = threading.Lock()
+        self._graphs = OrderedDict()    # video id -> VideoGraph
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._graphs)
+
+    def get(self, video_id):
+        with self._lock:
+            return self._graphs.get(video_id)
+
+    def merge(self, video_id, batch_id, triples, extra_nodes=(), graph_id=None, metadata=None):
+        """Merge a batch into the graph for ``video_id`` and return (graph, delta)"""
+        with self._lock:
+            graph = self._graphs.get(video_id)
+            if graph is None:
+                graph = self._graphs[video_id] = VideoGraph(video_id)
+                while self.max_videos and len(self._graphs) > self.max_videos:
+                    evicted, _ = self._graphs.popitem(last=False)
+                    self.evictions += 1
+                    if self.on_evict:
+                        self.on_evict(evicted)
+            else:
+                self._graphs.move_to_end(video_id)
+        # Only the per-video lock is held while merging, so different videos
+        # merge concurrently
+        delta = graph.merge(batch_id, triples, extra_nodes, graph_id, metadata)
+        return graph, delta
+
+    def summaries(self):
+        """Summaries of all merged graphs, most recently updated first"""
+        with self._lock:
+            graphs = list(reversed(self._graphs.values()))
+        return [graph.summary() for graph in graphs]